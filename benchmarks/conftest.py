@@ -0,0 +1,43 @@
+import os
+
+import pytest
+import yandexcloud
+
+from tests.fixtures import STUB_ZONE_NAME
+from tests.fixtures.dns_server import FakeDnsServer
+from tests.fixtures.ya360_server import Ya360Server
+
+pytest.importorskip('pytest_benchmark')
+
+# Zone sizes could be limited with OCTODNS_YANDEX_BENCH_SIZES=1000,10000
+SIZES = [
+    int(e)
+    for e in os.environ.get(
+        'OCTODNS_YANDEX_BENCH_SIZES', '1000,10000,100000'
+    ).split(',')
+]
+
+
+def rounds(size):
+    # Keep total amount of work per benchmark roughly the same
+    return max(1, 10000 // size)
+
+
+@pytest.fixture(params=SIZES, ids=lambda e: f'{e}')
+def size(request):
+    return request.param
+
+
+@pytest.fixture()
+def dns_server(monkeypatch):
+    with FakeDnsServer(page_size=1000) as server:
+        monkeypatch.setattr(yandexcloud, 'SDK', server.sdk)
+        yield server
+
+
+@pytest.fixture()
+def ya360_server(enable_network):
+    with Ya360Server() as server:
+        server.state.add_org(1)
+        server.state.add_domain(1, STUB_ZONE_NAME.rstrip('.'))
+        yield server
@@ -0,0 +1,63 @@
+import pytest
+
+from octodns.zone import Zone
+
+from benchmarks.conftest import rounds
+from octodns_yandex.yandex360_provider import (
+    map_entries_to_records,
+    map_record_to_entries,
+)
+from octodns_yandex.yandexcloud_provider import (
+    map_octodns_to_rset,
+    map_rset_to_octodns,
+)
+from tests.fixtures import STUB_ZONE_NAME
+from tests.fixtures.generator import generate_entries, generate_record_sets
+
+pytestmark = pytest.mark.benchmark(group='mapping')
+
+
+def test_map_rset_to_octodns(benchmark, size):
+    rsets = generate_record_sets(size)
+
+    def _map():
+        zone = Zone(STUB_ZONE_NAME, [])
+        return [map_rset_to_octodns(None, zone, False, e) for e in rsets]
+
+    records = benchmark.pedantic(_map, rounds=rounds(size))
+    assert len(records) == size
+
+
+def test_map_octodns_to_rset(benchmark, size):
+    zone = Zone(STUB_ZONE_NAME, [])
+    records = [
+        map_rset_to_octodns(None, zone, False, e)
+        for e in generate_record_sets(size)
+    ]
+
+    rsets = benchmark.pedantic(
+        lambda: [map_octodns_to_rset(e) for e in records], rounds=rounds(size)
+    )
+    assert len(rsets) == size
+
+
+def test_map_entries_to_records(benchmark, size):
+    entries = generate_entries(size)
+
+    def _map():
+        zone = Zone(STUB_ZONE_NAME, [])
+        return map_entries_to_records(None, zone, False, entries)
+
+    records = benchmark.pedantic(_map, rounds=rounds(size))
+    assert len(records) == size
+
+
+def test_map_record_to_entries(benchmark, size):
+    zone = Zone(STUB_ZONE_NAME, [])
+    records = map_entries_to_records(None, zone, False, generate_entries(size))
+
+    entries = benchmark.pedantic(
+        lambda: [map_record_to_entries(zone, e) for e in records],
+        rounds=rounds(size),
+    )
+    assert len(entries) == size
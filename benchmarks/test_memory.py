@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+
+import pytest
+import yandexcloud
+
+from octodns.zone import Zone
+
+from octodns_yandex import YandexCloudProvider
+from octodns_yandex.auth import AUTH_TYPE_METADATA
+from tests.fixtures import STUB_FOLDER_ID, STUB_ZONE_NAME
+from tests.fixtures.dns_server import LocalSDK
+from tests.fixtures.generator import generate_record_sets
+
+pytestmark = [
+    pytest.mark.benchmark(group='memory'),
+    pytest.mark.skipif(
+        not os.path.exists('/proc/self/clear_refs'),
+        reason='Peak RSS reset is supported only on Linux',
+    ),
+]
+
+# Every 100th generated record set
+FILTERED_NAMES = ['*00', '*00.*']
+
+
+def _reset_peak_rss():
+    with open('/proc/self/clear_refs', 'w') as fh:
+        fh.write('5')
+
+
+def _peak_rss():
+    # Kilobytes
+    with open('/proc/self/status') as fh:
+        for line in fh:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+
+
+def _populate_rss(address, managed_names):
+    # Runs in a fresh process, so its peak RSS is not affected by the
+    # benchmark session. Protobuf messages are allocated outside of Python
+    # heap, so tracemalloc doesn't see them
+    yandexcloud.SDK = lambda *args, **kwargs: LocalSDK(address)
+    provider = YandexCloudProvider(
+        'bench',
+        folder_id=STUB_FOLDER_ID,
+        auth_type=AUTH_TYPE_METADATA,
+        managed_names=managed_names,
+    )
+    # Warm up imports, channel and caches
+    provider.populate(Zone('warmup.com.', []))
+
+    _reset_peak_rss()
+    before = _peak_rss()
+    zone = Zone(STUB_ZONE_NAME, [])
+    provider.populate(zone)
+    return _peak_rss() - before, len(zone.records)
+
+
+def _measure(address, managed_names=None):
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(1) as pool:
+        return pool.apply(_populate_rss, (address, managed_names))
+
+
+def test_populate_memory(benchmark, dns_server, size):
+    # Peak memory should grow with the resulting zone, not with the amount
+    # of data transferred: the filtered zone gets the same pages
+    dns_zone = dns_server.state.add_zone(STUB_ZONE_NAME)
+    dns_server.state.add_record_sets(dns_zone.id, generate_record_sets(size))
+    dns_server.state.add_zone('warmup.com.')
+
+    full, records = benchmark.pedantic(
+        _measure, args=(dns_server.address,), rounds=1
+    )
+    assert records == size
+
+    filtered, filtered_records = _measure(dns_server.address, FILTERED_NAMES)
+    assert filtered_records < size // 50
+
+    benchmark.extra_info['full_rss_kb'] = full
+    benchmark.extra_info['filtered_rss_kb'] = filtered
+    if size >= 10000:
+        assert filtered < full / 4
@@ -0,0 +1,140 @@
+import pytest
+import yandexcloud
+from yandex.cloud.cdn.v1.resource_service_pb2 import (
+    GetProviderCNameResponse,
+    ListResourcesResponse,
+)
+from yandex.cloud.certificatemanager.v1.certificate_pb2 import CertificateType
+from yandex.cloud.certificatemanager.v1.certificate_service_pb2 import (
+    ListCertificatesResponse,
+)
+
+from octodns.zone import Zone
+
+from octodns_yandex import YandexCloudCDNSource, YandexCloudCMSource
+from octodns_yandex.auth import AUTH_TYPE_METADATA
+from tests.fixtures import STUB_FOLDER_ID
+from tests.fixtures.generator import (
+    generate_cdn_resources,
+    generate_certificates,
+    generate_zone_names,
+)
+
+pytestmark = pytest.mark.benchmark(group='sources')
+
+ZONES = 200
+SOURCE_SIZES = [1000, 5000]
+
+
+class StubSDK:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def client(self, stub):
+        class StubChannel:
+            def unary_unary(self, *args, **kwargs):
+                pass
+
+        return stub(StubChannel())
+
+
+def _paged(items, request, field, response_type, page_size=100):
+    offset = int(request.page_token) if request.page_token else 0
+    next_offset = offset + page_size
+    return response_type(
+        next_page_token=str(next_offset) if next_offset < len(items) else '',
+        **{field: items[offset:next_offset]},
+    )
+
+
+ZONE_NAMES = generate_zone_names(ZONES)
+
+
+@pytest.fixture()
+def disable_sdk(monkeypatch):
+    monkeypatch.setattr(yandexcloud, 'SDK', StubSDK)
+
+
+@pytest.mark.parametrize('size', SOURCE_SIZES)
+def test_cdn_populate(benchmark, disable_sdk, monkeypatch, size):
+    resources = generate_cdn_resources(size, ZONE_NAMES)
+    # Hostnames outside of the zones aren't populated
+    expected = sum(
+        1 + len(e.secondary_hostnames)
+        for e in resources
+        if not e.cname.endswith('.example.org')
+    )
+
+    def _populate_all():
+        source = YandexCloudCDNSource(
+            'bench', folder_id=STUB_FOLDER_ID, auth_type=AUTH_TYPE_METADATA
+        )
+        monkeypatch.setattr(
+            source.cdn_service,
+            'List',
+            lambda req: _paged(
+                resources, req, 'resources', ListResourcesResponse
+            ),
+        )
+        monkeypatch.setattr(
+            source.cdn_service,
+            'GetProviderCName',
+            lambda req: GetProviderCNameResponse(cname='cdn.yandex.net.'),
+        )
+
+        records = 0
+        for zone_name in ZONE_NAMES:
+            zone = Zone(zone_name, [])
+            source.populate(zone)
+            records += len(zone.records)
+        return records
+
+    assert benchmark.pedantic(_populate_all, rounds=3) == expected
+
+
+@pytest.mark.parametrize('size', SOURCE_SIZES)
+def test_cm_populate(benchmark, disable_sdk, monkeypatch, size):
+    certificates = {e.id: e for e in generate_certificates(size, ZONE_NAMES)}
+    # A CNAME per domain of managed certificates inside of the zones,
+    # domain and its wildcard share the same challenge record
+    expected = len(
+        {
+            c.dns_challenge.name
+            for e in certificates.values()
+            if e.type == CertificateType.MANAGED
+            and not e.domains[0].endswith('.example.org')
+            for c in e.challenges
+            if c.dns_challenge.type == 'CNAME'
+        }
+    )
+    basic = []
+    for cert in certificates.values():
+        cert = cert.__deepcopy__()
+        cert.ClearField('challenges')
+        basic.append(cert)
+
+    def _populate_all():
+        source = YandexCloudCMSource(
+            'bench', folder_id=STUB_FOLDER_ID, auth_type=AUTH_TYPE_METADATA
+        )
+        monkeypatch.setattr(
+            source.cm_service,
+            'List',
+            lambda req: _paged(
+                basic, req, 'certificates', ListCertificatesResponse
+            ),
+        )
+        monkeypatch.setattr(
+            source.cm_service,
+            'Get',
+            lambda req: certificates[req.certificate_id],
+        )
+
+        records = 0
+        for zone_name in ZONE_NAMES:
+            zone = Zone(zone_name, [])
+            source.populate(zone)
+            records += len(zone.records)
+        return records
+
+    assert benchmark.pedantic(_populate_all, rounds=3) == expected
@@ -0,0 +1,77 @@
+import pytest
+
+from octodns.provider.plan import Plan
+from octodns.record import Create
+from octodns.zone import Zone
+
+from benchmarks.conftest import rounds
+from octodns_yandex import Yandex360Provider
+from octodns_yandex.yandex360_provider import map_entries_to_records
+from tests.fixtures import STUB_ZONE_NAME
+from tests.fixtures.generator import generate_entries
+
+pytestmark = pytest.mark.benchmark(group='yandex360')
+
+DOMAIN = STUB_ZONE_NAME.rstrip('.')
+
+
+def _make_provider(server):
+    provider = Yandex360Provider('bench', server.token)
+    provider.API_BASE = server.url
+    return provider
+
+
+def _new_name(name):
+    # Prefixes the leftmost label which isn't a service or protocol one,
+    # underscored labels of SRV and similar names must stay first
+    labels = [] if name == '@' else name.split('.')
+    for i, label in enumerate(labels):
+        if not label.startswith('_'):
+            labels[i] = f'new-{label}'
+            return '.'.join(labels)
+    return '.'.join(labels + ['new'])
+
+
+def test_populate(benchmark, ya360_server, size):
+    ya360_server.state.add_records(1, DOMAIN, generate_entries(size))
+    provider = _make_provider(ya360_server)
+
+    def _populate():
+        zone = Zone(STUB_ZONE_NAME, [])
+        provider.populate(zone)
+        return zone
+
+    zone = benchmark.pedantic(_populate, rounds=rounds(size))
+    assert len(zone.records) == size
+
+
+def test_apply(benchmark, ya360_server, size):
+    # Every change is a separate request, so 1% of the zone is changed
+    entries = generate_entries(size)
+    ya360_server.state.add_records(1, DOMAIN, entries)
+    provider = _make_provider(ya360_server)
+
+    zone = Zone(STUB_ZONE_NAME, [])
+    new_entries = [
+        {**e, 'name': _new_name(e['name'])}
+        for e in generate_entries(size // 100, seed=1)
+    ]
+    new_names = {e['name'] for e in new_entries}
+    changes = [
+        Create(e)
+        for e in map_entries_to_records(None, zone, False, new_entries)
+    ]
+    plan = Plan(existing=None, desired=zone, changes=changes, exists=True)
+
+    def _setup():
+        records = ya360_server.state.records[(1, DOMAIN)]
+        for record_id, entry in list(records.items()):
+            if entry['name'] in new_names:
+                del records[record_id]
+
+    benchmark.pedantic(
+        provider._apply, args=(plan,), setup=_setup, rounds=rounds(size)
+    )
+    assert len(ya360_server.state.get_records(1, DOMAIN)) == len(entries) + len(
+        new_entries
+    )
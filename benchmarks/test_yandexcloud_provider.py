@@ -0,0 +1,54 @@
+import pytest
+
+from octodns.provider.plan import Plan
+from octodns.record import Create
+from octodns.zone import Zone
+
+from benchmarks.conftest import rounds
+from octodns_yandex import YandexCloudProvider
+from octodns_yandex.auth import AUTH_TYPE_METADATA
+from octodns_yandex.yandexcloud_provider import map_rset_to_octodns
+from tests.fixtures import STUB_FOLDER_ID, STUB_ZONE_NAME
+from tests.fixtures.generator import generate_record_sets
+
+pytestmark = pytest.mark.benchmark(group='yandexcloud')
+
+
+def _make_provider():
+    return YandexCloudProvider(
+        'bench', folder_id=STUB_FOLDER_ID, auth_type=AUTH_TYPE_METADATA
+    )
+
+
+def test_populate(benchmark, dns_server, size):
+    dns_zone = dns_server.state.add_zone(STUB_ZONE_NAME)
+    dns_server.state.add_record_sets(dns_zone.id, generate_record_sets(size))
+    provider = _make_provider()
+
+    def _populate():
+        zone = Zone(STUB_ZONE_NAME, [])
+        provider.populate(zone)
+        return zone
+
+    zone = benchmark.pedantic(_populate, rounds=rounds(size))
+    assert len(zone.records) == size
+
+
+def test_apply(benchmark, dns_server, size):
+    dns_zone = dns_server.state.add_zone(STUB_ZONE_NAME)
+    provider = _make_provider()
+
+    zone = Zone(STUB_ZONE_NAME, [])
+    changes = [
+        Create(map_rset_to_octodns(None, zone, False, e))
+        for e in generate_record_sets(size)
+    ]
+    plan = Plan(existing=None, desired=zone, changes=changes, exists=True)
+
+    def _setup():
+        dns_server.state.record_sets[dns_zone.id] = {}
+
+    benchmark.pedantic(
+        provider._apply, args=(plan,), setup=_setup, rounds=rounds(size)
+    )
+    assert len(dns_server.state.get_record_sets(dns_zone.id)) == size
@@ -7,6 +7,7 @@ from .yandex360_provider import Yandex360Provider
 from .yandexcloud_cdn_source import YandexCloudCDNSource
 from .yandexcloud_cm_source import YandexCloudCMSource
 from .yandexcloud_provider import YandexCloudProvider
+from .yandexcloud_snapshot_source import YandexCloudSnapshotSource
 
 __all__ = [
     'YandexCloudProvider',
@@ -14,6 +15,7 @@ __all__ = [
     'YandexCloudAnameRecord',
     'YandexCloudCMSource',
     'YandexCloudCDNSource',
+    'YandexCloudSnapshotSource',
 ]
 
 # quell warnings
@@ -0,0 +1,113 @@
+import grpc
+
+from octodns_yandex.exception import YandexCloudConfigException
+
+GRPC_COMPRESSION = {
+    'none': grpc.Compression.NoCompression,
+    'deflate': grpc.Compression.Deflate,
+    'gzip': grpc.Compression.Gzip,
+}
+
+
+def configure_stub(stub, compression=None, deadlines=None):
+    # Sets default compression and per-method deadline for calls of a gRPC
+    # stub in place. Explicitly passed arguments take precedence
+    deadlines = deadlines or {}
+
+    def _wrap(method, fn):
+        timeout = deadlines.get(method)
+
+        def call(request, *args, **kwargs):
+            if compression is not None:
+                kwargs.setdefault('compression', compression)
+            if timeout is not None:
+                kwargs.setdefault('timeout', timeout)
+            return fn(request, *args, **kwargs)
+
+        return call
+
+    for method, fn in list(vars(stub).items()):
+        if callable(fn):
+            setattr(stub, method, _wrap(method, fn))
+
+    return stub
+
+
+class _ChannelMixin(object):
+    grpc_compression = None
+    grpc_channel_options = ()
+    grpc_deadlines = dict()
+
+    def init_channel(
+        self,
+        grpc_compression=None,
+        grpc_max_send_message_length=None,
+        grpc_max_receive_message_length=None,
+        grpc_keepalive_time=None,
+        grpc_keepalive_timeout=None,
+        grpc_deadlines=None,
+    ):
+        if grpc_compression is not None:
+            if grpc_compression not in GRPC_COMPRESSION:
+                raise YandexCloudConfigException(
+                    "Provider option 'grpc_compression' should be one of: "
+                    + ', '.join(GRPC_COMPRESSION.keys())
+                )
+            self.grpc_compression = GRPC_COMPRESSION[grpc_compression]
+
+        if grpc_deadlines is not None:
+            if not isinstance(grpc_deadlines, dict):
+                raise YandexCloudConfigException(
+                    "Provider option 'grpc_deadlines' should be dict of method name to seconds"
+                )
+            self.grpc_deadlines = grpc_deadlines
+
+        options = []
+        if grpc_max_send_message_length is not None:
+            options.append(
+                ('grpc.max_send_message_length', grpc_max_send_message_length)
+            )
+        if grpc_max_receive_message_length is not None:
+            options.append(
+                (
+                    'grpc.max_receive_message_length',
+                    grpc_max_receive_message_length,
+                )
+            )
+        if grpc_keepalive_time is not None:
+            # Pings are sent between calls too, so idle connections survive
+            options += [
+                ('grpc.keepalive_time_ms', int(grpc_keepalive_time * 1000)),
+                ('grpc.keepalive_permit_without_calls', 1),
+                ('grpc.http2.max_pings_without_data', 0),
+            ]
+        if grpc_keepalive_timeout is not None:
+            options.append(
+                (
+                    'grpc.keepalive_timeout_ms',
+                    int(grpc_keepalive_timeout * 1000),
+                )
+            )
+        self.grpc_channel_options = tuple(options)
+
+    def configure_sdk(self, sdk):
+        # yandexcloud.SDK doesn't accept channel options, so they are
+        # appended to ones used by its channels factory
+        if not self.grpc_channel_options:
+            return sdk
+        channels = getattr(sdk, '_channels', None)
+        channel_options = getattr(channels, 'channel_options', None)
+        if not callable(channel_options):
+            raise YandexCloudConfigException(
+                "Provider options 'grpc_max_*' and 'grpc_keepalive_*' "
+                "are not supported by installed yandexcloud"
+            )
+        channels.channel_options = (
+            lambda: channel_options() + self.grpc_channel_options
+        )
+        return sdk
+
+    def configure_stub(self, stub):
+        if self.grpc_compression is None and not self.grpc_deadlines:
+            return stub
+        return configure_stub(stub, self.grpc_compression, self.grpc_deadlines)
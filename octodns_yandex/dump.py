@@ -0,0 +1,153 @@
+import logging
+import os
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+
+from octodns.provider.plan import Plan
+from octodns.provider.yaml import YamlProvider
+from octodns.zone import Zone
+
+from octodns_yandex.auth import (
+    AUTH_TYPE_IAM,
+    AUTH_TYPE_METADATA,
+    AUTH_TYPE_OAUTH,
+    AUTH_TYPE_SA_KEY,
+    AUTH_TYPE_YC_CLI,
+)
+from octodns_yandex.exception import YandexCloudException
+from octodns_yandex.yandexcloud_provider import YandexCloudProvider
+
+# octodns-yandex-dump: exports every zone of Yandex Cloud folders to YAML
+# files in octodns format. Zones are downloaded concurrently and each one is
+# written as soon as it is populated, so memory use is bounded by the number
+# of workers rather than the size of the folder
+
+_log = getLogger('YandexDump')
+
+
+def make_parser():
+    parser = ArgumentParser(
+        prog='octodns-yandex-dump',
+        description='Export all DNS zones of Yandex Cloud folders to octoDNS YAML files',
+    )
+    parser.add_argument(
+        '--output-dir', required=True, help='Directory to write zone files to'
+    )
+    parser.add_argument(
+        '--folder-id',
+        action='append',
+        dest='folder_ids',
+        help='Folder id to export, could be repeated',
+    )
+    parser.add_argument('--cloud-id', help='Export all folders of the cloud')
+    parser.add_argument(
+        '--zone',
+        action='append',
+        dest='zones',
+        help='Export only this zone, could be repeated',
+    )
+    parser.add_argument(
+        '--auth-type',
+        default=AUTH_TYPE_METADATA,
+        choices=(
+            AUTH_TYPE_OAUTH,
+            AUTH_TYPE_IAM,
+            AUTH_TYPE_METADATA,
+            AUTH_TYPE_SA_KEY,
+            AUTH_TYPE_YC_CLI,
+        ),
+    )
+    parser.add_argument(
+        '--oauth-token',
+        default=os.environ.get('YC_TOKEN'),
+        help='Defaults to YC_TOKEN environment variable',
+    )
+    parser.add_argument(
+        '--iam-token',
+        default=os.environ.get('YC_IAM_TOKEN'),
+        help='Defaults to YC_IAM_TOKEN environment variable',
+    )
+    parser.add_argument('--sa-key-file')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Number of zones downloaded concurrently',
+    )
+    parser.add_argument(
+        '--lenient', action='store_true', help='Ignore record validation errors'
+    )
+    parser.add_argument('--debug', action='store_true')
+    return parser
+
+
+def dump_zone(provider, output_dir, zone_name, lenient=False):
+    zone = Zone(zone_name, [])
+    if not provider.populate(zone, lenient=lenient):
+        # Nothing is written, an empty file would look like an empty zone
+        raise YandexCloudException(f'Zone {zone_name} not found')
+
+    # Same as octodns-dump does with its YamlProvider target
+    target = YamlProvider('dump', output_dir, supports_root_ns=True)
+    plan = target.plan(zone)
+    if plan is None:
+        plan = Plan(zone, zone, [], False)
+    target.apply(plan)
+
+    _log.info('Dumped %d records of %s', len(zone.records), zone_name)
+    return len(zone.records)
+
+
+def dump(provider, output_dir, zone_names=None, workers=8, lenient=False):
+    # Returns names of the zones which failed to export
+    if not zone_names:
+        zone_names = provider.list_zones()
+    os.makedirs(output_dir, exist_ok=True)
+
+    def _dump(zone_name):
+        try:
+            dump_zone(provider, output_dir, zone_name, lenient)
+        except Exception:
+            _log.exception('Failed to dump %s', zone_name)
+            return zone_name
+        return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        failed = [e for e in executor.map(_dump, zone_names) if e is not None]
+
+    _log.info(
+        'Dumped %d of %d zones to %s',
+        len(zone_names) - len(failed),
+        len(zone_names),
+        output_dir,
+    )
+    return failed
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format='%(asctime)s [%(thread)d] %(levelname)-5s %(name)s %(message)s',
+    )
+
+    provider = YandexCloudProvider(
+        'dump',
+        folder_ids=args.folder_ids,
+        cloud_id=args.cloud_id,
+        auth_type=args.auth_type,
+        oauth_token=args.oauth_token,
+        iam_token=args.iam_token,
+        sa_key_file=args.sa_key_file,
+        max_workers=args.workers,
+    )
+    zone_names = [e if e.endswith('.') else f'{e}.' for e in args.zones or []]
+
+    failed = dump(
+        provider, args.output_dir, zone_names, args.workers, args.lenient
+    )
+    if failed:
+        _log.error('Failed zones: %s', ', '.join(failed))
+        return 1
+    return 0
@@ -0,0 +1,43 @@
+# Estimated API cost of applying a plan: number of calls per method and
+# approximate size of sent payloads. Providers compute it with the same
+# chunking and diff logic their _apply uses
+class ApiCostEstimate(object):
+    def __init__(self, calls, request_bytes=0):
+        self.calls = {k: v for k, v in calls.items() if v}
+        self.request_bytes = request_bytes
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+    def __str__(self):
+        calls = ', '.join(f'{k}={v}' for k, v in self.calls.items())
+        return (
+            f"calls={self.total} ({calls or 'none'}), "
+            f"payload~{self.request_bytes}B"
+        )
+
+
+class _EstimateMixin(object):
+    plan_api_calls_warning = 100
+
+    def init_estimate(self, plan_api_calls_warning=100):
+        self.plan_api_calls_warning = plan_api_calls_warning
+
+    def plan(self, desired, *args, **kwargs):
+        plan = super().plan(desired, *args, **kwargs)
+        if plan is None:
+            return plan
+
+        # Available to processors and plan outputs, estimate_cost is
+        # implemented by providers
+        plan.estimate = self.estimate_cost(plan)
+        threshold = self.plan_api_calls_warning
+        if threshold and plan.estimate.total >= threshold:
+            self.log.warning(
+                'plan:   estimated API cost: %s, may hit API rate limits',
+                plan.estimate,
+            )
+        else:
+            self.log.info('plan:   estimated API cost: %s', plan.estimate)
+        return plan
@@ -0,0 +1,71 @@
+from fnmatch import fnmatchcase
+
+from octodns_yandex.exception import YandexCloudConfigException
+
+
+def _has_wildcard(pattern):
+    return any(e in pattern for e in '*?[')
+
+
+def _quote(values):
+    return ', '.join(f'"{e}"' for e in values)
+
+
+# Limits record sets to managed names and types. Names are hostnames
+# relative to the zone ('' is the zone root) or shell-style patterns like
+# '_acme-challenge.*'. API filters support only exact values, so names are
+# filtered server-side only when none of them is a pattern, otherwise they
+# are matched before mapping
+class RecordSetFilter(object):
+    def __init__(self, names=None, types=None):
+        if names is not None and not isinstance(names, list):
+            raise YandexCloudConfigException(
+                "Provider option 'managed_names' should be a list"
+            )
+        if types is not None and not isinstance(types, list):
+            raise YandexCloudConfigException(
+                "Provider option 'managed_types' should be a list"
+            )
+
+        self.names = [e.lower() for e in names or []]
+        self.types = [e.upper() for e in types or []]
+        self.patterns = any(_has_wildcard(e) for e in self.names)
+
+    def __bool__(self):
+        return bool(self.names or self.types)
+
+    @staticmethod
+    def fqdn(name, zone_name):
+        return f'{name}.{zone_name}' if name else zone_name
+
+    def expression(self, zone_name):
+        conditions = []
+        if self.names and not self.patterns:
+            fqdns = [self.fqdn(e, zone_name) for e in self.names]
+            conditions.append(f'name IN ({_quote(fqdns)})')
+        if self.types:
+            conditions.append(f'type IN ({_quote(self.types)})')
+        return ' AND '.join(conditions)
+
+    def match_name(self, name):
+        if not self.names:
+            return True
+        return any(fnmatchcase(name, e) for e in self.names)
+
+    def match_type(self, _type):
+        # Custom types are registered as 'Provider/TYPE'
+        return not self.types or _type.split('/')[-1] in self.types
+
+    def match(self, name, _type):
+        return self.match_type(_type) and self.match_name(name)
+
+    def omit_unmanaged(self, provider, desired):
+        # Records outside of managed names and types are not populated,
+        # so they can't be planned either
+        for record in desired.records:
+            if not self.match(record.name, record._type):
+                provider.supports_warn_or_except(
+                    f'{record._type} {record.fqdn} is not managed',
+                    'omitting record',
+                )
+                desired.remove_record(record)
@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from yandex.cloud.resourcemanager.v1.folder_service_pb2 import (
+    ListFoldersRequest,
+)
+from yandex.cloud.resourcemanager.v1.folder_service_pb2_grpc import (
+    FolderServiceStub,
+)
+
+from octodns_yandex.exception import YandexCloudConfigException
+from octodns_yandex.metrics import in_context, instrument_stub
+from octodns_yandex.pagination import Paginator
+
+
+class _FolderMixin(object):
+    cloud_id = None
+    folder_ids = None
+    max_workers = 4
+    list_timeout = None
+
+    def init_folders(self, folder_id, folder_ids, cloud_id, max_workers):
+        if folder_ids is not None and not isinstance(folder_ids, list):
+            raise YandexCloudConfigException(
+                "Provider option 'folder_ids' should be a list"
+            )
+        ids = [folder_id] if folder_id else []
+        if folder_ids:
+            ids += [e for e in folder_ids if e not in ids]
+
+        if ids and cloud_id:
+            raise YandexCloudConfigException(
+                "Provider options 'folder_id'/'folder_ids' and 'cloud_id' are mutually exclusive"
+            )
+        if not ids and not cloud_id:
+            raise YandexCloudConfigException(
+                "One of provider options 'folder_id', 'folder_ids' or 'cloud_id' is required"
+            )
+
+        # Folders of the cloud are discovered on first use
+        self.folder_ids = ids or None
+        self.cloud_id = cloud_id
+        self.max_workers = max_workers
+        self._folders_lock = threading.Lock()
+
+    def list_cloud_folders(self):
+        folder_service = instrument_stub(
+            self.sdk.client(FolderServiceStub), 'resourcemanager'
+        )
+        pages = Paginator(
+            folder_service.List,
+            ListFoldersRequest(cloud_id=self.cloud_id),
+            'folders',
+            timeout=self.list_timeout,
+        )
+        return [e.id for e in pages]
+
+    def get_folder_ids(self):
+        if self.folder_ids is not None:
+            return self.folder_ids
+
+        # Zones are populated in parallel, folders are listed only once
+        with self._folders_lock:
+            if self.folder_ids is None:
+                folder_ids = self.list_cloud_folders()
+                self.log.info(
+                    'get_folder_ids: Found %d folders in cloud_id=%s',
+                    len(folder_ids),
+                    self.cloud_id,
+                )
+                self.folder_ids = folder_ids
+        return self.folder_ids
+
+    def map_folders(self, fn):
+        # Calls fn for each folder concurrently. All calls share SDK channels
+        folder_ids = self.get_folder_ids()
+        if len(folder_ids) == 1:
+            return [fn(folder_ids[0])]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(in_context(fn), folder_ids))
@@ -0,0 +1,34 @@
+from bisect import bisect_left
+
+
+def suffix_key(fqdn):
+    # 'cdn.example.com.' -> 'com.example.cdn.', so every name inside a zone
+    # shares the zone's key as a prefix
+    labels = fqdn.rstrip('.').split('.')
+    return '.'.join(reversed(labels)) + '.'
+
+
+# Sorted index of (fqdn, value) pairs by reversed labels.
+# Names belonging to a zone form a contiguous range of the index,
+# so lookup costs O(log n) plus the number of matches
+class SuffixIndex(object):
+    def __init__(self, items=()):
+        entries = []
+        for fqdn, value in items:
+            if fqdn[-1] != '.':
+                fqdn = f'{fqdn}.'
+            entries.append((suffix_key(fqdn), fqdn, value))
+        entries.sort(key=lambda e: e[0])
+
+        self._keys = [e[0] for e in entries]
+        self._entries = [(e[1], e[2]) for e in entries]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def find(self, zone_name):
+        prefix = suffix_key(zone_name)
+        for i in range(bisect_left(self._keys, prefix), len(self._keys)):
+            if not self._keys[i].startswith(prefix):
+                break
+            yield self._entries[i]
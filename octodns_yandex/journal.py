@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from octodns.provider.plan import Plan
+from octodns.record import Create, Delete, Record, Update
+from octodns.zone import Zone
+
+from octodns_yandex.exception import YandexCloudException
+
+
+def zone_fingerprint(zone):
+    digest = hashlib.sha256()
+    for line in sorted(repr(e) for e in zone.records):
+        digest.update(line.encode())
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def _record_data(record):
+    if record is None:
+        return None
+    return {'name': record.name, 'type': record._type, **record.data}
+
+
+def _make_record(zone, data):
+    if data is None:
+        return None
+    data = dict(data)
+    name = data.pop('name')
+    return Record.new(zone, name, data, lenient=True)
+
+
+def _make_change(existing, new):
+    if existing is None:
+        return Create(new)
+    elif new is None:
+        return Delete(existing)
+    return Update(existing, new)
+
+
+# Journal of an apply: the first line has the key of the desired zone, the
+# existing zone and changes of the plan, each next one marks a step (chunk or
+# change) as started, with an operation id if there is one, or done. It is
+# removed when the apply succeeds, so an interrupted apply could be resumed
+# without populating and planning the zone again
+class ApplyJournal(object):
+    def __init__(
+        self,
+        path,
+        key,
+        changes,
+        existing=None,
+        exists=True,
+        created=None,
+        done=None,
+        started=None,
+        resumed=None,
+    ):
+        self.path = path
+        self.key = key
+        self.changes = changes
+        self.existing = existing
+        self.exists = exists
+        self.created = time.time() if created is None else created
+        self.done = done or set()
+        # Steps which are started but not confirmed, step -> operation id
+        self.started = started or {}
+        # Steps left started by the interrupted apply, None if not resumed
+        self.resumed = resumed
+        self._fh = None
+
+    @classmethod
+    def create(cls, path, key, changes, existing, exists=True):
+        # Header is written atomically, steps are appended
+        journal = cls(path, key, changes, existing, exists)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as fh:
+            header = {
+                'key': key,
+                'created': journal.created,
+                'exists': exists,
+                'existing': [_record_data(e) for e in existing.records],
+                'changes': [
+                    [_record_data(e.existing), _record_data(e.new)]
+                    for e in changes
+                ],
+            }
+            fh.write(json.dumps(header) + '\n')
+        os.replace(tmp_path, path)
+        return journal
+
+    @classmethod
+    def load(cls, path, zone):
+        if not os.path.exists(path):
+            return None
+        with open(path) as fh:
+            lines = fh.read().splitlines()
+
+        try:
+            header = json.loads(lines[0])
+            key = header['key']
+            created = float(header['created'])
+            exists = bool(header['exists'])
+            existing = Zone(zone.name, zone.sub_zones)
+            for data in header['existing']:
+                existing.add_record(_make_record(existing, data), lenient=True)
+            changes = [
+                _make_change(_make_record(zone, e[0]), _make_record(zone, e[1]))
+                for e in header['changes']
+            ]
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            raise YandexCloudException(f'Invalid apply journal: {path}') from e
+
+        done, started = set(), {}
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The last line is incomplete if the process was killed
+                break
+            step = entry['step']
+            if entry.get('done'):
+                done.add(step)
+                started.pop(step, None)
+            else:
+                started[step] = entry.get('operation')
+        return cls(
+            path,
+            key,
+            changes,
+            existing,
+            exists,
+            created,
+            done,
+            started,
+            resumed=set(started),
+        )
+
+    @property
+    def age(self):
+        return time.time() - self.created
+
+    @property
+    def trusted(self):
+        # A resumed apply which failed on a step the interrupted one hadn't
+        # started could have hit changes made since, it's not resumed again
+        return self.resumed is None or set(self.started) <= self.resumed
+
+    def open(self):
+        self._fh = open(self.path, 'a')
+        return self
+
+    def close(self, success):
+        self._fh.close()
+        if success or not self.trusted:
+            os.remove(self.path)
+
+    def _write(self, entry):
+        self._fh.write(json.dumps(entry) + '\n')
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def start(self, step, operation=None):
+        self.started[step] = operation
+        self._write({'step': step, 'operation': operation})
+
+    def finish(self, step):
+        self.done.add(step)
+        self.started.pop(step, None)
+        self._write({'step': step, 'done': True})
+
+
+class _JournalMixin(object):
+    journal_dir = None
+    journal_max_age = 3600
+
+    def init_journal(self, journal_dir=None, journal_max_age=None):
+        self.journal_dir = journal_dir
+        if journal_max_age is not None:
+            self.journal_max_age = journal_max_age
+
+    def journal_path(self, zone_name):
+        return os.path.join(self.journal_dir, f'{zone_name}journal')
+
+    def load_journal(self, desired, key):
+        # Returns the journal of an interrupted apply of the same config, an
+        # untrusted one is removed and the zone is planned as usual
+        path = self.journal_path(desired.name)
+        try:
+            journal = ApplyJournal.load(path, desired)
+        except YandexCloudException as e:
+            self.log.warning('load_journal: %s', e)
+            os.remove(path)
+            return None
+
+        if journal is None:
+            return None
+        elif journal.key != key:
+            self.log.info(
+                'load_journal: %s is of another config, ignored',
+                desired.decoded_name,
+            )
+        elif journal.age > self.journal_max_age:
+            self.log.warning(
+                'load_journal: %s is older than %ss, ignored',
+                desired.decoded_name,
+                self.journal_max_age,
+            )
+        else:
+            return journal
+        os.remove(path)
+        return None
+
+    def plan(self, desired, *args, **kwargs):
+        if not self.journal_dir:
+            return super().plan(desired, *args, **kwargs)
+
+        key = zone_fingerprint(desired)
+        journal = self.load_journal(desired, key)
+        if journal is not None:
+            # Same config as the interrupted apply, its plan is reused as is,
+            # so are safety checks against the zone it was planned from
+            self.log.info(
+                'plan: resuming apply of %s from journal, %d steps done',
+                desired.decoded_name,
+                len(journal.done),
+            )
+            plan = Plan(
+                journal.existing,
+                self._process_desired_zone(desired.copy()),
+                journal.changes,
+                journal.exists,
+                self.update_pcent_threshold,
+                self.delete_pcent_threshold,
+            )
+            plan.journal = journal
+        else:
+            plan = super().plan(desired, *args, **kwargs)
+
+        if plan is not None:
+            plan.journal_key = key
+        return plan
+
+    @contextmanager
+    def journaled(self, plan):
+        # Yields None if journal is disabled or the plan is not made by
+        # plan(). Journal is removed if the block succeeds or a resumed
+        # apply can't be trusted anymore
+        key = getattr(plan, 'journal_key', None)
+        if not self.journal_dir or key is None:
+            yield None
+            return
+
+        journal = getattr(plan, 'journal', None)
+        if journal is None:
+            journal = ApplyJournal.create(
+                self.journal_path(plan.desired.name),
+                key,
+                plan.changes,
+                plan.existing,
+                plan.exists,
+            )
+        journal.open()
+        success = False
+        try:
+            yield journal
+            success = True
+        finally:
+            journal.close(success)
@@ -0,0 +1,243 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from logging import getLogger
+from types import SimpleNamespace
+
+from octodns_yandex.ratelimit import LIMITS
+
+# Zone being populated or applied, used as a label of API calls.
+# Thread pools should run functions wrapped with in_context to keep it
+_zone = ContextVar('octodns_yandex_zone', default='')
+
+
+@contextmanager
+def zone_context(zone_name):
+    token = _zone.set(zone_name)
+    try:
+        yield
+    finally:
+        _zone.reset(token)
+
+
+def in_context(fn):
+    # Runs fn in a copy of the context of the caller (e.g. in pool threads)
+    ctx = copy_context()
+
+    def run(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def _format_float(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+class _Series(object):
+    def __init__(self, buckets):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.buckets = [0] * len(buckets)
+
+
+# Counts calls, errors, latency histogram and transferred bytes of API
+# calls labeled by api, method and zone
+class Metrics(object):
+    PREFIX = 'octodns_yandex'
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self):
+        self.log = getLogger('YandexMetrics')
+        self.lock = threading.Lock()
+        self.series = {}
+        self.textfiles = set()
+
+    def reset(self):
+        with self.lock:
+            self.series = {}
+
+    def observe(
+        self,
+        api,
+        method,
+        seconds,
+        request_bytes=0,
+        response_bytes=0,
+        error=False,
+        zone=None,
+    ):
+        key = (api, method, _zone.get() if zone is None else zone)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = _Series(self.BUCKETS)
+
+            series.calls += 1
+            series.errors += int(error)
+            series.seconds += seconds
+            series.request_bytes += request_bytes
+            series.response_bytes += response_bytes
+            for i, le in enumerate(self.BUCKETS):
+                if seconds <= le:
+                    series.buckets[i] += 1
+
+    @contextmanager
+    def measure(self, api, method):
+        # Sizes could be set on the yielded sample by the caller
+        sample = SimpleNamespace(request_bytes=0, response_bytes=0)
+        error = True
+        start = time.perf_counter()
+        try:
+            yield sample
+            error = False
+        finally:
+            self.observe(
+                api,
+                method,
+                time.perf_counter() - start,
+                sample.request_bytes,
+                sample.response_bytes,
+                error,
+            )
+
+    def summary(self):
+        # Totals per api and method, zones are merged
+        totals = {}
+        with self.lock:
+            for (api, method, _), series in sorted(self.series.items()):
+                total = totals.setdefault(f'{api}.{method}', [0, 0, 0.0, 0, 0])
+                total[0] += series.calls
+                total[1] += series.errors
+                total[2] += series.seconds
+                total[3] += series.request_bytes
+                total[4] += series.response_bytes
+
+        return ', '.join(
+            f'{name}: calls={calls} errors={errors} time={seconds:.3f}s '
+            f'sent={sent} received={received}'
+            for name, (calls, errors, seconds, sent, received) in totals.items()
+        )
+
+    def to_prometheus(self):
+        prefix = self.PREFIX
+        counters = (
+            ('requests_total', 'Number of API calls', 'calls'),
+            ('errors_total', 'Number of failed API calls', 'errors'),
+            ('request_bytes_total', 'Bytes sent in API calls', 'request_bytes'),
+            (
+                'response_bytes_total',
+                'Bytes received in API calls',
+                'response_bytes',
+            ),
+        )
+
+        with self.lock:
+            items = [
+                (
+                    f'api="{_escape(api)}",method="{_escape(method)}",'
+                    f'zone="{_escape(zone)}"',
+                    series,
+                )
+                for (api, method, zone), series in sorted(self.series.items())
+            ]
+
+            lines = []
+            for name, help, field in counters:
+                lines.append(f'# HELP {prefix}_{name} {help}')
+                lines.append(f'# TYPE {prefix}_{name} counter')
+                for labels, series in items:
+                    lines.append(
+                        f'{prefix}_{name}{{{labels}}} {getattr(series, field)}'
+                    )
+
+            name = f'{prefix}_request_duration_seconds'
+            lines.append(f'# HELP {name} Duration of API calls')
+            lines.append(f'# TYPE {name} histogram')
+            for labels, series in items:
+                for le, count in zip(
+                    self.BUCKETS + (float('inf'),),
+                    series.buckets + [series.calls],
+                ):
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="{_format_float(le)}"}} '
+                        f'{count}'
+                    )
+                lines.append(
+                    f'{name}_sum{{{labels}}} {_format_float(series.seconds)}'
+                )
+                lines.append(f'{name}_count{{{labels}}} {series.calls}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        # Written atomically, as expected by node_exporter textfile collector
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as fh:
+            fh.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def report(self):
+        if not self.series:
+            return
+
+        self.log.info('summary: %s', self.summary())
+        for path in sorted(self.textfiles):
+            try:
+                self.write_textfile(path)
+            except OSError as e:
+                self.log.warning('report: Failed to write %s: %s', path, e)
+
+
+# Shared by all providers and sources, reported once on exit
+METRICS = Metrics()
+atexit.register(METRICS.report)
+
+
+def _byte_size(message):
+    return message.ByteSize() if hasattr(message, 'ByteSize') else 0
+
+
+def instrument_stub(stub, api, metrics=METRICS, limits=LIMITS):
+    # Replaces methods of a gRPC stub with rate limited and measured ones
+    # in place
+    def _wrap(method, fn):
+        def call(request, *args, **kwargs):
+            with limits.limit(api, method), metrics.measure(
+                api, method
+            ) as sample:
+                sample.request_bytes = _byte_size(request)
+                response = fn(request, *args, **kwargs)
+                sample.response_bytes = _byte_size(response)
+            return response
+
+        return call
+
+    for method, fn in list(vars(stub).items()):
+        if callable(fn):
+            setattr(stub, method, _wrap(method, fn))
+
+    return stub
+
+
+class _MetricsMixin(object):
+    metrics = METRICS
+
+    def init_metrics(self, metrics_textfile=None):
+        if metrics_textfile:
+            self.metrics.textfiles.add(metrics_textfile)
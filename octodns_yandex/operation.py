@@ -0,0 +1,70 @@
+import time
+
+from yandex.cloud.operation.operation_service_pb2 import GetOperationRequest
+
+from octodns_yandex.exception import YandexCloudException
+
+
+# Waits for Yandex Cloud operations by polling OperationService.Get.
+# First check is quick, as small changes are usually done in milliseconds,
+# then the delay grows exponentially up to max_delay. Number of waited
+# operations, polls and total wait time are counted
+class OperationWaiter(object):
+    def __init__(
+        self,
+        operation_service,
+        initial_delay=0.05,
+        max_delay=2.0,
+        multiplier=2.0,
+        timeout=600,
+    ):
+        self.operation_service = operation_service
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.timeout = timeout
+
+        self.operations = 0
+        self.polls = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        return (
+            f"operations={self.operations}, polls={self.polls}, "
+            f"waited={self.seconds:.3f}s"
+        )
+
+    def delays(self):
+        delay = self.initial_delay
+        while True:
+            yield delay
+            delay = min(delay * self.multiplier, self.max_delay)
+
+    def wait(self, operation, on_poll=None):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        delays = self.delays()
+        try:
+            while not operation.done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise YandexCloudException(
+                        f"Operation {operation.id} is not done in {self.timeout}s"
+                    )
+                time.sleep(min(next(delays), remaining))
+                operation = self.operation_service.Get(
+                    GetOperationRequest(operation_id=operation.id)
+                )
+                self.polls += 1
+                if on_poll is not None:
+                    on_poll()
+        finally:
+            self.operations += 1
+            self.seconds += time.monotonic() - start
+
+        if operation.HasField('error'):
+            raise YandexCloudException(
+                f"Operation {operation.id} failed: "
+                f"code={operation.error.code}, message={operation.error.message}"
+            )
+        return operation
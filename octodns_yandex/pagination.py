@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from octodns_yandex.metrics import in_context
+from octodns_yandex.retry import resilient
+from octodns_yandex.tracing import set_attributes, span
+
+
+# Iterates over items of a paged List* method of Yandex Cloud API.
+# While the current page is being consumed, the next one is requested
+# in background. Failed pages are retried and slow ones are hedged, when
+# retry budget and hedger are given, so listing resumes from the failed
+# page. Number of fetched pages, items and bytes is counted
+class Paginator(object):
+    def __init__(
+        self,
+        method,
+        request,
+        items_field,
+        timeout=None,
+        prefetch=True,
+        retry=None,
+        hedger=None,
+    ):
+        self.method = resilient(method, retry, hedger)
+        self.request = request
+        self.items_field = items_field
+        self.timeout = timeout
+        self.prefetch = prefetch
+
+        self.pages = 0
+        self.items = 0
+        self.bytes = 0
+
+    def __str__(self):
+        return f"pages={self.pages}, items={self.items}, bytes={self.bytes}"
+
+    def __iter__(self):
+        for resp in self.iter_pages():
+            yield from getattr(resp, self.items_field)
+
+    def _call(self, page_token):
+        request = type(self.request)()
+        request.CopyFrom(self.request)
+        request.page_token = page_token
+
+        with span(
+            'Paginator.page',
+            items_field=self.items_field,
+            page_token=page_token,
+        ) as current:
+            if self.timeout is None:
+                resp = self.method(request)
+            else:
+                resp = self.method(request, timeout=self.timeout)
+            set_attributes(current, items=len(getattr(resp, self.items_field)))
+        return resp
+
+    def _count(self, resp):
+        self.pages += 1
+        self.items += len(getattr(resp, self.items_field))
+        self.bytes += resp.ByteSize()
+
+    def iter_pages(self):
+        if not self.prefetch:
+            resp = self._call('')
+            self._count(resp)
+            yield resp
+            while resp.next_page_token:
+                resp = self._call(resp.next_page_token)
+                self._count(resp)
+                yield resp
+            return
+
+        call = in_context(self._call)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            resp = self._call('')
+            while resp is not None:
+                future = None
+                if resp.next_page_token:
+                    future = executor.submit(call, resp.next_page_token)
+
+                self._count(resp)
+                yield resp
+
+                resp = future.result() if future is not None else None
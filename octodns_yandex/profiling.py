@@ -0,0 +1,117 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import tracemalloc
+from datetime import datetime
+from logging import getLogger
+
+from octodns.provider.plan import Plan
+
+# OCTODNS_YANDEX_PROFILE=cpu|memory profiles populate and apply of each zone
+# with cProfile or tracemalloc. Reports are written to
+# OCTODNS_YANDEX_PROFILE_DIR (current directory by default)
+PROFILE_ENV = 'OCTODNS_YANDEX_PROFILE'
+PROFILE_DIR_ENV = 'OCTODNS_YANDEX_PROFILE_DIR'
+PROFILE_MODES = ('cpu', 'memory')
+
+_log = getLogger('YandexProfile')
+
+
+def _report_path(provider_id, method, zone_name):
+    name = zone_name.rstrip('.').replace('/', '_') or 'root'
+    timestamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    return os.path.join(
+        os.environ.get(PROFILE_DIR_ENV, '.'),
+        f'{provider_id}-{method}-{name}-{timestamp}',
+    )
+
+
+def _header(provider_id, method, mode, zone, subject):
+    lines = [
+        f'provider: {provider_id}',
+        f'method: {method}',
+        f'mode: {mode}',
+        f'zone: {zone.name}',
+        f'records: {len(zone.records)}',
+    ]
+    if isinstance(subject, Plan):
+        lines.append(f'changes: {len(subject.changes)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _run_cpu(fn, *args, **kwargs):
+    profile = cProfile.Profile()
+    ret = profile.runcall(fn, *args, **kwargs)
+
+    def write(path, header):
+        profile.dump_stats(f'{path}.prof')
+        out = io.StringIO()
+        stats = pstats.Stats(profile, stream=out)
+        stats.sort_stats('cumulative').print_stats(50)
+        with open(f'{path}.txt', 'w') as fh:
+            fh.write(header)
+            fh.write(out.getvalue())
+
+    return ret, write
+
+
+def _run_memory(fn, *args, **kwargs):
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        ret = fn(*args, **kwargs)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    def write(path, header):
+        with open(f'{path}.txt', 'w') as fh:
+            fh.write(header)
+            fh.write(f'current: {current}\npeak: {peak}\n\n')
+            for stat in snapshot.statistics('lineno')[:50]:
+                fh.write(f'{stat}\n')
+
+    return ret, write
+
+
+def profiled(method):
+    # Profiles populate(zone, ...) or _apply(plan) of a provider or source
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, subject, *args, **kwargs):
+            mode = os.environ.get(PROFILE_ENV)
+            if not mode:
+                return fn(self, subject, *args, **kwargs)
+            if mode not in PROFILE_MODES:
+                _log.warning(
+                    'Unknown %s=%s, expected one of %s',
+                    PROFILE_ENV,
+                    mode,
+                    ', '.join(PROFILE_MODES),
+                )
+                return fn(self, subject, *args, **kwargs)
+
+            run = _run_cpu if mode == 'cpu' else _run_memory
+            ret, write = run(fn, self, subject, *args, **kwargs)
+
+            zone = subject.desired if isinstance(subject, Plan) else subject
+            path = _report_path(self.id, method, zone.name)
+            write(path, _header(self.id, method, mode, zone, subject))
+            _log.info(
+                '%s: %s profile of %s written to %s',
+                method,
+                mode,
+                zone.name,
+                path,
+            )
+
+            return ret
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,134 @@
+import importlib
+import time
+from datetime import datetime, timedelta
+
+from octodns_yandex.exception import YandexCloudConfigException
+
+
+def load_callback(callback):
+    # Callback could be configured as 'module.function' path in YAML config
+    if callback is None or callable(callback):
+        return callback
+    module_name, _, name = str(callback).rpartition('.')
+    try:
+        fn = getattr(importlib.import_module(module_name), name)
+    except (ImportError, AttributeError, ValueError) as e:
+        raise YandexCloudConfigException(
+            f"Provider option 'progress_callback' is not importable: {callback}"
+        ) from e
+    if not callable(fn):
+        raise YandexCloudConfigException(
+            f"Provider option 'progress_callback' is not callable: {callback}"
+        )
+    return fn
+
+
+# Tracks progress of an apply: steps (operations or API calls) done out of
+# the total, record sets per second, age of the current step and estimated
+# time left. Events are logged and passed to the callback at most once per
+# interval, the final one is always reported
+class ApplyProgress(object):
+    def __init__(
+        self, log, zone_name, steps, rsets, interval=10, callback=None
+    ):
+        self.log = log
+        self.zone_name = zone_name
+        self.steps = steps
+        self.rsets = rsets
+        self.interval = interval
+        self.callback = callback
+
+        self.steps_done = 0
+        self.rsets_done = 0
+        self.started = time.monotonic()
+        self.reported = self.started
+        self.step_started = None
+
+    def event(self):
+        now = time.monotonic()
+        elapsed = now - self.started
+        rate = self.rsets_done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.rsets_done >= self.rsets:
+            eta = 0.0
+        elif rate > 0:
+            eta = (self.rsets - self.rsets_done) / rate
+        return {
+            'zone': self.zone_name,
+            'steps_done': self.steps_done,
+            'steps': self.steps,
+            'rsets_done': self.rsets_done,
+            'rsets': self.rsets,
+            'elapsed': elapsed,
+            'rate': rate,
+            'step_age': (
+                now - self.step_started
+                if self.step_started is not None
+                else None
+            ),
+            'eta': eta,
+            'finished': self.steps_done >= self.steps,
+        }
+
+    def begin(self):
+        self.step_started = time.monotonic()
+        self.update()
+
+    def advance(self, rsets):
+        self.steps_done += 1
+        self.rsets_done += rsets
+        self.step_started = None
+        self.update()
+
+    def update(self):
+        # Called on every step and while waiting, reports periodically
+        if (
+            self.steps_done < self.steps
+            and time.monotonic() - self.reported < self.interval
+        ):
+            return
+        self.report()
+
+    def report(self):
+        self.reported = time.monotonic()
+        event = self.event()
+
+        step_age = event['step_age']
+        eta = event['eta']
+        self.log.info(
+            'apply progress: zone=%s steps=%d/%d rsets=%d/%d rate=%.1f/s '
+            'step_age=%s eta=%s',
+            event['zone'],
+            event['steps_done'],
+            event['steps'],
+            event['rsets_done'],
+            event['rsets'],
+            event['rate'],
+            f'{step_age:.1f}s' if step_age is not None else '-',
+            (
+                (datetime.now() + timedelta(seconds=eta)).strftime('%H:%M:%S')
+                if eta is not None
+                else '-'
+            ),
+        )
+        if self.callback is not None:
+            self.callback(event)
+
+
+class _ProgressMixin(object):
+    progress_interval = 10
+    progress_callback = None
+
+    def init_progress(self, progress_interval=10, progress_callback=None):
+        self.progress_interval = progress_interval
+        self.progress_callback = load_callback(progress_callback)
+
+    def make_progress(self, zone_name, steps, rsets):
+        return ApplyProgress(
+            self.log,
+            zone_name,
+            steps,
+            rsets,
+            self.progress_interval,
+            self.progress_callback,
+        )
@@ -0,0 +1,223 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from logging import getLogger
+from types import SimpleNamespace
+
+import grpc
+
+from octodns_yandex.exception import YandexCloudConfigException
+
+# Quotas are per account, so limits are shared by all providers and sources
+# of the process. APIs are limited separately
+LIMIT_APIS = (
+    'dns_read',
+    'dns_write',
+    'cm',
+    'cdn',
+    'resourcemanager',
+    'yandex360',
+)
+LIMIT_OPTIONS = ('rate', 'burst', 'concurrency')
+DNS_WRITE_METHODS = {'UpdateRecordSets', 'UpsertRecordSets'}
+
+
+def limit_api(api, method):
+    # Operations are polled by DNS clients only
+    if api in ('dns', 'operation'):
+        return 'dns_write' if method in DNS_WRITE_METHODS else 'dns_read'
+    return api
+
+
+def _min(a, b):
+    # None is unlimited
+    if a is None or b is None:
+        return a if b is None else b
+    return min(a, b)
+
+
+# Token bucket of calls per second with an optional limit of concurrent
+# calls. The rate is halved and callers are paused when the API reports
+# exhausted quota, then it recovers with every successful call
+class TokenBucket(object):
+    # Seconds all callers wait after exhausted quota
+    THROTTLE_PAUSE = 1.0
+    # Part of the configured rate regained by every successful call
+    RECOVERY = 0.05
+
+    def __init__(self, rate=None, burst=None, concurrency=None):
+        self._cond = threading.Condition()
+        self.rate = None
+        self.burst = None
+        self.concurrency = None
+        self.current_rate = None
+        self.tokens = None
+        self.configure(rate, burst, concurrency)
+
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.active = 0
+
+        self.calls = 0
+        self.waits = 0
+        self.waited = 0.0
+        self.throttled = 0
+
+    def configure(self, rate=None, burst=None, concurrency=None):
+        # The strictest of all configurations is used
+        with self._cond:
+            self.rate = _min(self.rate, rate)
+            if self.rate is not None and burst is None:
+                burst = max(1, self.rate)
+            self.burst = _min(self.burst, burst)
+            self.concurrency = _min(self.concurrency, concurrency)
+            self.current_rate = _min(self.current_rate, self.rate)
+            self.tokens = _min(self.tokens, self.burst)
+
+    def _refill(self, now):
+        if self.rate is not None:
+            self.tokens = min(
+                self.burst,
+                self.tokens + (now - self.updated) * self.current_rate,
+            )
+        self.updated = now
+
+    def _delay(self, now):
+        # Seconds until a call could be made, None to wait for a release
+        if self.paused_until > now:
+            return self.paused_until - now
+        if self.rate is not None and self.tokens < 1:
+            return (1 - self.tokens) / self.current_rate
+        if self.concurrency is not None and self.active >= self.concurrency:
+            return None
+        return 0
+
+    def congested(self):
+        # True if a call made now would wait
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return self._delay(now) != 0
+
+    def acquire(self):
+        # Returns seconds waited
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._delay(now)
+                if delay == 0:
+                    break
+                self._cond.wait(delay)
+
+            if self.rate is not None:
+                self.tokens -= 1
+            self.active += 1
+
+            waited = time.monotonic() - start
+            self.calls += 1
+            if waited > 0.001:
+                self.waits += 1
+                self.waited += waited
+        return waited
+
+    def release(self, throttled=False):
+        with self._cond:
+            self.active -= 1
+            if throttled:
+                self.throttled += 1
+                self.paused_until = time.monotonic() + self.THROTTLE_PAUSE
+                if self.rate is not None:
+                    self.current_rate = max(
+                        self.current_rate / 2, self.rate * self.RECOVERY
+                    )
+            elif self.rate is not None:
+                self.current_rate = min(
+                    self.rate, self.current_rate + self.rate * self.RECOVERY
+                )
+            self._cond.notify_all()
+
+
+class RateLimits(object):
+    def __init__(self):
+        self.log = getLogger('YandexRateLimit')
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def bucket(self, api):
+        with self.lock:
+            bucket = self.buckets.get(api)
+            if bucket is None:
+                bucket = self.buckets[api] = TokenBucket()
+            return bucket
+
+    def configure(self, limits):
+        if not isinstance(limits, dict):
+            raise YandexCloudConfigException(
+                "Provider option 'rate_limits' should be a dict"
+            )
+        for api, options in limits.items():
+            if api not in LIMIT_APIS:
+                raise YandexCloudConfigException(
+                    f"Unknown API in 'rate_limits': {api}, "
+                    f"supported: {', '.join(LIMIT_APIS)}"
+                )
+            if not isinstance(options, dict) or any(
+                k not in LIMIT_OPTIONS
+                or not isinstance(v, (int, float))
+                or v <= 0
+                for k, v in options.items()
+            ):
+                raise YandexCloudConfigException(
+                    f"Invalid 'rate_limits' of {api}: {options}, "
+                    f"expected positive {', '.join(LIMIT_OPTIONS)}"
+                )
+            self.bucket(api).configure(**options)
+
+    def congested(self, api, method=None):
+        return self.bucket(limit_api(api, method)).congested()
+
+    @contextmanager
+    def limit(self, api, method=None):
+        # Set throttled on the yielded slot if the API reports exhausted
+        # quota without raising RpcError
+        bucket = self.bucket(limit_api(api, method))
+        slot = SimpleNamespace(waited=bucket.acquire(), throttled=False)
+        try:
+            yield slot
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                slot.throttled = True
+            raise
+        finally:
+            bucket.release(slot.throttled)
+
+    def summary(self):
+        with self.lock:
+            buckets = sorted(self.buckets.items())
+        return ', '.join(
+            f'{api}: calls={e.calls} waits={e.waits} '
+            f'waited={e.waited:.3f}s throttled={e.throttled}'
+            for api, e in buckets
+            if e.calls
+        )
+
+    def report(self):
+        summary = self.summary()
+        if summary:
+            self.log.info('summary: %s', summary)
+
+
+# Shared by all providers and sources, reported once on exit
+LIMITS = RateLimits()
+atexit.register(LIMITS.report)
+
+
+class _RateLimitMixin(object):
+    limits = LIMITS
+
+    def init_rate_limits(self, rate_limits=None):
+        if rate_limits:
+            self.limits.configure(rate_limits)
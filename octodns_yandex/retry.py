@@ -0,0 +1,151 @@
+import functools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logging import getLogger
+
+import grpc
+
+from octodns_yandex.metrics import in_context
+
+# Status codes of idempotent calls which are worth another try, calls after
+# exhausted quota are slowed down by rate limits
+RETRY_CODES = (
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+)
+
+_log = getLogger('YandexRetry')
+
+
+# Retries idempotent calls with jittered exponential backoff while the time
+# budget lasts. Only time of failed calls and backoff is charged, so long
+# listings of large zones keep their budget. One budget is shared by all
+# calls made for a zone, so a flapping API can't stretch the sync
+# indefinitely
+class RetryBudget(object):
+    def __init__(
+        self, budget=60, initial_backoff=0.1, max_backoff=5.0, multiplier=2.0
+    ):
+        self.budget = budget
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+
+        # Seconds spent on failed calls and backoff
+        self.spent = 0.0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"retries={self.retries}"
+
+    def call(self, fn, *args, **kwargs):
+        backoff = self.initial_backoff
+        while True:
+            start = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            except grpc.RpcError as e:
+                if e.code() not in RETRY_CODES:
+                    raise
+                delay = random.uniform(0, backoff)
+                with self._lock:
+                    self.spent += time.monotonic() - start
+                    exhausted = self.spent + delay >= self.budget
+                    if not exhausted:
+                        self.spent += delay
+                        self.retries += 1
+                if exhausted:
+                    _log.warning(
+                        'Retry budget of %ss is exhausted: %s', self.budget, e
+                    )
+                    raise
+                _log.info('Retrying in %.3fs after %s', delay, e.code())
+                time.sleep(delay)
+                backoff = min(backoff * self.multiplier, self.max_backoff)
+
+
+# Sends a duplicate of a call which is slower than the percentile of the
+# previous ones and returns the first successful response. Latencies are
+# kept for a window of the last calls. If congested tells that calls are
+# held by rate limits, slow calls are not duplicated: a duplicate would
+# wait too and take another token
+class Hedger(object):
+    def __init__(
+        self,
+        percentile=95,
+        min_samples=20,
+        window=1000,
+        max_workers=4,
+        congested=None,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.congested = congested
+
+        self.latencies = deque(maxlen=window)
+        self.calls = 0
+        self.hedged = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"calls={self.calls}, hedged={self.hedged}"
+
+    def threshold(self):
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            latencies = sorted(self.latencies)
+        index = int(len(latencies) * self.percentile / 100)
+        return latencies[min(index, len(latencies) - 1)]
+
+    def observe(self, seconds):
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(seconds)
+
+    def call(self, fn, *args, **kwargs):
+        start = time.monotonic()
+        threshold = self.threshold()
+        if threshold is None:
+            ret = fn(*args, **kwargs)
+            self.observe(time.monotonic() - start)
+            return ret
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers
+                )
+        call = in_context(fn)
+        futures = {self._executor.submit(call, *args, **kwargs)}
+        done, _ = wait(futures, timeout=threshold)
+        if not done and not (self.congested and self.congested()):
+            with self._lock:
+                self.hedged += 1
+            _log.debug('Hedging a call slower than %.3fs', threshold)
+            futures.add(self._executor.submit(call, *args, **kwargs))
+
+        while True:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            ok = [e for e in done if e.exception() is None]
+            if ok or not futures:
+                # Raises if all of the calls failed
+                ret = (ok or list(done))[0].result()
+                self.observe(time.monotonic() - start)
+                return ret
+
+
+def resilient(fn, retry=None, hedger=None):
+    # Wraps an idempotent call with hedging and retries
+    if hedger is not None:
+        fn = functools.partial(hedger.call, fn)
+    if retry is not None:
+        fn = functools.partial(retry.call, fn)
+    return fn
@@ -0,0 +1,64 @@
+import mmap
+import os
+import struct
+
+from yandex.cloud.dns.v1.dns_zone_pb2 import RecordSet
+
+from octodns_yandex.exception import YandexCloudException
+
+# Zone snapshot is a file of serialized RecordSet messages as returned by
+# ListRecordSets, each one prefixed with its length (4 bytes, little endian)
+SNAPSHOT_MAGIC = b'OCTOYCS1'
+_LENGTH = struct.Struct('<I')
+
+
+def snapshot_path(directory, zone_name):
+    return os.path.join(directory, f'{zone_name}pb')
+
+
+# Writes a snapshot to a temporary file, which replaces the previous
+# snapshot only when the whole zone is written
+class SnapshotWriter(object):
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f'{path}.{os.getpid()}.tmp'
+        self.count = 0
+        self._fh = None
+
+    def __enter__(self):
+        self._fh = open(self.tmp_path, 'wb')
+        self._fh.write(SNAPSHOT_MAGIC)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._fh.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+    def write(self, rset):
+        data = rset.SerializeToString()
+        self._fh.write(_LENGTH.pack(len(data)))
+        self._fh.write(data)
+        self.count += 1
+
+
+def read_snapshot(path):
+    # Yields RecordSets of a memory mapped snapshot
+    with open(path, 'rb') as fh, mmap.mmap(
+        fh.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        if mm[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise YandexCloudException(f'Not a zone snapshot: {path}')
+
+        offset, size = len(SNAPSHOT_MAGIC), len(mm)
+        while offset < size:
+            if offset + _LENGTH.size > size:
+                raise YandexCloudException(f'Truncated zone snapshot: {path}')
+            (length,) = _LENGTH.unpack_from(mm, offset)
+            offset += _LENGTH.size
+            if offset + length > size:
+                raise YandexCloudException(f'Truncated zone snapshot: {path}')
+            yield RecordSet.FromString(mm[offset : offset + length])
+            offset += length
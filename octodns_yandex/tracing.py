@@ -0,0 +1,62 @@
+import functools
+from contextlib import contextmanager
+
+from octodns_yandex.metrics import _zone, zone_context
+from octodns_yandex.version import __version__
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    # Tracing is optional, spans are no-op without opentelemetry-api
+    trace = None
+
+
+def _attributes(attributes):
+    # None values are not allowed by OpenTelemetry
+    ret = {
+        f'octodns_yandex.{k}': v for k, v in attributes.items() if v is not None
+    }
+    zone_name = _zone.get()
+    if zone_name:
+        ret['octodns_yandex.zone'] = zone_name
+    return ret
+
+
+@contextmanager
+def span(name, **attributes):
+    if trace is None:
+        yield None
+        return
+
+    tracer = trace.get_tracer('octodns_yandex', __version__)
+    with tracer.start_as_current_span(
+        name, attributes=_attributes(attributes)
+    ) as current:
+        yield current
+
+
+def set_attributes(current, **attributes):
+    if current is not None:
+        current.set_attributes(
+            {f'octodns_yandex.{k}': v for k, v in attributes.items()}
+        )
+
+
+@contextmanager
+def zone_span(name, zone_name, **attributes):
+    # Labels metrics and spans inside with the zone name
+    with zone_context(zone_name), span(name, **attributes) as current:
+        yield current
+
+
+def traced(name):
+    # Decorated method runs in a span, zone is taken from the context
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
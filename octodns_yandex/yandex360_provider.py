@@ -1,5 +1,6 @@
 import functools
 import itertools
+import json
 from logging import getLogger
 
 import requests
@@ -9,6 +10,13 @@ from octodns.provider import ProviderException
 from octodns.provider.base import BaseProvider
 from octodns.record import Create, Delete, Record
 
+from octodns_yandex.estimate import ApiCostEstimate, _EstimateMixin
+from octodns_yandex.journal import _JournalMixin
+from octodns_yandex.metrics import _MetricsMixin
+from octodns_yandex.profiling import profiled
+from octodns_yandex.progress import _ProgressMixin
+from octodns_yandex.ratelimit import _RateLimitMixin
+from octodns_yandex.tracing import span, traced, zone_span
 from octodns_yandex.version import get_base_user_agent
 
 
@@ -151,13 +159,42 @@ def map_record_to_entries(zone, record: Record):
     return entries
 
 
+def _change_key(change):
+    # Entries are searched by type and name of the existing record
+    record = change.existing or change.new
+    return record._type, _ya360_name(record.name)
+
+
+def _split_changes(changes):
+    delete, create, update = [], [], []
+    for change in changes:
+        if change.existing is None:
+            create.append(change)
+        elif change.new is None:
+            delete.append(change)
+        elif change.existing._type == 'CAA':
+            # XXX: CAA update is broken
+            delete.append(Delete(change.existing))
+            create.append(Create(change.existing))
+        else:
+            update.append(change)
+    return delete, create, update
+
+
 # API reference:
 #  https://yandex.ru/dev/api360/doc/ref/OrganizationsService/OrganizationsService_List.html
 #  https://yandex.ru/dev/api360/doc/ref/DomainService/DomainService_List.html
 #  https://yandex.ru/dev/api360/doc/ref/DomainDNSService.html
 
 
-class Yandex360Provider(BaseProvider):
+class Yandex360Provider(
+    _MetricsMixin,
+    _ProgressMixin,
+    _EstimateMixin,
+    _JournalMixin,
+    _RateLimitMixin,
+    BaseProvider,
+):
     SUPPORTS_GEO = False
     SUPPORTS_DYNAMIC = False
     SUPPORTS = {'A', 'AAAA', 'CNAME', 'MX', 'TXT', 'SRV', 'NS', 'CAA'}
@@ -166,11 +203,30 @@ class Yandex360Provider(BaseProvider):
     API_BASE = 'https://api360.yandex.net'
 
     _oauth_token = None
-
-    def __init__(self, id, oauth_token, *args, **kwargs):
+    org_ids_index = dict()
+
+    def __init__(
+        self,
+        id,
+        oauth_token,
+        metrics_textfile=None,
+        progress_interval=10,
+        progress_callback=None,
+        plan_api_calls_warning=100,
+        journal_dir=None,
+        journal_max_age=None,
+        rate_limits=None,
+        *args,
+        **kwargs,
+    ):
         self.log = getLogger(f"Yandex360Provider[{id}]")
 
         self._oauth_token = oauth_token
+        self.init_metrics(metrics_textfile)
+        self.init_progress(progress_interval, progress_callback)
+        self.init_estimate(plan_api_calls_warning)
+        self.init_journal(journal_dir, journal_max_age)
+        self.init_rate_limits(rate_limits)
 
         self.log.debug('__init__: oauth_token=%s', self._oauth_token)
 
@@ -185,17 +241,35 @@ class Yandex360Provider(BaseProvider):
         )
 
     def make_request(
-        self, method, url, data=None, params=None, expected_code=200
+        self,
+        method,
+        url,
+        data=None,
+        params=None,
+        expected_code=200,
+        api_method=None,
     ):
-        resp = self._session.request(
-            method,
-            f"{self.API_BASE}{url}",
-            params=params,
-            json=data,
-            timeout=self.TIMEOUT,
-        )
-        if resp.status_code != expected_code:
-            raise Yandex360ApiException(resp)
+        params = params or {}
+        with span(
+            f'Yandex360Provider.{api_method or method}',
+            http_method=method,
+            page=params.get('page', params.get('pageToken')),
+        ), self.limits.limit('yandex360') as slot, self.metrics.measure(
+            'yandex360', api_method or method
+        ) as sample:
+            resp = self._session.request(
+                method,
+                f"{self.API_BASE}{url}",
+                params=params,
+                json=data,
+                timeout=self.TIMEOUT,
+            )
+            # Too Many Requests, callers are slowed down
+            slot.throttled = resp.status_code == 429
+            sample.request_bytes = len(resp.request.body or b'')
+            sample.response_bytes = len(resp.content)
+            if resp.status_code != expected_code:
+                raise Yandex360ApiException(resp)
         return resp.json()
 
     def list_orgs(self, page_token=None):
@@ -203,6 +277,7 @@ class Yandex360Provider(BaseProvider):
             'GET',
             '/directory/v1/org',
             params={'pageSize': 100, 'pageToken': page_token},
+            api_method='ListOrgs',
         )
 
     def list_domains(self, org_id, page=1):
@@ -210,6 +285,7 @@ class Yandex360Provider(BaseProvider):
             'GET',
             f"/directory/v1/org/{org_id}/domains",
             params={'perPage': 10, 'page': page},
+            api_method='ListDomains',
         )
 
     def list_dns_records(self, org_id, domain, page=1):
@@ -217,6 +293,7 @@ class Yandex360Provider(BaseProvider):
             'GET',
             f"/directory/v1/org/{org_id}/domains/{domain}/dns",
             params={'perPage': 50, 'page': page},
+            api_method='ListDnsRecords',
         )
 
     def create_dns_record(self, org_id, domain, data):
@@ -227,6 +304,7 @@ class Yandex360Provider(BaseProvider):
             'POST',
             f"/directory/v1/org/{org_id}/domains/{domain}/dns",
             data=data,
+            api_method='CreateDnsRecord',
         )
 
     def update_dns_record(self, org_id, domain, record_id, data):
@@ -241,6 +319,7 @@ class Yandex360Provider(BaseProvider):
             'POST',
             f"/directory/v1/org/{org_id}/domains/{domain}/dns/{record_id}",
             data=data,
+            api_method='UpdateDnsRecord',
         )
 
     def delete_dns_record(self, org_id, domain, record_id):
@@ -253,9 +332,11 @@ class Yandex360Provider(BaseProvider):
         return self.make_request(
             'DELETE',
             f"/directory/v1/org/{org_id}/domains/{domain}/dns/{record_id}",
+            api_method='DeleteDnsRecord',
         )
 
-    def find_org_id_for_domain(self, domain_name):
+    def iter_org_domains(self):
+        # Yields (org_id, domain) for every domain of every organization
         orgs_done = False
         orgs_page_token = None
         while not orgs_done:
@@ -277,17 +358,36 @@ class Yandex360Provider(BaseProvider):
                     domains_page += 1
 
                     for domain in domains_resp['domains']:
-                        if domain['name'] != domain_name:
-                            continue
-                        self.log.info(
-                            'find_org_id_for_domain: Found org_id=%s for domain_name=%s',
-                            org_id,
-                            domain_name,
-                        )
-                        return org_id
+                        yield org_id, domain
+
+    @traced('Yandex360Provider.find_org_id_for_domain')
+    def find_org_id_for_domain(self, domain_name):
+        if domain_name in self.org_ids_index:
+            return self.org_ids_index[domain_name]
+
+        for org_id, domain in self.iter_org_domains():
+            if domain['name'] != domain_name:
+                continue
+            self.log.info(
+                'find_org_id_for_domain: Found org_id=%s for domain_name=%s',
+                org_id,
+                domain_name,
+            )
+            return org_id
 
         return None
 
+    @traced('Yandex360Provider.list_zones')
+    def list_zones(self):
+        # Found domains are used by populate and apply without another walk
+        org_ids = {}
+        for org_id, domain in self.iter_org_domains():
+            org_ids.setdefault(domain['name'], org_id)
+        self.org_ids_index = org_ids
+
+        self.log.info('list_zones: Found %d domains', len(org_ids))
+        return sorted(f'{e}.' for e in org_ids.keys())
+
     def collect_zone_entries(self, org_id, domain_name):
         entries = []
 
@@ -304,100 +404,139 @@ class Yandex360Provider(BaseProvider):
 
         return entries
 
+    @profiled('populate')
     def populate(self, zone, target=False, lenient=False):
-        self.log.debug(
-            'populate: name=%s, target=%s, lenient=%s',
+        with zone_span(
+            'Yandex360Provider.populate',
             zone.name,
-            target,
-            lenient,
-        )
-
-        domain_name = idna_encode(zone.name).rstrip('.')
-        org_id = self.find_org_id_for_domain(domain_name)
-        if org_id is None:
-            self.log.info('populate: Zone not found')
-            return False
-
-        before = len(zone.records)
-        entries = self.collect_zone_entries(org_id, domain_name)
-        for record in map_entries_to_records(self, zone, lenient, entries):
-            zone.add_record(record, lenient=lenient)
+            target=target,
+            lenient=lenient,
+        ):
+            self.log.debug(
+                'populate: name=%s, target=%s, lenient=%s',
+                zone.name,
+                target,
+                lenient,
+            )
 
-        self.log.info('populate: found %s records', len(zone.records) - before)
+            domain_name = idna_encode(zone.name).rstrip('.')
+            org_id = self.find_org_id_for_domain(domain_name)
+            if org_id is None:
+                self.log.info('populate: Zone not found')
+                return False
+
+            before = len(zone.records)
+            entries = self.collect_zone_entries(org_id, domain_name)
+            with span('Yandex360Provider.map_records', entries=len(entries)):
+                records = map_entries_to_records(self, zone, lenient, entries)
+                for record in records:
+                    zone.add_record(record, lenient=lenient)
+
+            self.log.info(
+                'populate: found %s records', len(zone.records) - before
+            )
 
-        return True
+            return True
 
-    def _apply(self, plan):
+    def estimate_cost(self, plan):
+        # Same diff as _apply, existing entries are the populated values
         zone = plan.desired
-        changes = plan.changes
-
-        domain_name = idna_encode(zone.name).rstrip('.')
-        org_id = self.find_org_id_for_domain(domain_name)
-        if org_id is None:
-            raise Yandex360Exception("Zone not found")
-
-        self.log.debug(
-            '_apply: org_id=%s, domain_name=%s, len(changes)=%d',
-            org_id,
-            domain_name,
-            len(changes),
+        delete, create, update = _split_changes(plan.changes)
+        posts, deletes, request_bytes = 0, 0, 0
+        for change in delete:
+            deletes += len(map_record_to_entries(zone, change.existing))
+        for change in create + update:
+            entries = map_record_to_entries(zone, change.new)
+            posts += len(entries)
+            request_bytes += sum(len(json.dumps(e)) for e in entries)
+            if change.existing is not None:
+                # Additional entries of updated records are deleted
+                existing = map_record_to_entries(zone, change.existing)
+                deletes += max(len(existing) - len(entries), 0)
+        return ApiCostEstimate(
+            {'POST': posts, 'DELETE': deletes}, request_bytes
         )
 
-        delete, create, update = [], [], []
-        records_to_search = {}
-        for change in changes:
-            if change.existing is None:
-                create.append(change)
-            else:
-                _key = (
-                    change.existing._type,
-                    _ya360_name(change.existing.name),
-                )
-                records_to_search[_key] = []
-                if change.new is None:
-                    delete.append(change)
-                elif change.existing._type == 'CAA':
-                    # XXX: CAA update is broken
-                    delete.append(Delete(change.existing))
-                    create.append(Create(change.existing))
-                else:
-                    update.append(change)
-
-        # Search for record_ids by (type, name) tuples
-        entries = self.collect_zone_entries(org_id, domain_name)
-        for entry in entries:
-            _key = (entry['type'], entry['name'])
-            e = records_to_search.get(_key, None)
-            if e is None:
-                continue
-            records_to_search[_key].append(entry['recordId'])
+    @profiled('apply')
+    def _apply(self, plan):
+        with zone_span(
+            'Yandex360Provider.apply',
+            plan.desired.name,
+            changes=len(plan.changes),
+        ):
+            zone = plan.desired
+            changes = plan.changes
+
+            domain_name = idna_encode(zone.name).rstrip('.')
+            org_id = self.find_org_id_for_domain(domain_name)
+            if org_id is None:
+                raise Yandex360Exception("Zone not found")
+
+            self.log.debug(
+                '_apply: org_id=%s, domain_name=%s, len(changes)=%d',
+                org_id,
+                domain_name,
+                len(changes),
+            )
 
-        # Delete found records
-        for change in delete:
-            _key = (change.existing._type, _ya360_name(change.existing.name))
-            for record_id in records_to_search.get(_key, []):
-                self.delete_dns_record(org_id, domain_name, record_id)
+            delete, create, update = _split_changes(changes)
+            records_to_search = {
+                _change_key(e): [] for e in delete + create + update
+            }
 
-        # Create new records
-        for change in create:
-            for entry in map_record_to_entries(zone, change.new):
+            # Search for record_ids by (type, name) tuples
+            entries = self.collect_zone_entries(org_id, domain_name)
+            for entry in entries:
+                _key = (entry['type'], entry['name'])
+                e = records_to_search.get(_key, None)
+                if e is None:
+                    continue
+                records_to_search[_key].append(entry['recordId'])
+
+            # Each change is a step of a record set: found records are
+            # deleted, then new ones are created and updated ones are changed
+            steps = delete + create + update
+            progress = self.make_progress(zone.name, len(steps), len(steps))
+            with self.journaled(plan) as journal:
+                for step, change in enumerate(steps):
+                    if journal is not None and step in journal.done:
+                        progress.advance(1)
+                        continue
+                    # Step interrupted in the middle is done as an update
+                    # of the entries found now
+                    uncertain = journal is not None and step in journal.started
+
+                    progress.begin()
+                    if journal is not None:
+                        journal.start(step)
+                    record_ids = records_to_search[_change_key(change)]
+                    if change.new is None:
+                        for record_id in record_ids:
+                            self.delete_dns_record(
+                                org_id, domain_name, record_id
+                            )
+                    elif change.existing is None and not uncertain:
+                        for entry in map_record_to_entries(zone, change.new):
+                            self.create_dns_record(org_id, domain_name, entry)
+                    else:
+                        self._update_entries(
+                            org_id, domain_name, zone, record_ids, change.new
+                        )
+                    if journal is not None:
+                        journal.finish(step)
+                    progress.advance(1)
+
+    def _update_entries(self, org_id, domain_name, zone, record_ids, record):
+        it = iter(record_ids)
+
+        # Update entries while there is some or create new ones
+        for entry in map_record_to_entries(zone, record):
+            record_id = next(it, None)
+            if record_id is not None:
+                self.update_dns_record(org_id, domain_name, record_id, entry)
+            else:
                 self.create_dns_record(org_id, domain_name, entry)
 
-        # Apply changes: update (if possible) or create/delete
-        for change in update:
-            _key = (change.existing._type, _ya360_name(change.existing.name))
-            it = iter(records_to_search.get(_key, []))
-
-            # Update entries while there is some or create new ones
-            for entry in map_record_to_entries(zone, change.new):
-                record_id = next(it, None)
-                if record_id is not None:
-                    self.update_dns_record(
-                        org_id, domain_name, record_id, entry
-                    )
-                else:
-                    self.create_dns_record(org_id, domain_name, entry)
-
-            # Delete additional entries (if any)
-            for record_id in it:
-                self.delete_dns_record(org_id, domain_name, record_id)
+        # Delete additional entries (if any)
+        for record_id in it:
+            self.delete_dns_record(org_id, domain_name, record_id)
@@ -1,3 +1,4 @@
+import threading
 from logging import getLogger
 
 import yandexcloud
@@ -11,21 +12,48 @@ from octodns.record import Record
 from octodns.source.base import BaseSource
 
 from octodns_yandex.auth import _AuthMixin
+from octodns_yandex.channel import _ChannelMixin
+from octodns_yandex.folder import _FolderMixin
+from octodns_yandex.index import SuffixIndex
+from octodns_yandex.metrics import _MetricsMixin, instrument_stub
+from octodns_yandex.pagination import Paginator
+from octodns_yandex.profiling import profiled
+from octodns_yandex.ratelimit import _RateLimitMixin
+from octodns_yandex.tracing import zone_span
 from octodns_yandex.version import get_user_agent
 
 
-class YandexCloudCDNSource(_AuthMixin, BaseSource):
+class YandexCloudCDNSource(
+    _AuthMixin,
+    _ChannelMixin,
+    _FolderMixin,
+    _MetricsMixin,
+    _RateLimitMixin,
+    BaseSource,
+):
     SUPPORTS_GEO = False
     SUPPORTS = {'CNAME'}
 
-    _provider_cname = None
+    _resources_index = None
 
     def __init__(
         self,
         id,
-        folder_id: str,
-        auth_type: str,
+        folder_id: str = None,
+        auth_type: str = None,
         record_ttl=3600,
+        folder_ids=None,
+        cloud_id=None,
+        max_workers=4,
+        list_timeout=None,
+        metrics_textfile=None,
+        rate_limits=None,
+        grpc_compression=None,
+        grpc_max_send_message_length=None,
+        grpc_max_receive_message_length=None,
+        grpc_keepalive_time=None,
+        grpc_keepalive_timeout=None,
+        grpc_deadlines=None,
         oauth_token=None,
         iam_token=None,
         sa_key_file=None,
@@ -35,85 +63,139 @@ class YandexCloudCDNSource(_AuthMixin, BaseSource):
     ):
         self.log = getLogger(f"YandexCloudCDNSource[{id}]")
 
-        self.folder_id = folder_id
+        self.init_folders(folder_id, folder_ids, cloud_id, max_workers)
         self.record_ttl = record_ttl
+        self.list_timeout = list_timeout
+        self._resources_lock = threading.Lock()
+        self.init_metrics(metrics_textfile)
+        self.init_rate_limits(rate_limits)
+        self.init_channel(
+            grpc_compression,
+            grpc_max_send_message_length,
+            grpc_max_receive_message_length,
+            grpc_keepalive_time,
+            grpc_keepalive_timeout,
+            grpc_deadlines,
+        )
+        self._provider_cnames = {}
 
         self.auth_kwargs = self.get_auth_kwargs(
             auth_type, oauth_token, iam_token, sa_key_file, sa_key
         )
         self.log.debug(
-            '__init__: folder_id=%s auth_type=%s auth_kwargs=%s',
-            self.folder_id,
+            '__init__: folder_ids=%s cloud_id=%s auth_type=%s auth_kwargs=%s',
+            self.folder_ids,
+            self.cloud_id,
             auth_type,
             self.auth_kwargs,
         )
 
         super().__init__(id, *args, **kwargs)
 
-        self.sdk = yandexcloud.SDK(
-            user_agent=get_user_agent(), **self.auth_kwargs
+        self.sdk = self.configure_sdk(
+            yandexcloud.SDK(user_agent=get_user_agent(), **self.auth_kwargs)
+        )
+        self.cdn_service = instrument_stub(
+            self.configure_stub(self.sdk.client(ResourceServiceStub)),
+            'cdn',
+            self.metrics,
+            self.limits,
         )
-        self.cdn_service = self.sdk.client(ResourceServiceStub)
-
-    def get_provider_cname(self):
-        if not self._provider_cname:
-            self._provider_cname = self.cdn_service.GetProviderCName(
-                GetProviderCNameRequest(folder_id=self.folder_id)
-            ).cname
-            if self._provider_cname[-1] != '.':
-                self._provider_cname += '.'
 
-        return self._provider_cname
+    def get_provider_cname(self, folder_id=None):
+        if folder_id is None:
+            folder_id = self.get_folder_ids()[0]
 
-    def process_resource(self, zone, resource, lenient=False):
-        matched_domains = filter(
-            lambda domain: zone.owns('CNAME', domain),
-            [resource.cname, *resource.secondary_hostnames],
+        if folder_id not in self._provider_cnames:
+            cname = self.cdn_service.GetProviderCName(
+                GetProviderCNameRequest(folder_id=folder_id)
+            ).cname
+            if cname[-1] != '.':
+                cname += '.'
+            self._provider_cnames[folder_id] = cname
+
+        return self._provider_cnames[folder_id]
+
+    def _add_record(self, zone, fqdn, folder_id=None, lenient=False):
+        zone.add_record(
+            Record.new(
+                zone,
+                zone.hostname_from_fqdn(fqdn),
+                data={
+                    'type': 'CNAME',
+                    'ttl': self.record_ttl,
+                    'value': self.get_provider_cname(folder_id),
+                },
+                source=self,
+                lenient=lenient,
+            )
         )
 
-        for fqdn in matched_domains:
-            if fqdn[-1] != '.':
-                fqdn = f'{fqdn}.'
-
-            zone.add_record(
-                Record.new(
-                    zone,
-                    zone.hostname_from_fqdn(fqdn),
-                    data={
-                        'type': 'CNAME',
-                        'ttl': self.record_ttl,
-                        'value': self.get_provider_cname(),
-                    },
-                    source=self,
-                    lenient=lenient,
-                )
-            )
+    def list_resources(self, folder_id):
+        pages = Paginator(
+            self.cdn_service.List,
+            ListResourcesRequest(folder_id=folder_id),
+            'resources',
+            timeout=self.list_timeout,
+        )
+        resources = list(pages)
 
-    def populate(self, zone, target=False, lenient=False):
         self.log.debug(
-            'populate: name=%s, target=%s, lenient=%s',
-            zone.name,
-            target,
-            lenient,
+            'list_resources: folder_id=%s, fetched %s', folder_id, pages
         )
-
-        before = len(zone.records)
-
-        done = False
-        page_token = None
-        while not done:
-            resp = self.cdn_service.List(
-                ListResourcesRequest(
-                    folder_id=self.folder_id, page_token=page_token
-                )
+        return resources
+
+    def get_resources_index(self):
+        # Zones are populated in parallel, resources are listed only once
+        if self._resources_index is not None:
+            return self._resources_index
+
+        with self._resources_lock:
+            if self._resources_index is None:
+                self._resources_index = self._build_resources_index()
+        return self._resources_index
+
+    def _build_resources_index(self):
+        hostnames = set()
+        folder_ids = self.get_folder_ids()
+        folders_resources = self.map_folders(self.list_resources)
+        for folder_id, resources in zip(folder_ids, folders_resources):
+            for resource in resources:
+                for fqdn in [resource.cname, *resource.secondary_hostnames]:
+                    hostnames.add((fqdn.rstrip('.'), folder_id))
+        index = SuffixIndex(sorted(hostnames))
+
+        self.log.debug('get_resources_index: indexed %d hostnames', len(index))
+        return index
+
+    def find_zone_hostnames(self, zone):
+        seen = set()
+        for fqdn, folder_id in self.get_resources_index().find(zone.name):
+            # Sub-zones are still checked by the zone itself
+            if fqdn not in seen and zone.owns('CNAME', fqdn):
+                seen.add(fqdn)
+                yield fqdn, folder_id
+
+    @profiled('populate')
+    def populate(self, zone, target=False, lenient=False):
+        with zone_span(
+            'YandexCloudCDNSource.populate',
+            zone.name,
+            target=target,
+            lenient=lenient,
+        ):
+            self.log.debug(
+                'populate: name=%s, target=%s, lenient=%s',
+                zone.name,
+                target,
+                lenient,
             )
 
-            if resp.next_page_token:
-                page_token = resp.next_page_token
-            else:
-                done = True
+            before = len(zone.records)
 
-            for resource in resp.resources:
-                self.process_resource(zone, resource, lenient)
+            for fqdn, folder_id in self.find_zone_hostnames(zone):
+                self._add_record(zone, fqdn, folder_id, lenient)
 
-        self.log.info('populate: found %s records', len(zone.records) - before)
+            self.log.info(
+                'populate: found %s records', len(zone.records) - before
+            )
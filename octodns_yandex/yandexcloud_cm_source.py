@@ -1,3 +1,5 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from logging import getLogger
 
 import yandexcloud
@@ -6,6 +8,7 @@ from yandex.cloud.certificatemanager.v1.certificate_pb2 import (
     ChallengeType,
 )
 from yandex.cloud.certificatemanager.v1.certificate_service_pb2 import (
+    GetCertificateRequest,
     ListCertificatesRequest,
 )
 from yandex.cloud.certificatemanager.v1.certificate_service_pb2_grpc import (
@@ -16,21 +19,50 @@ from octodns.record import Record
 from octodns.source.base import BaseSource
 
 from octodns_yandex.auth import _AuthMixin
+from octodns_yandex.channel import _ChannelMixin
 from octodns_yandex.exception import YandexCloudConfigException
+from octodns_yandex.folder import _FolderMixin
+from octodns_yandex.index import SuffixIndex
+from octodns_yandex.metrics import _MetricsMixin, in_context, instrument_stub
+from octodns_yandex.pagination import Paginator
+from octodns_yandex.profiling import profiled
+from octodns_yandex.ratelimit import _RateLimitMixin
+from octodns_yandex.tracing import zone_span
 from octodns_yandex.version import get_user_agent
 
 
-class YandexCloudCMSource(_AuthMixin, BaseSource):
+class YandexCloudCMSource(
+    _AuthMixin,
+    _ChannelMixin,
+    _FolderMixin,
+    _MetricsMixin,
+    _RateLimitMixin,
+    BaseSource,
+):
     SUPPORTS_GEO = False
     SUPPORTS = {'CNAME', 'TXT'}
 
+    _certificates_index = None
+
     def __init__(
         self,
         id,
-        folder_id: str,
-        auth_type: str,
+        folder_id: str = None,
+        auth_type: str = None,
         record_type='CNAME',
         record_ttl=3600,
+        max_workers=4,
+        folder_ids=None,
+        cloud_id=None,
+        list_timeout=None,
+        metrics_textfile=None,
+        rate_limits=None,
+        grpc_compression=None,
+        grpc_max_send_message_length=None,
+        grpc_max_receive_message_length=None,
+        grpc_keepalive_time=None,
+        grpc_keepalive_timeout=None,
+        grpc_deadlines=None,
         oauth_token=None,
         iam_token=None,
         sa_key_file=None,
@@ -40,28 +72,48 @@ class YandexCloudCMSource(_AuthMixin, BaseSource):
     ):
         self.log = getLogger(f"YandexCloudCMSource[{id}]")
 
-        self.folder_id = folder_id
+        self.init_folders(folder_id, folder_ids, cloud_id, max_workers)
         self.record_type = record_type
         if record_type not in self.SUPPORTS:
             raise YandexCloudConfigException('Not supported record_type')
         self.record_ttl = record_ttl
+        self.list_timeout = list_timeout
+        self.init_metrics(metrics_textfile)
+        self.init_rate_limits(rate_limits)
+        self.init_channel(
+            grpc_compression,
+            grpc_max_send_message_length,
+            grpc_max_receive_message_length,
+            grpc_keepalive_time,
+            grpc_keepalive_timeout,
+            grpc_deadlines,
+        )
+        self._certificates = {}
+        self._certificates_lock = threading.Lock()
+        self._certificates_index_lock = threading.Lock()
 
         self.auth_kwargs = self.get_auth_kwargs(
             auth_type, oauth_token, iam_token, sa_key_file, sa_key
         )
         self.log.debug(
-            '__init__: folder_id=%s auth_type=%s auth_kwargs=%s',
-            self.folder_id,
+            '__init__: folder_ids=%s cloud_id=%s auth_type=%s auth_kwargs=%s',
+            self.folder_ids,
+            self.cloud_id,
             auth_type,
             self.auth_kwargs,
         )
 
         super().__init__(id, *args, **kwargs)
 
-        self.sdk = yandexcloud.SDK(
-            user_agent=get_user_agent(), **self.auth_kwargs
+        self.sdk = self.configure_sdk(
+            yandexcloud.SDK(user_agent=get_user_agent(), **self.auth_kwargs)
+        )
+        self.cm_service = instrument_stub(
+            self.configure_stub(self.sdk.client(CertificateServiceStub)),
+            'cm',
+            self.metrics,
+            self.limits,
         )
-        self.cm_service = self.sdk.client(CertificateServiceStub)
 
     def process_certificate(self, zone, cert, lenient=False):
         if cert.type != CertificateType.MANAGED:
@@ -109,31 +161,109 @@ class YandexCloudCMSource(_AuthMixin, BaseSource):
         for k, record in new_records.items():
             zone.add_record(record)
 
-    def populate(self, zone, target=False, lenient=False):
+    def list_certificates(self, folder_id):
+        # BASIC view has no chain and challenges, which are fetched later
+        # only for certificates of populated zones
+        pages = Paginator(
+            self.cm_service.List,
+            ListCertificatesRequest(folder_id=folder_id, view='BASIC'),
+            'certificates',
+            timeout=self.list_timeout,
+        )
+        certificates = list(pages)
+
         self.log.debug(
-            'populate: name=%s, target=%s, lenient=%s',
-            zone.name,
-            target,
-            lenient,
+            'list_certificates: folder_id=%s, fetched %s', folder_id, pages
         )
+        return certificates
 
-        before = len(zone.records)
+    def get_certificates_index(self):
+        if self._certificates_index is None:
+            with self._certificates_index_lock:
+                if self._certificates_index is None:
+                    self._certificates_index = self._build_certificates_index()
+
+        return self._certificates_index
+
+    def _build_certificates_index(self):
+        domains = []
+        certificates = self.map_folders(self.list_certificates)
+        for cert in (e for folder_certs in certificates for e in folder_certs):
+            if cert.type != CertificateType.MANAGED:
+                continue
+            for domain in cert.domains:
+                # Wildcard challenge is placed next to the base domain one
+                if domain.startswith('*.'):
+                    domain = domain[2:]
+                domains.append((domain, cert.id))
+
+        index = SuffixIndex(domains)
+        self.log.debug('get_certificates_index: indexed %d domains', len(index))
+        return index
+
+    def get_certificate(self, certificate_id):
+        return self.cm_service.Get(
+            GetCertificateRequest(certificate_id=certificate_id, view='FULL')
+        )
 
-        done = False
-        page_token = None
-        while not done:
-            resp = self.cm_service.List(
-                ListCertificatesRequest(
-                    folder_id=self.folder_id, view='FULL', page_token=page_token
-                )
+    def _fetch_certificate(self, certificate_id):
+        future = self._certificates[certificate_id]
+        try:
+            future.set_result(self.get_certificate(certificate_id))
+        except Exception as e:
+            # Not cached, the next caller fetches it again
+            with self._certificates_lock:
+                del self._certificates[certificate_id]
+            future.set_exception(e)
+
+    def fetch_certificates(self, certificate_ids):
+        # A future per certificate, concurrent callers wait for the same fetch
+        missing = []
+        with self._certificates_lock:
+            for cert_id in certificate_ids:
+                if cert_id not in self._certificates:
+                    self._certificates[cert_id] = Future()
+                    missing.append(cert_id)
+            futures = [self._certificates[e] for e in certificate_ids]
+
+        if missing:
+            self.log.debug('fetch_certificates: fetching %d', len(missing))
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                executor.map(in_context(self._fetch_certificate), missing)
+
+        return [e.result() for e in futures]
+
+    def find_zone_certificates(self, zone):
+        # Ordered set, a certificate is matched by each of its domains
+        certificate_ids = {}
+        for domain, cert_id in self.get_certificates_index().find(zone.name):
+            if cert_id in certificate_ids:
+                continue
+            if zone.owns(self.record_type, domain):
+                certificate_ids[cert_id] = None
+
+        return self.fetch_certificates(list(certificate_ids))
+
+    @profiled('populate')
+    def populate(self, zone, target=False, lenient=False):
+        with zone_span(
+            'YandexCloudCMSource.populate',
+            zone.name,
+            target=target,
+            lenient=lenient,
+        ):
+            self.log.debug(
+                'populate: name=%s, target=%s, lenient=%s',
+                zone.name,
+                target,
+                lenient,
             )
 
-            if resp.next_page_token:
-                page_token = resp.next_page_token
-            else:
-                done = True
+            before = len(zone.records)
 
-            for cert in resp.certificates:
+            for cert in self.find_zone_certificates(zone):
                 self.process_certificate(zone, cert, lenient)
 
-        self.log.info('populate: found %s records', len(zone.records) - before)
+            self.log.info(
+                'populate: found %s records', len(zone.records) - before
+            )
@@ -1,3 +1,5 @@
+import functools
+from contextlib import nullcontext
 from logging import getLogger
 
 import grpc
@@ -6,49 +8,81 @@ from yandex.cloud.dns.v1.dns_zone_pb2 import RecordSet
 from yandex.cloud.dns.v1.dns_zone_service_pb2 import (
     ListDnsZoneRecordSetsRequest,
     ListDnsZonesRequest,
-    RecordSetDiff,
-    UpdateRecordSetsMetadata,
     UpdateRecordSetsRequest,
 )
 from yandex.cloud.dns.v1.dns_zone_service_pb2_grpc import DnsZoneServiceStub
+from yandex.cloud.operation.operation_pb2 import Operation
+from yandex.cloud.operation.operation_service_pb2_grpc import (
+    OperationServiceStub,
+)
 
 from octodns.idna import idna_decode
 from octodns.provider.base import BaseProvider
 from octodns.record import Record
 
 from octodns_yandex.auth import _AuthMixin
+from octodns_yandex.channel import _ChannelMixin
+from octodns_yandex.estimate import ApiCostEstimate, _EstimateMixin
 from octodns_yandex.exception import YandexCloudException
+from octodns_yandex.filter import RecordSetFilter
+from octodns_yandex.folder import _FolderMixin
+from octodns_yandex.journal import _JournalMixin
+from octodns_yandex.metrics import _MetricsMixin, instrument_stub
+from octodns_yandex.operation import OperationWaiter
+from octodns_yandex.pagination import Paginator
+from octodns_yandex.profiling import profiled
+from octodns_yandex.progress import _ProgressMixin
+from octodns_yandex.ratelimit import _RateLimitMixin
 from octodns_yandex.record import YandexCloudAnameRecord
+from octodns_yandex.retry import Hedger, RetryBudget, resilient
+from octodns_yandex.snapshot import SnapshotWriter, snapshot_path
+from octodns_yandex.tracing import span, traced, zone_span
 from octodns_yandex.version import get_user_agent
 
 
-def _aname_type_map(rset):
-    rset.type = YandexCloudAnameRecord._type
+def _aname_type_map(_type, values):
+    return YandexCloudAnameRecord._type, values
 
 
-def _txt_unescape(rset):
+def _txt_unescape(_type, values):
     # unescape value because octodns escaping breaks escaped dkim
-    for i, value in enumerate(rset.data):
-        rset.data[i] = value.replace('\\;', ';')
+    return _type, [e.replace('\\;', ';') for e in values]
+
+
+def _update_request(zone_id, create, delete):
+    return UpdateRecordSetsRequest(
+        dns_zone_id=zone_id,
+        additions=[map_octodns_to_rset(e.new) for e in create],
+        deletions=[map_octodns_to_rset(e.existing) for e in delete],
+    )
+
+
+def _chunk_size(create, delete):
+    # Updates are in both lists, deletions only in the second one
+    return len(create) + sum(1 for e in delete if e.new is None)
 
 
 rset_transformers = {
-    # Custom transformers for RecordSets from API
+    # Custom transformers for type and values of RecordSets from API.
+    # RecordSets are not modified, so pages could be released once mapped
     'ANAME': _aname_type_map,
     'TXT': _txt_unescape,
 }
 
 
 def map_rset_to_octodns(provider, zone, lenient, rset):
-    rset_transformers.get(rset.type, lambda *args: None)(rset)
+    _type, rdata_texts = rset.type, rset.data
+    transformer = rset_transformers.get(_type)
+    if transformer is not None:
+        _type, rdata_texts = transformer(_type, rdata_texts)
 
-    record_type = Record.registered_types().get(rset.type, None)
+    record_type = Record.registered_types().get(_type, None)
     if record_type is None:
-        raise YandexCloudException(f"Unknown record type: {rset.type}")
+        raise YandexCloudException(f"Unknown record type: {_type}")
 
     data = {'type': record_type._type, 'ttl': rset.ttl}
 
-    values = record_type.parse_rdata_texts(rset.data)
+    values = record_type.parse_rdata_texts(rdata_texts)
     if len(values) == 1:
         data['value'] = values[0]
     else:
@@ -80,7 +114,17 @@ def map_octodns_to_rset(record: Record):
     )
 
 
-class YandexCloudProvider(_AuthMixin, BaseProvider):
+class YandexCloudProvider(
+    _AuthMixin,
+    _ChannelMixin,
+    _FolderMixin,
+    _MetricsMixin,
+    _ProgressMixin,
+    _EstimateMixin,
+    _JournalMixin,
+    _RateLimitMixin,
+    BaseProvider,
+):
     SUPPORTS_GEO = False
     SUPPORTS_DYNAMIC = False
     SUPPORTS_MULTIVALUE_PTR = True
@@ -102,21 +146,59 @@ class YandexCloudProvider(_AuthMixin, BaseProvider):
     }
 
     UPDATE_CHUNK_SIZE = 1000
+    # Max number of names in a single verification listing
+    VERIFY_CHUNK_SIZE = 100
+    # Max number of failures included in an error message
+    VERIFY_REPORT_SIZE = 10
 
     prioritize_public = None
+    fire_and_verify = False
+    record_filter = RecordSetFilter()
+    snapshot_dir = None
+    list_retry_budget = 60
+    hedgers = dict()
     auth_kwargs = dict()
     zone_ids_map = dict()
+    zone_ids_index = dict()
 
     sdk = None
     dns_service = None
+    operation_service = None
 
     def __init__(
         self,
         id: str,
-        folder_id: str,
-        auth_type: str,
+        folder_id: str = None,
+        auth_type: str = None,
         prioritize_public=None,
         zone_ids_map=None,
+        managed_names=None,
+        managed_types=None,
+        snapshot_dir=None,
+        folder_ids=None,
+        cloud_id=None,
+        max_workers=4,
+        list_timeout=None,
+        list_retry_budget=60,
+        list_hedge_percentile=None,
+        metrics_textfile=None,
+        grpc_compression=None,
+        grpc_max_send_message_length=None,
+        grpc_max_receive_message_length=None,
+        grpc_keepalive_time=None,
+        grpc_keepalive_timeout=None,
+        grpc_deadlines=None,
+        operation_poll_initial=0.05,
+        operation_poll_max=2.0,
+        operation_poll_multiplier=2.0,
+        operation_timeout=600,
+        fire_and_verify=False,
+        progress_interval=10,
+        progress_callback=None,
+        plan_api_calls_warning=100,
+        journal_dir=None,
+        journal_max_age=None,
+        rate_limits=None,
         oauth_token=None,
         iam_token=None,
         sa_key_file=None,
@@ -126,8 +208,42 @@ class YandexCloudProvider(_AuthMixin, BaseProvider):
     ):
         self.log = getLogger(f"YandexCloudProvider[{id}]")
 
-        self.folder_id = folder_id
+        self.init_folders(folder_id, folder_ids, cloud_id, max_workers)
         self.prioritize_public = prioritize_public
+        self.fire_and_verify = fire_and_verify
+        self.record_filter = RecordSetFilter(managed_names, managed_types)
+        self.snapshot_dir = snapshot_dir
+        self.list_timeout = list_timeout
+        self.list_retry_budget = list_retry_budget
+        if list_hedge_percentile:
+            self.hedgers = {
+                method: Hedger(
+                    list_hedge_percentile,
+                    congested=functools.partial(
+                        self.limits.congested, 'dns', method
+                    ),
+                )
+                for method in ('List', 'ListRecordSets')
+            }
+        self.init_metrics(metrics_textfile)
+        self.init_progress(progress_interval, progress_callback)
+        self.init_estimate(plan_api_calls_warning)
+        self.init_journal(journal_dir, journal_max_age)
+        self.init_rate_limits(rate_limits)
+        self.init_channel(
+            grpc_compression,
+            grpc_max_send_message_length,
+            grpc_max_receive_message_length,
+            grpc_keepalive_time,
+            grpc_keepalive_timeout,
+            grpc_deadlines,
+        )
+        self.operation_polling = {
+            'initial_delay': operation_poll_initial,
+            'max_delay': operation_poll_max,
+            'multiplier': operation_poll_multiplier,
+            'timeout': operation_timeout,
+        }
 
         if isinstance(zone_ids_map, dict):
             self.zone_ids_map = zone_ids_map
@@ -136,20 +252,42 @@ class YandexCloudProvider(_AuthMixin, BaseProvider):
             auth_type, oauth_token, iam_token, sa_key_file, sa_key
         )
         self.log.debug(
-            '__init__: folder_id=%s auth_type=%s auth_kwargs=%s',
-            self.folder_id,
+            '__init__: folder_ids=%s cloud_id=%s auth_type=%s auth_kwargs=%s',
+            self.folder_ids,
+            self.cloud_id,
             auth_type,
             self.auth_kwargs,
         )
 
         super().__init__(id, *args, **kwargs)
 
-        self.sdk = yandexcloud.SDK(
-            user_agent=get_user_agent(), **self.auth_kwargs
+        self.sdk = self.configure_sdk(
+            yandexcloud.SDK(user_agent=get_user_agent(), **self.auth_kwargs)
+        )
+        self.dns_service = instrument_stub(
+            self.configure_stub(self.sdk.client(DnsZoneServiceStub)),
+            'dns',
+            self.metrics,
+            self.limits,
         )
-        self.dns_service = self.sdk.client(DnsZoneServiceStub)
+        self.operation_service = instrument_stub(
+            self.configure_stub(self.sdk.client(OperationServiceStub)),
+            'operation',
+            self.metrics,
+            self.limits,
+        )
+
+    def make_operation_waiter(self):
+        return OperationWaiter(self.operation_service, **self.operation_polling)
 
-    def get_zone_id_by_name(self, zone_name):
+    def make_retry(self):
+        # List calls of a zone share one retry budget
+        if not self.list_retry_budget:
+            return None
+        return RetryBudget(self.list_retry_budget)
+
+    @traced('YandexCloudProvider.get_zone_id_by_name')
+    def get_zone_id_by_name(self, zone_name, retry=None):
         decoded_name = idna_decode(zone_name)
         mapped_id = self.zone_ids_map.get(
             decoded_name, self.zone_ids_map.get(zone_name, None)
@@ -161,19 +299,46 @@ class YandexCloudProvider(_AuthMixin, BaseProvider):
             )
             return mapped_id
 
+        if zone_name in self.zone_ids_index:
+            self.log.debug(
+                'get_zone_id_by_name: Found zone_name=%s in listed zones',
+                zone_name,
+            )
+            return self.zone_ids_index[zone_name]
+
         self.log.debug('get_zone_id_by_name: name=%s', decoded_name)
 
+        if retry is None:
+            retry = self.make_retry()
+        list_zones = resilient(
+            self.dns_service.List, retry, self.hedgers.get('List')
+        )
+
         # XXX: Will miss public zone if there is more than 1000 equally named internal zones
-        zones = self.dns_service.List(
-            ListDnsZonesRequest(
-                folder_id=self.folder_id, filter=f'zone="{zone_name}"'
-            )
-        ).dns_zones
+        def _list(folder_id):
+            return list_zones(
+                ListDnsZonesRequest(
+                    folder_id=folder_id, filter=f'zone="{zone_name}"'
+                )
+            ).dns_zones
 
-        if len(zones) < 1:
+        zones = [
+            e for folder_zones in self.map_folders(_list) for e in folder_zones
+        ]
+
+        zone = self._select_zone(zone_name, zones)
+        if zone is None:
             self.log.debug('get_zone_id_by_name: No zones found')
             return None
 
+        self.log.info(
+            'get_zone_id_by_name: Found zone_id=%s for zone_name=%s',
+            zone.id,
+            zone_name,
+        )
+        return zone.id
+
+    def _select_zone(self, zone_name, zones):
         if len(zones) > 1 and self.prioritize_public is not None:
             if self.prioritize_public:
                 public_zone = [
@@ -200,92 +365,209 @@ class YandexCloudProvider(_AuthMixin, BaseProvider):
                 zone_name,
             )
 
-        zone = zones[0]
-        self.log.info(
-            'get_zone_id_by_name: Found zone_id=%s for zone_name=%s',
-            zone.id,
-            zone_name,
-        )
-        return zone.id
+        return zones[0] if zones else None
+
+    @traced('YandexCloudProvider.list_zones')
+    def list_zones(self):
+        retry = self.make_retry()
+
+        def _list(folder_id):
+            return list(
+                Paginator(
+                    self.dns_service.List,
+                    ListDnsZonesRequest(folder_id=folder_id),
+                    'dns_zones',
+                    timeout=self.list_timeout,
+                    retry=retry,
+                    hedger=self.hedgers.get('List'),
+                )
+            )
+
+        by_name = {}
+        for folder_zones in self.map_folders(_list):
+            for zone in folder_zones:
+                by_name.setdefault(zone.zone, []).append(zone)
+
+        # Found zones are used by populate and apply without another lookup
+        zone_ids = {}
+        for zone_name, zones in by_name.items():
+            zone = self._select_zone(zone_name, zones)
+            if zone is not None:
+                zone_ids[zone_name] = zone.id
+        self.zone_ids_index = zone_ids
 
+        self.log.info('list_zones: Found %d zones', len(zone_ids))
+        return sorted(zone_ids.keys())
+
+    @profiled('populate')
     def populate(self, zone, target=False, lenient=False):
-        self.log.debug(
-            'populate: name=%s, target=%s, lenient=%s',
+        with zone_span(
+            'YandexCloudProvider.populate',
             zone.name,
-            target,
-            lenient,
-        )
+            target=target,
+            lenient=lenient,
+        ):
+            self.log.debug(
+                'populate: name=%s, target=%s, lenient=%s',
+                zone.name,
+                target,
+                lenient,
+            )
 
-        zone_id = self.get_zone_id_by_name(zone.name)
-        if zone_id is None:
-            self.log.info('populate: Zone not found')
-            return False
+            retry = self.make_retry()
+            zone_id = self.get_zone_id_by_name(zone.name, retry)
+            if zone_id is None:
+                self.log.info('populate: Zone not found')
+                return False
 
-        before = len(zone.records)
-        done = False
-        page_token = None
-        while not done:
-            resp = self.dns_service.ListRecordSets(
+            before = len(zone.records)
+            pages = Paginator(
+                self.dns_service.ListRecordSets,
                 ListDnsZoneRecordSetsRequest(
-                    dns_zone_id=zone_id, page_token=page_token
-                )
+                    dns_zone_id=zone_id,
+                    filter=self.record_filter.expression(zone.name),
+                ),
+                'record_sets',
+                timeout=self.list_timeout,
+                retry=retry,
+                hedger=self.hedgers.get('ListRecordSets'),
             )
+            with self.open_snapshot(zone.name) as snapshot:
+                for resp in pages.iter_pages():
+                    if snapshot is not None:
+                        for rset in resp.record_sets:
+                            snapshot.write(rset)
+                    with span(
+                        'YandexCloudProvider.map_records',
+                        records=len(resp.record_sets),
+                    ):
+                        # Records don't refer to the page, so at most the
+                        # current and the prefetched pages are alive
+                        self.add_rsets(zone, lenient, resp.record_sets)
+
+            self.log.debug('populate: fetched %s, %s', pages, retry)
+            self.log.info(
+                'populate: found %s records', len(zone.records) - before
+            )
+            return True
+
+    def add_rsets(self, zone, lenient, rsets):
+        record_filter = self.record_filter
+        for rset in rsets:
+            if rset.type not in self.SUPPORTS | {'ANAME'}:
+                continue
+            if record_filter.patterns and not record_filter.match_name(
+                zone.hostname_from_fqdn(rset.name)
+            ):
+                continue
+            record = map_rset_to_octodns(self, zone, lenient, rset)
+            zone.add_record(record, lenient=lenient)
+
+    def open_snapshot(self, zone_name):
+        # Record sets of populated zones are saved for snapshot source
+        if not self.snapshot_dir:
+            return nullcontext()
+        return SnapshotWriter(snapshot_path(self.snapshot_dir, zone_name))
+
+    def _process_desired_zone(self, desired):
+        if self.record_filter:
+            self.record_filter.omit_unmanaged(self, desired)
+        return super()._process_desired_zone(desired)
+
+    def _api_error(self, e):
+        state = e.args[0]
+        return YandexCloudException(
+            f"API error: code={state.code}, details={state.details}"
+        )
 
-            if resp.next_page_token:
-                page_token = resp.next_page_token
-            else:
-                done = True
-
-            for rset in resp.record_sets:
-                if rset.type not in self.SUPPORTS | {'ANAME'}:
-                    continue
-                record = map_rset_to_octodns(self, zone, lenient, rset)
-                zone.add_record(record, lenient=lenient)
-
-        self.log.info('populate: found %s records', len(zone.records) - before)
-        return True
-
-    def _apply_rset_update(self, zone_id, create, delete):
+    def _submit_rset_update(self, zone_id, create, delete):
         self.log.debug(
             'Applying changes:\n- Create: %s\n- Delete: %s', create, delete
         )
 
         try:
-            operation = self.dns_service.UpdateRecordSets(
-                UpdateRecordSetsRequest(
-                    dns_zone_id=zone_id,
-                    additions=[map_octodns_to_rset(e.new) for e in create],
-                    deletions=[map_octodns_to_rset(e.existing) for e in delete],
-                )
-            )
-            self.sdk.wait_operation_and_get_result(
-                operation,
-                response_type=RecordSetDiff,
-                meta_type=UpdateRecordSetsMetadata,
+            return self.dns_service.UpdateRecordSets(
+                _update_request(zone_id, create, delete)
             )
         except grpc.RpcError as e:
-            state = e.args[0]
-            raise YandexCloudException(
-                f"API error: code={state.code}, details={state.details}"
-            ) from e
+            raise self._api_error(e) from e
 
-    def _apply(self, plan):
-        zone_name = plan.desired.name
-        changes = plan.changes
+    def _wait_operation(self, operation, waiter, progress=None):
+        on_poll = progress.update if progress is not None else None
+        try:
+            with self.metrics.measure('operation', 'Wait'):
+                return waiter.wait(operation, on_poll)
+        except grpc.RpcError as e:
+            raise self._api_error(e) from e
 
-        zone_id = self.get_zone_id_by_name(zone_name)
-        if zone_id is None:
-            raise YandexCloudException(
-                'Zone not found (zone creation is not supported)'
+    def _apply_rset_update(
+        self, zone_id, create, delete, waiter, progress, journal, step
+    ):
+        with span(
+            'YandexCloudProvider.apply_chunk',
+            zone_id=zone_id,
+            creates=len(create),
+            deletes=len(delete),
+        ):
+            progress.begin()
+            if journal is not None:
+                journal.start(step)
+            operation = self._submit_rset_update(zone_id, create, delete)
+            if journal is not None:
+                journal.start(step, operation.id)
+            self._wait_operation(operation, waiter, progress)
+            if journal is not None:
+                journal.finish(step)
+            progress.advance(_chunk_size(create, delete))
+
+    def _resume_chunk(
+        self, zone_id, zone, step, create, delete, journal, waiter
+    ):
+        # True if the chunk is applied by an interrupted apply. A chunk which
+        # was started but not confirmed is waited for and checked by listing
+        # of its names only
+        if journal is None:
+            return False
+        elif step in journal.done:
+            return True
+        elif step not in journal.started:
+            return False
+
+        operation_id = journal.started[step]
+        if operation_id is not None:
+            try:
+                self._wait_operation(Operation(id=operation_id), waiter)
+            except YandexCloudException as e:
+                self.log.info('_resume_chunk: step %d: %s', step, e)
+        try:
+            self._verify_changes(
+                zone_id, zone, create + [e for e in delete if e.new is None]
             )
+        except YandexCloudException as e:
+            self.log.info('_resume_chunk: step %d is not applied: %s', step, e)
+            return False
 
-        self.log.debug(
-            '_apply: zone_id=%s, zone_name=%s, len(changes)=%d',
-            zone_id,
-            zone_name,
-            len(changes),
-        )
+        journal.finish(step)
+        return True
+
+    def _apply_chunks(self, zone_id, zone, chunks, waiter, progress, journal):
+        for step, (create_chunk, delete_chunk) in enumerate(chunks):
+            if self._resume_chunk(
+                zone_id, zone, step, create_chunk, delete_chunk, journal, waiter
+            ):
+                progress.advance(_chunk_size(create_chunk, delete_chunk))
+                continue
+            self._apply_rset_update(
+                zone_id,
+                create_chunk,
+                delete_chunk,
+                waiter,
+                progress,
+                journal,
+                step,
+            )
 
+    def _chunk_changes(self, changes):
         delete, create, update = [], [], []
         for change in changes:
             if change.new is None:
@@ -311,11 +593,172 @@ class YandexCloudProvider(_AuthMixin, BaseProvider):
                 create_chunk += update
                 delete_chunk += update
                 update = []
-            self._apply_rset_update(zone_id, create_chunk, delete_chunk)
+            yield create_chunk, delete_chunk
 
         # Process updates separately (if it was not done before)
         # API guarantees that deletions processed before additions
         for i in range(0, len(update), self.UPDATE_CHUNK_SIZE):
             chunk = update[i : i + self.UPDATE_CHUNK_SIZE]
+            yield chunk, chunk
+
+    def _apply_fire_and_verify(
+        self, zone_id, zone, changes, chunks, waiter, progress, journal
+    ):
+        # All operations are submitted without waiting, then waited together
+        # and the result is checked by listing of the changed names only.
+        # Progress is counted by waited operations
+        operations, error = [], None
+        for step, (create_chunk, delete_chunk) in enumerate(chunks):
+            size = _chunk_size(create_chunk, delete_chunk)
+            if self._resume_chunk(
+                zone_id, zone, step, create_chunk, delete_chunk, journal, waiter
+            ):
+                progress.advance(size)
+                continue
+            try:
+                with span(
+                    'YandexCloudProvider.submit_chunk',
+                    zone_id=zone_id,
+                    creates=len(create_chunk),
+                    deletes=len(delete_chunk),
+                ):
+                    if journal is not None:
+                        journal.start(step)
+                    operation = self._submit_rset_update(
+                        zone_id, create_chunk, delete_chunk
+                    )
+                    if journal is not None:
+                        journal.start(step, operation.id)
+                    operations.append((step, operation, size))
+            except YandexCloudException as e:
+                # Already submitted operations are still waited
+                error = e
+                break
+        self.log.info(
+            '_apply_fire_and_verify: submitted %d operations', len(operations)
+        )
+
+        failed = []
+        for step, operation, size in operations:
+            progress.begin()
+            try:
+                self._wait_operation(operation, waiter, progress)
+                if journal is not None:
+                    journal.finish(step)
+            except YandexCloudException as e:
+                failed.append(str(e))
+            progress.advance(size)
+
+        if error is not None:
+            raise error
+        if failed:
+            raise YandexCloudException(
+                f"{len(failed)} of {len(operations)} operations failed: "
+                + '; '.join(failed[: self.VERIFY_REPORT_SIZE])
+            )
+
+        self._verify_changes(zone_id, zone, changes)
+
+    def estimate_cost(self, plan):
+        # Same chunks as _apply, zone id is not known without an API call
+        chunks = list(self._chunk_changes(plan.changes))
+        calls = {'UpdateRecordSets': len(chunks)}
+        if self.fire_and_verify:
+            names = {(e.new or e.existing).fqdn for e in plan.changes}
+            calls['ListRecordSets'] = len(
+                range(0, len(names), self.VERIFY_CHUNK_SIZE)
+            )
+        return ApiCostEstimate(
+            calls, sum(_update_request('', *e).ByteSize() for e in chunks)
+        )
+
+    def _verify_changes(self, zone_id, zone, changes):
+        # (fqdn, type) -> expected record, None for deleted ones
+        expected = {}
+        for change in changes:
+            record = change.new or change.existing
+            expected[(record.fqdn, record._type.split('/')[-1])] = change.new
+
+        names = sorted({e[0] for e in expected})
+        found = {}
+        retry = self.make_retry()
+        with span('YandexCloudProvider.verify', names=len(names)):
+            for i in range(0, len(names), self.VERIFY_CHUNK_SIZE):
+                chunk = names[i : i + self.VERIFY_CHUNK_SIZE]
+                expr = ', '.join(f'"{e}"' for e in chunk)
+                pages = Paginator(
+                    self.dns_service.ListRecordSets,
+                    ListDnsZoneRecordSetsRequest(
+                        dns_zone_id=zone_id, filter=f'name IN ({expr})'
+                    ),
+                    'record_sets',
+                    timeout=self.list_timeout,
+                    retry=retry,
+                    hedger=self.hedgers.get('ListRecordSets'),
+                )
+                for rset in pages:
+                    found[(rset.name, rset.type)] = rset
+
+        mismatches = []
+        for key in sorted(expected.keys()):
+            record, rset = expected[key], found.get(key)
+            if record is None:
+                if rset is not None:
+                    mismatches.append(f'{key[0]} {key[1]} is not deleted')
+            elif rset is None:
+                mismatches.append(f'{key[0]} {key[1]} is missing')
+            elif record.changes(
+                map_rset_to_octodns(self, zone, True, rset), self
+            ):
+                mismatches.append(f'{key[0]} {key[1]} differs')
+
+        if mismatches:
+            raise YandexCloudException(
+                f"Verification failed for {len(mismatches)} record sets: "
+                + ', '.join(mismatches[: self.VERIFY_REPORT_SIZE])
+            )
+        self.log.info('_verify_changes: verified %d record sets', len(expected))
+
+    @profiled('apply')
+    def _apply(self, plan):
+        with zone_span(
+            'YandexCloudProvider.apply',
+            plan.desired.name,
+            changes=len(plan.changes),
+        ):
+            zone_name = plan.desired.name
+            changes = plan.changes
+
+            zone_id = self.get_zone_id_by_name(zone_name)
+            if zone_id is None:
+                raise YandexCloudException(
+                    'Zone not found (zone creation is not supported)'
+                )
+
+            self.log.debug(
+                '_apply: zone_id=%s, zone_name=%s, len(changes)=%d',
+                zone_id,
+                zone_name,
+                len(changes),
+            )
+
+            waiter = self.make_operation_waiter()
+            chunks = list(self._chunk_changes(changes))
+            progress = self.make_progress(zone_name, len(chunks), len(changes))
+            with self.journaled(plan) as journal:
+                if self.fire_and_verify:
+                    self._apply_fire_and_verify(
+                        zone_id,
+                        plan.desired,
+                        changes,
+                        chunks,
+                        waiter,
+                        progress,
+                        journal,
+                    )
+                else:
+                    self._apply_chunks(
+                        zone_id, plan.desired, chunks, waiter, progress, journal
+                    )
 
-            self._apply_rset_update(zone_id, chunk, chunk)
+            self.log.info('_apply: waited for %s', waiter)
@@ -0,0 +1,90 @@
+import os
+from logging import getLogger
+
+from octodns.provider.base import BaseProvider
+
+from octodns_yandex.exception import YandexCloudException
+from octodns_yandex.filter import RecordSetFilter
+from octodns_yandex.profiling import profiled
+from octodns_yandex.snapshot import read_snapshot, snapshot_path
+from octodns_yandex.tracing import zone_span
+from octodns_yandex.yandexcloud_provider import (
+    YandexCloudProvider,
+    map_rset_to_octodns,
+)
+
+
+# Reads zones from snapshots written by YandexCloudProvider with
+# 'snapshot_dir' option, without any API calls. Could be used as a target
+# of plan-only runs to reproduce plans against the saved state, managed
+# names and types should be the same as of the provider
+class YandexCloudSnapshotSource(BaseProvider):
+    SUPPORTS_GEO = False
+    SUPPORTS_DYNAMIC = False
+    SUPPORTS_MULTIVALUE_PTR = True
+    SUPPORTS_ROOT_NS = True
+    SUPPORTS = YandexCloudProvider.SUPPORTS
+
+    def __init__(
+        self,
+        id,
+        directory,
+        managed_names=None,
+        managed_types=None,
+        *args,
+        **kwargs,
+    ):
+        self.log = getLogger(f"YandexCloudSnapshotSource[{id}]")
+
+        self.directory = directory
+        self.record_filter = RecordSetFilter(managed_names, managed_types)
+        self.log.debug('__init__: directory=%s', directory)
+
+        super().__init__(id, *args, **kwargs)
+
+    @profiled('populate')
+    def populate(self, zone, target=False, lenient=False):
+        with zone_span(
+            'YandexCloudSnapshotSource.populate',
+            zone.name,
+            target=target,
+            lenient=lenient,
+        ):
+            self.log.debug(
+                'populate: name=%s, target=%s, lenient=%s',
+                zone.name,
+                target,
+                lenient,
+            )
+
+            path = snapshot_path(self.directory, zone.name)
+            if not os.path.exists(path):
+                self.log.info('populate: Snapshot %s not found', path)
+                return False
+
+            before = len(zone.records)
+            record_filter = self.record_filter
+            for rset in read_snapshot(path):
+                if rset.type not in self.SUPPORTS | {'ANAME'}:
+                    continue
+                # Snapshot holds record sets as returned by API, names are
+                # not filtered by API if there are patterns
+                if not record_filter.match(
+                    zone.hostname_from_fqdn(rset.name), rset.type
+                ):
+                    continue
+                record = map_rset_to_octodns(self, zone, lenient, rset)
+                zone.add_record(record, lenient=lenient)
+
+            self.log.info(
+                'populate: found %s records', len(zone.records) - before
+            )
+            return True
+
+    def _process_desired_zone(self, desired):
+        if self.record_filter:
+            self.record_filter.omit_unmanaged(self, desired)
+        return super()._process_desired_zone(desired)
+
+    def _apply(self, plan):
+        raise YandexCloudException('Zone snapshots are read-only')
@@ -20,12 +20,20 @@ def version():
 
 description, long_description = descriptions()
 
-tests_require = ('pytest', 'pytest-cov', 'pytest-network')
+tests_require = (
+    'opentelemetry-sdk>=1.0.0',
+    'pytest',
+    'pytest-cov',
+    'pytest-network',
+)
 
 setup(
     author='Victor Scherbackov',
     author_email='victor@90victor09.ru',
     description=description,
+    entry_points={
+        'console_scripts': ('octodns-yandex-dump = octodns_yandex.dump:main',)
+    },
     extras_require={
         'dev': tests_require
         + (
@@ -37,10 +45,12 @@ setup(
             'build>=0.7.0',
             'isort>=5.11.5',
             'pyflakes>=2.2.0',
+            'pytest-benchmark>=4.0.0',
             'readme_renderer[md]>=26.0',
             'twine>=3.4.2',
         ),
         'test': tests_require,
+        'tracing': ('opentelemetry-api>=1.0.0',),
     },
     install_requires=(
         'octodns>=1.0.0',
@@ -0,0 +1,299 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+from google.protobuf.any_pb2 import Any
+from google.protobuf.timestamp_pb2 import Timestamp
+from google.rpc.status_pb2 import Status
+from yandex.cloud.dns.v1.dns_zone_pb2 import DnsZone, RecordSet
+from yandex.cloud.dns.v1.dns_zone_service_pb2 import (
+    ListDnsZoneRecordSetsResponse,
+    ListDnsZonesResponse,
+    RecordSetDiff,
+    UpdateRecordSetsMetadata,
+)
+from yandex.cloud.dns.v1.dns_zone_service_pb2_grpc import (
+    DnsZoneServiceServicer,
+    add_DnsZoneServiceServicer_to_server,
+)
+from yandex.cloud.operation.operation_pb2 import Operation
+from yandex.cloud.operation.operation_service_pb2_grpc import (
+    OperationServiceServicer,
+    add_OperationServiceServicer_to_server,
+)
+
+from tests.fixtures import STUB_FOLDER_ID
+
+# In-process fake of Yandex Cloud DnsZoneService and OperationService.
+# Keeps zones in memory and allows to inject per-call latency, errors
+# and page sizes, so YandexCloudProvider could be tested end to end over
+# real gRPC channels without network access.
+
+
+class FakeDnsState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.zones = {}
+        self.record_sets = {}
+        self.operations = {}
+        self._next_id = 0
+
+    def make_id(self, prefix):
+        self._next_id += 1
+        return f'{prefix}{self._next_id:017d}'
+
+    def add_zone(self, zone_name, folder_id=STUB_FOLDER_ID, public=True):
+        with self.lock:
+            zone = DnsZone(
+                id=self.make_id('dns'),
+                folder_id=folder_id,
+                name=zone_name.rstrip('.').replace('.', '-'),
+                zone=zone_name,
+            )
+            if public:
+                zone.public_visibility.SetInParent()
+            else:
+                zone.private_visibility.SetInParent()
+
+            self.zones[zone.id] = zone
+            self.record_sets[zone.id] = {}
+        return zone
+
+    def add_record_sets(self, zone_id, rsets):
+        with self.lock:
+            for rset in rsets:
+                self.record_sets[zone_id][(rset.name, rset.type)] = rset
+
+    def get_record_sets(self, zone_id):
+        with self.lock:
+            rsets = self.record_sets[zone_id]
+            return [rsets[k] for k in sorted(rsets.keys())]
+
+
+class _FaultsMixin:
+    def __init__(self, latency=None, errors=None):
+        # method name -> seconds
+        self.latency = latency or {}
+        # method name -> list of grpc.StatusCode, consumed one per call
+        self.errors = errors or {}
+        self.calls = {}
+
+    def inject(self, method, context):
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+        delay = self.latency.get(method, self.latency.get('*', 0))
+        if delay:
+            time.sleep(delay)
+
+        # None in the list lets the call pass
+        codes = self.errors.get(method)
+        code = codes.pop(0) if codes else None
+        if code is not None:
+            context.abort(code, f'Injected error for {method}')
+
+
+def _paginate(items, request, page_size):
+    offset = int(request.page_token) if request.page_token else 0
+    page_size = request.page_size or page_size
+    next_offset = offset + page_size
+    next_page_token = str(next_offset) if next_offset < len(items) else ''
+    return items[offset:next_offset], next_page_token
+
+
+def _parse_filter(expr):
+    # Only `field="value"` and `field IN ("a", "b")` conditions joined
+    # by AND are supported
+    conditions = []
+    for condition in expr.split(' AND ') if expr else []:
+        if ' IN ' in condition:
+            field, values = condition.split(' IN ', 1)
+            values = values.strip().strip('()').split(',')
+        else:
+            field, values = condition.split('=', 1)
+            values = [values]
+        conditions.append(
+            (field.strip(), {e.strip().strip('"') for e in values})
+        )
+    return conditions
+
+
+def _apply_filter(items, expr):
+    for field, values in _parse_filter(expr):
+        items = [e for e in items if getattr(e, field) in values]
+    return items
+
+
+class FakeDnsZoneService(_FaultsMixin, DnsZoneServiceServicer):
+    def __init__(self, state, page_size=100, operation_delay=0, **kwargs):
+        super().__init__(**kwargs)
+        self.state = state
+        self.page_size = page_size
+        self.operation_delay = operation_delay
+
+    def List(self, request, context):
+        self.inject('List', context)
+
+        zones = [
+            e
+            for e in self.state.zones.values()
+            if e.folder_id == request.folder_id
+        ]
+        zones = _apply_filter(zones, request.filter)
+
+        page, next_page_token = _paginate(zones, request, self.page_size)
+        return ListDnsZonesResponse(
+            dns_zones=page, next_page_token=next_page_token
+        )
+
+    def ListRecordSets(self, request, context):
+        self.inject('ListRecordSets', context)
+
+        if request.dns_zone_id not in self.state.zones:
+            context.abort(grpc.StatusCode.NOT_FOUND, 'Zone not found')
+
+        rsets = self.state.get_record_sets(request.dns_zone_id)
+        rsets = _apply_filter(rsets, request.filter)
+        page, next_page_token = _paginate(rsets, request, self.page_size)
+        return ListDnsZoneRecordSetsResponse(
+            record_sets=page, next_page_token=next_page_token
+        )
+
+    def UpdateRecordSets(self, request, context):
+        self.inject('UpdateRecordSets', context)
+
+        zone_id = request.dns_zone_id
+        if zone_id not in self.state.zones:
+            context.abort(grpc.StatusCode.NOT_FOUND, 'Zone not found')
+
+        error = None
+        with self.state.lock:
+            rsets = dict(self.state.record_sets[zone_id])
+            # Deletions are processed before additions
+            for rset in request.deletions:
+                if rsets.pop((rset.name, rset.type), None) is None:
+                    error = f'Record set {rset.name} {rset.type} not found'
+                    break
+            for rset in request.additions:
+                if error is not None:
+                    break
+                if (rset.name, rset.type) in rsets:
+                    error = f'Record set {rset.name} {rset.type} already exists'
+                    break
+                rsets[(rset.name, rset.type)] = RecordSet(
+                    name=rset.name, type=rset.type, ttl=rset.ttl, data=rset.data
+                )
+            if error is None:
+                self.state.record_sets[zone_id] = rsets
+
+            operation = Operation(
+                id=self.state.make_id('dnsop'),
+                description='Update record sets',
+                created_at=Timestamp(seconds=int(time.time())),
+                done=False,
+            )
+            operation.metadata.Pack(UpdateRecordSetsMetadata())
+            if error is None:
+                response = Any()
+                response.Pack(
+                    RecordSetDiff(
+                        additions=request.additions, deletions=request.deletions
+                    )
+                )
+                final = (response, None)
+            else:
+                final = (None, Status(code=9, message=error))
+
+            ready_at = time.monotonic() + self.operation_delay
+            self.state.operations[operation.id] = (operation, final, ready_at)
+
+        return operation
+
+
+class FakeOperationService(_FaultsMixin, OperationServiceServicer):
+    def __init__(self, state, **kwargs):
+        super().__init__(**kwargs)
+        self.state = state
+
+    def Get(self, request, context):
+        self.inject('Get', context)
+
+        with self.state.lock:
+            item = self.state.operations.get(request.operation_id)
+        if item is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, 'Operation not found')
+
+        operation, (response, error), ready_at = item
+        result = Operation()
+        result.CopyFrom(operation)
+        if time.monotonic() >= ready_at:
+            result.done = True
+            if error is not None:
+                result.error.CopyFrom(error)
+            else:
+                result.response.CopyFrom(response)
+        return result
+
+
+class LocalSDK:
+    # Stand-in for yandexcloud.SDK which talks to the local server through
+    # a single insecure channel
+    def __init__(self, address):
+        self.channel = grpc.insecure_channel(address)
+
+    def client(self, stub_ctor, interceptor=None):
+        channel = self.channel
+        if interceptor is not None:
+            channel = grpc.intercept_channel(channel, interceptor)
+        return stub_ctor(channel)
+
+    def close(self):
+        self.channel.close()
+
+
+class FakeDnsServer:
+    def __init__(
+        self,
+        page_size=100,
+        latency=None,
+        errors=None,
+        operation_delay=0,
+        operation_latency=None,
+        operation_errors=None,
+        max_workers=10,
+    ):
+        self.state = FakeDnsState()
+        self.dns_service = FakeDnsZoneService(
+            self.state,
+            page_size=page_size,
+            operation_delay=operation_delay,
+            latency=latency,
+            errors=errors,
+        )
+        self.operation_service = FakeOperationService(
+            self.state, latency=operation_latency, errors=operation_errors
+        )
+
+        self.server = grpc.server(ThreadPoolExecutor(max_workers=max_workers))
+        add_DnsZoneServiceServicer_to_server(self.dns_service, self.server)
+        add_OperationServiceServicer_to_server(
+            self.operation_service, self.server
+        )
+        self.port = self.server.add_insecure_port('localhost:0')
+        self.address = f'localhost:{self.port}'
+        self._sdks = []
+
+    def __enter__(self):
+        self.server.start()
+        return self
+
+    def __exit__(self, *args):
+        for sdk in self._sdks:
+            sdk.close()
+        self.server.stop(None)
+
+    def sdk(self, *args, **kwargs):
+        # Accepts yandexcloud.SDK arguments, so could be used in its place
+        sdk = LocalSDK(self.address)
+        self._sdks.append(sdk)
+        return sdk
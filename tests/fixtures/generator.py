@@ -0,0 +1,273 @@
+import random
+import string
+
+from yandex.cloud.cdn.v1.resource_pb2 import Resource
+from yandex.cloud.certificatemanager.v1.certificate_pb2 import (
+    Certificate,
+    CertificateType,
+    Challenge,
+    ChallengeType,
+)
+from yandex.cloud.dns.v1.dns_zone_pb2 import RecordSet
+
+from tests.fixtures import STUB_FOLDER_ID, STUB_ZONE_NAME
+
+# Seeded generators of realistic API objects at any scale.
+# Same seed and arguments always produce the same objects.
+
+_BASE64 = string.ascii_letters + string.digits + '+/'
+_TTLS = (60, 300, 300, 600, 3600, 3600, 3600, 86400)
+
+# (type, weight) of generated record sets, roughly matching production zones
+TYPE_WEIGHTS = (
+    ('A', 35),
+    ('AAAA', 8),
+    ('CNAME', 20),
+    ('TXT', 8),
+    ('DKIM', 6),
+    ('MX', 6),
+    ('SRV', 6),
+    ('CAA', 4),
+    ('ANAME', 4),
+    ('NS', 3),
+)
+
+# Yandex 360 doesn't support ANAME and PTR
+YA360_TYPE_WEIGHTS = tuple(e for e in TYPE_WEIGHTS if e[0] != 'ANAME')
+
+
+def _values_count(rng):
+    # Most of the record sets have a single value
+    return rng.choices((1, 2, 3, 4), weights=(70, 18, 8, 4))[0]
+
+
+def _base64(rng, length):
+    return ''.join(rng.choice(_BASE64) for _ in range(length))
+
+
+def _ipv4(rng):
+    return (
+        f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}'
+    )
+
+
+def _ipv6(rng):
+    return f'2001:db8:{rng.randrange(1, 65536):x}::{rng.randrange(1, 65536):x}'
+
+
+def _hostname(rng, zone_name):
+    prefix = rng.choice(('app', 'web', 'api', 'db'))
+    return f'{prefix}{rng.randrange(1000)}.{zone_name}'
+
+
+def _record_values(rng, _type, zone_name):
+    # Values and name prefix as RecordSet.data of Yandex Cloud DNS
+    count = _values_count(rng)
+    if _type == 'A':
+        return 'host', sorted({_ipv4(rng) for _ in range(count)})
+    elif _type == 'AAAA':
+        return 'host6-', sorted({_ipv6(rng) for _ in range(count)})
+    elif _type == 'CNAME':
+        return 'alias', [_hostname(rng, zone_name)]
+    elif _type == 'ANAME':
+        return 'aname', [_hostname(rng, zone_name)]
+    elif _type == 'TXT':
+        return 'txt', [
+            f'v=spf1 include:_spf{rng.randrange(100)}.example.net ~all'
+        ]
+    elif _type == 'DKIM':
+        # 1024 or 2048 bit keys, escaped as returned by the API
+        key = _base64(rng, rng.choice((216, 392)))
+        return 'dkim', [f'v=DKIM1\\; k=rsa\\; p={key}']
+    elif _type == 'MX':
+        return 'mx', sorted(
+            {f'{10 * (i + 1)} mx{i}.{zone_name}' for i in range(count)}
+        )
+    elif _type == 'SRV':
+        return 'srv', sorted(
+            {
+                f'{rng.randrange(1, 20)} {rng.randrange(100)} '
+                f'{rng.choice((443, 5060, 5222))} '
+                f'{_hostname(rng, zone_name)}'
+                for _ in range(count)
+            }
+        )
+    elif _type == 'CAA':
+        return (
+            'caa',
+            ['0 issue letsencrypt.org', '0 iodef mailto:security@example.com'][
+                : min(count, 2)
+            ],
+        )
+    else:  # NS
+        return 'sub', [f'ns{i}.yandexcloud.net.' for i in range(1, 3)]
+
+
+def _record_name(prefix, i, _type, zone_name):
+    if _type == 'DKIM':
+        return f'sel{i}._domainkey.{zone_name}'
+    elif _type == 'SRV':
+        return f'_sip._tcp.{prefix}{i}.{zone_name}'
+    return f'{prefix}{i}.{zone_name}'
+
+
+def generate_record_sets(
+    count, zone_name=STUB_ZONE_NAME, seed=0, type_weights=TYPE_WEIGHTS
+):
+    rng = random.Random(seed)
+    types, weights = zip(*type_weights)
+
+    rsets = []
+    for i in range(count):
+        _type = rng.choices(types, weights=weights)[0]
+        prefix, data = _record_values(rng, _type, zone_name)
+        rsets.append(
+            RecordSet(
+                name=_record_name(prefix, i, _type, zone_name),
+                type='TXT' if _type == 'DKIM' else _type,
+                ttl=rng.choice(_TTLS),
+                data=data,
+            )
+        )
+    return rsets
+
+
+def _entry_fields(_type, value):
+    if _type in ('A', 'AAAA'):
+        return {'address': value}
+    elif _type in ('CNAME', 'NS'):
+        return {'target': value}
+    elif _type == 'TXT':
+        return {'text': value.replace('\\;', ';')}
+    elif _type == 'MX':
+        preference, exchange = value.split(' ')
+        return {'preference': int(preference), 'exchange': exchange}
+    elif _type == 'SRV':
+        priority, weight, port, target = value.split(' ')
+        return {
+            'priority': int(priority),
+            'weight': int(weight),
+            'port': int(port),
+            'target': target,
+        }
+    else:  # CAA
+        flag, tag, value = value.split(' ')
+        return {'flag': int(flag), 'tag': tag, 'value': value}
+
+
+def generate_entries(count, zone_name=STUB_ZONE_NAME, seed=0):
+    # Yandex 360 DNS entries, one per value, grouped into `count` records
+    entries = []
+    record_id = 0
+    for rset in generate_record_sets(
+        count, zone_name, seed, type_weights=YA360_TYPE_WEIGHTS
+    ):
+        name = rset.name[: -len(zone_name)].rstrip('.') or '@'
+        for value in rset.data:
+            record_id += 1
+            entries.append(
+                {
+                    'recordId': record_id,
+                    'type': rset.type,
+                    'name': name,
+                    'ttl': rset.ttl,
+                    **_entry_fields(rset.type, value),
+                }
+            )
+    return entries
+
+
+def generate_zone_names(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        f'{rng.choice(("shop", "corp", "svc", "dev"))}{i}.example.com.'
+        for i in range(count)
+    ]
+
+
+def _domain(rng, i, zone_names, foreign_ratio):
+    if rng.random() < foreign_ratio:
+        return f'site{i}.example.org'
+    return f'site{i}.{rng.choice(zone_names)}'.rstrip('.')
+
+
+def generate_certificates(
+    count, zone_names, seed=0, managed_ratio=0.8, foreign_ratio=0.1
+):
+    # Certificates in FULL view, domains of `foreign_ratio` certificates
+    # don't belong to any of `zone_names`
+    rng = random.Random(seed)
+
+    certificates = []
+    for i in range(count):
+        cert_id = f'fpq{i:017d}'
+        base = _domain(rng, i, zone_names, foreign_ratio)
+        domains = [base]
+        if rng.random() < 0.3:
+            domains.append(f'*.{base}')
+        domains += [f'alt{j}.{base}' for j in range(rng.randrange(3))]
+
+        if rng.random() >= managed_ratio:
+            certificates.append(
+                Certificate(
+                    id=cert_id,
+                    folder_id=STUB_FOLDER_ID,
+                    type=CertificateType.IMPORTED,
+                    domains=domains,
+                    status=Certificate.Status.ISSUED,
+                )
+            )
+            continue
+
+        challenges = []
+        for domain in domains:
+            if domain.startswith('*.'):
+                domain = domain[2:]
+            name = f'_acme-challenge.{domain}.'
+            for challenge_type, value in (
+                ('CNAME', f'{cert_id}.cm.yandexcloud.net.'),
+                ('TXT', _base64(rng, 43)),
+            ):
+                challenges.append(
+                    Challenge(
+                        domain=domain,
+                        type=ChallengeType.DNS,
+                        status=Challenge.Status.PENDING,
+                        dns_challenge=Challenge.DnsRecord(
+                            name=name, type=challenge_type, value=value
+                        ),
+                    )
+                )
+
+        certificates.append(
+            Certificate(
+                id=cert_id,
+                folder_id=STUB_FOLDER_ID,
+                type=CertificateType.MANAGED,
+                domains=domains,
+                status=rng.choice(
+                    (Certificate.Status.ISSUED, Certificate.Status.VALIDATING)
+                ),
+                challenges=challenges,
+            )
+        )
+    return certificates
+
+
+def generate_cdn_resources(count, zone_names, seed=0, foreign_ratio=0.1):
+    rng = random.Random(seed)
+
+    resources = []
+    for i in range(count):
+        cname = f'cdn-{_domain(rng, i, zone_names, foreign_ratio)}'
+        secondary = [f'static{j}-{cname}' for j in range(rng.randrange(3))]
+        resources.append(
+            Resource(
+                id=f'bc8{i:017d}',
+                folder_id=STUB_FOLDER_ID,
+                cname=cname,
+                secondary_hostnames=secondary,
+                active=True,
+            )
+        )
+    return resources
@@ -0,0 +1,259 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for the parts of Yandex 360 API used by Yandex360Provider.
+# Keeps organizations, domains and DNS records in memory, paginates like
+# the real API and could simulate latency and 429/5xx responses.
+
+_ORG_RE = re.compile(r'^/directory/v1/org$')
+_DOMAINS_RE = re.compile(r'^/directory/v1/org/(?P<org>\d+)/domains$')
+_RECORDS_RE = re.compile(
+    r'^/directory/v1/org/(?P<org>\d+)/domains/(?P<domain>[^/]+)/dns'
+    r'(/(?P<record>\d+))?$'
+)
+
+_RECORD_FIELDS = {
+    'A': ('address',),
+    'AAAA': ('address',),
+    'CNAME': ('target',),
+    'NS': ('target',),
+    'TXT': ('text',),
+    'MX': ('preference', 'exchange'),
+    'SRV': ('priority', 'weight', 'port', 'target'),
+    'CAA': ('flag', 'tag', 'value'),
+}
+
+
+class Ya360State:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.orgs = {}
+        self.domains = {}
+        self.records = {}
+        self._next_id = 0
+
+    def make_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    def add_org(self, org_id, name=''):
+        with self.lock:
+            self.orgs[org_id] = {'id': org_id, 'name': name}
+            self.domains[org_id] = {}
+
+    def add_domain(self, org_id, domain):
+        with self.lock:
+            self.domains[org_id][domain] = {'name': domain, 'verified': True}
+            self.records[(org_id, domain)] = {}
+
+    def add_records(self, org_id, domain, entries):
+        with self.lock:
+            created = []
+            for entry in entries:
+                entry = {**entry, 'recordId': self.make_id()}
+                self.records[(org_id, domain)][entry['recordId']] = entry
+                created.append(entry)
+            return created
+
+    def get_records(self, org_id, domain):
+        with self.lock:
+            return list(self.records[(org_id, domain)].values())
+
+
+class Ya360Handler(BaseHTTPRequestHandler):
+    server_version = 'Ya360Stub/1.0'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _handle(self, method):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if self.headers.get('Authorization') != f'OAuth {stub.token}':
+            return self._send(401, {'code': 16, 'message': 'Unauthorized'})
+
+        for regex, kind in (
+            (_ORG_RE, 'orgs'),
+            (_DOMAINS_RE, 'domains'),
+            (_RECORDS_RE, 'records'),
+        ):
+            match = regex.match(url.path)
+            if match:
+                break
+        else:
+            return self._send(404, {'code': 5, 'message': 'Not found'})
+
+        code = stub.inject(method, kind)
+        if code is not None:
+            return self._send(code, {'code': 14, 'message': 'Injected'})
+
+        args = match.groupdict()
+        if 'org' in args:
+            args['org'] = int(args['org'])
+        if args.get('record'):
+            args['record'] = int(args['record'])
+
+        handler = getattr(self, f'_{method.lower()}_{kind}', None)
+        if handler is None:
+            return self._send(405, {'code': 12, 'message': 'Not allowed'})
+        return handler(stub, params, **args)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def _get_orgs(self, stub, params):
+        orgs = sorted(stub.state.orgs.values(), key=lambda e: e['id'])
+        offset = int(params.get('pageToken') or 0)
+        size = min(int(params.get('pageSize', 10)), stub.max_page_size)
+        next_offset = offset + size
+        return self._send(
+            200,
+            {
+                'organizations': orgs[offset:next_offset],
+                'nextPageToken': (
+                    str(next_offset) if next_offset < len(orgs) else ''
+                ),
+            },
+        )
+
+    def _paged(self, items, params, field):
+        page = int(params.get('page', 1))
+        max_page_size = self.server.stub.max_page_size
+        per_page = min(int(params.get('perPage', 10)), max_page_size)
+        pages = max(1, -(-len(items) // per_page))
+        return self._send(
+            200,
+            {
+                field: items[(page - 1) * per_page : page * per_page],
+                'page': page,
+                'pages': pages,
+                'perPage': per_page,
+                'total': len(items),
+            },
+        )
+
+    def _get_domains(self, stub, params, org):
+        if org not in stub.state.domains:
+            return self._send(404, {'code': 5, 'message': 'Org not found'})
+        domains = sorted(
+            stub.state.domains[org].values(), key=lambda e: e['name']
+        )
+        return self._paged(domains, params, 'domains')
+
+    def _check_domain(self, stub, org, domain):
+        if (org, domain) not in stub.state.records:
+            self._send(404, {'code': 5, 'message': 'Domain not found'})
+            return False
+        return True
+
+    def _get_records(self, stub, params, org, domain, record):
+        if not self._check_domain(stub, org, domain):
+            return
+        records = sorted(
+            stub.state.get_records(org, domain), key=lambda e: e['recordId']
+        )
+        return self._paged(records, params, 'records')
+
+    def _validate(self, entry):
+        fields = _RECORD_FIELDS.get(entry.get('type'))
+        if fields is None or any(e not in entry for e in fields):
+            self._send(400, {'code': 3, 'message': 'Invalid record'})
+            return False
+        return True
+
+    def _post_records(self, stub, params, org, domain, record):
+        if not self._check_domain(stub, org, domain):
+            return
+        entry = self._read_json()
+        if not self._validate(entry):
+            return
+
+        if record is None:
+            (entry,) = stub.state.add_records(org, domain, [entry])
+            return self._send(200, entry)
+
+        with stub.state.lock:
+            records = stub.state.records[(org, domain)]
+            if record not in records:
+                return self._send(404, {'code': 5, 'message': 'Not found'})
+            records[record] = {**entry, 'recordId': record}
+        return self._send(200, records[record])
+
+    def _delete_records(self, stub, params, org, domain, record):
+        if not self._check_domain(stub, org, domain):
+            return
+        with stub.state.lock:
+            if stub.state.records[(org, domain)].pop(record, None) is None:
+                return self._send(404, {'code': 5, 'message': 'Not found'})
+        return self._send(200, {})
+
+
+class Ya360Server:
+    def __init__(
+        self, token='token', max_page_size=100, latency=None, errors=None
+    ):
+        self.state = Ya360State()
+        self.token = token
+        self.max_page_size = max_page_size
+        # (method, kind) or '*' -> seconds, kind is one of orgs/domains/records
+        self.latency = latency or {}
+        # (method, kind) -> list of HTTP status codes, consumed one per call,
+        # None in the list lets the call pass
+        self.errors = errors or {}
+        self.calls = {}
+
+        self.httpd = ThreadingHTTPServer(('localhost', 0), Ya360Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self.url = f'http://localhost:{self.httpd.server_address[1]}'
+        self._thread = None
+
+    def inject(self, method, kind):
+        key = (method, kind)
+        with self.state.lock:
+            self.calls[key] = self.calls.get(key, 0) + 1
+            codes = self.errors.get(key)
+            code = codes.pop(0) if codes else None
+
+        delay = self.latency.get(key, self.latency.get('*', 0))
+        if delay:
+            time.sleep(delay)
+        return code
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            kwargs={'poll_interval': 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
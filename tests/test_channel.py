@@ -0,0 +1,101 @@
+import grpc
+import pytest
+import yandexcloud
+
+from octodns_yandex.channel import _ChannelMixin, configure_stub
+from octodns_yandex.exception import YandexCloudConfigException
+
+
+class StubComponent(_ChannelMixin):
+    def __init__(self, **kwargs):
+        self.init_channel(**kwargs)
+
+
+class StubStub:
+    def __init__(self):
+        self.calls = []
+        self.List = self._call
+        self.Get = self._call
+
+    def _call(self, request, **kwargs):
+        self.calls.append((request, kwargs))
+        return request
+
+
+class TestChannelMixin:
+    def test_config(self):
+        component = StubComponent()
+        assert component.grpc_compression is None
+        assert component.grpc_channel_options == ()
+        assert component.grpc_deadlines == {}
+
+        component = StubComponent(
+            grpc_compression='gzip',
+            grpc_max_send_message_length=8 << 20,
+            grpc_max_receive_message_length=64 << 20,
+            grpc_keepalive_time=30,
+            grpc_keepalive_timeout=2.5,
+            grpc_deadlines={'List': 10},
+        )
+        assert component.grpc_compression == grpc.Compression.Gzip
+        assert component.grpc_deadlines == {'List': 10}
+        assert component.grpc_channel_options == (
+            ('grpc.max_send_message_length', 8 << 20),
+            ('grpc.max_receive_message_length', 64 << 20),
+            ('grpc.keepalive_time_ms', 30000),
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.http2.max_pings_without_data', 0),
+            ('grpc.keepalive_timeout_ms', 2500),
+        )
+
+        with pytest.raises(
+            YandexCloudConfigException, match='.*one of: none, deflate, gzip'
+        ):
+            StubComponent(grpc_compression='brotli')
+        with pytest.raises(YandexCloudConfigException, match='.*dict.*'):
+            StubComponent(grpc_deadlines=10)
+
+    def test_configure_sdk(self):
+        sdk = yandexcloud.SDK(token='token', user_agent='test')
+        default = sdk._channels.channel_options()
+
+        assert StubComponent().configure_sdk(sdk) is sdk
+        assert sdk._channels.channel_options() == default
+
+        component = StubComponent(grpc_max_receive_message_length=1 << 20)
+        assert component.configure_sdk(sdk) is sdk
+        assert sdk._channels.channel_options() == default + (
+            ('grpc.max_receive_message_length', 1 << 20),
+        )
+
+        # SDKs without channels factory are left as is unless options are set
+        stub_sdk = object()
+        assert StubComponent().configure_sdk(stub_sdk) is stub_sdk
+        with pytest.raises(
+            YandexCloudConfigException, match='.*not supported.*'
+        ):
+            component.configure_sdk(stub_sdk)
+
+    def test_configure_stub(self):
+        stub = StubStub()
+        assert StubComponent().configure_stub(stub) is stub
+        assert stub.List == stub._call
+
+        component = StubComponent(
+            grpc_compression='deflate', grpc_deadlines={'List': 10}
+        )
+        stub = component.configure_stub(StubStub())
+        stub.List('a')
+        stub.List('b', timeout=1, compression=None)
+        stub.Get('c')
+        assert stub.calls == [
+            ('a', {'compression': grpc.Compression.Deflate, 'timeout': 10}),
+            ('b', {'compression': None, 'timeout': 1}),
+            ('c', {'compression': grpc.Compression.Deflate}),
+        ]
+
+    def test_configure_stub_deadlines_only(self):
+        stub = configure_stub(StubStub(), deadlines={'Get': 5})
+        stub.List('a')
+        stub.Get('b')
+        assert stub.calls == [('a', {}), ('b', {'timeout': 5})]
@@ -0,0 +1,153 @@
+import grpc
+import pytest
+import yandexcloud
+from yandex.cloud.dns.v1.dns_zone_pb2 import RecordSet
+
+from octodns.provider.yaml import YamlProvider
+from octodns.zone import Zone
+
+from octodns_yandex.dump import main, make_parser
+from tests.fixtures import STUB_FOLDER_ID
+from tests.fixtures.dns_server import FakeDnsServer
+
+
+@pytest.fixture()
+def server(monkeypatch):
+    with FakeDnsServer(page_size=3) as server:
+        monkeypatch.setattr(yandexcloud, 'SDK', server.sdk)
+        for i in range(5):
+            zone_name = f'zone{i}.example.com.'
+            dns_zone = server.state.add_zone(zone_name)
+            server.state.add_record_sets(
+                dns_zone.id,
+                [
+                    RecordSet(
+                        name=f'host{j}.{zone_name}',
+                        type='A',
+                        ttl=300,
+                        data=[f'10.0.{i}.{j}'],
+                    )
+                    for j in range(i + 1)
+                ]
+                + [
+                    RecordSet(
+                        name=zone_name,
+                        type='TXT',
+                        ttl=60,
+                        data=['v=DKIM1\\; k=rsa'],
+                    )
+                ],
+            )
+        yield server
+
+
+def _load(output_dir, zone_name):
+    zone = Zone(zone_name, [])
+    YamlProvider('load', str(output_dir)).populate(zone)
+    return zone
+
+
+class TestDump:
+    def test_parser(self, monkeypatch):
+        monkeypatch.setenv('YC_TOKEN', 'token')
+        args = make_parser().parse_args(['--output-dir', 'out'])
+        assert args.oauth_token == 'token'
+        assert args.auth_type == 'metadata'
+        assert args.workers == 8
+
+    def test_main(self, server, tmp_path):
+        output_dir = tmp_path / 'zones'
+        assert (
+            main(
+                [
+                    '--output-dir',
+                    str(output_dir),
+                    '--folder-id',
+                    STUB_FOLDER_ID,
+                    '--workers',
+                    '3',
+                ]
+            )
+            == 0
+        )
+        assert sorted(e.name for e in output_dir.iterdir()) == [
+            f'zone{i}.example.com.yaml' for i in range(5)
+        ]
+        # Zones are listed once, not looked up one by one
+        assert server.dns_service.calls['List'] == 2
+
+        zone = _load(output_dir, 'zone4.example.com.')
+        assert len(zone.records) == 6
+        (txt,) = [e for e in zone.records if e._type == 'TXT']
+        assert txt.values == ['v=DKIM1\\; k=rsa']
+
+    def test_main_zones(self, server, tmp_path):
+        assert (
+            main(
+                [
+                    '--output-dir',
+                    str(tmp_path),
+                    '--folder-id',
+                    STUB_FOLDER_ID,
+                    '--zone',
+                    'zone1.example.com',
+                    '--zone',
+                    'zone2.example.com.',
+                    '--lenient',
+                    '--debug',
+                ]
+            )
+            == 0
+        )
+        assert sorted(e.name for e in tmp_path.iterdir()) == [
+            'zone1.example.com.yaml',
+            'zone2.example.com.yaml',
+        ]
+        assert len(_load(tmp_path, 'zone1.example.com.').records) == 3
+
+    def test_main_missing_zone(self, server, tmp_path, caplog):
+        server.state.add_zone('empty.example.com.')
+        assert (
+            main(
+                [
+                    '--output-dir',
+                    str(tmp_path),
+                    '--folder-id',
+                    STUB_FOLDER_ID,
+                    '--zone',
+                    'zone1.example.com',
+                    '--zone',
+                    'empty.example.com',
+                    '--zone',
+                    'missing.example.com',
+                ]
+            )
+            == 1
+        )
+        # Empty file is written only for the existing empty zone
+        assert sorted(e.name for e in tmp_path.iterdir()) == [
+            'empty.example.com.yaml',
+            'zone1.example.com.yaml',
+        ]
+        assert len(_load(tmp_path, 'empty.example.com.').records) == 0
+        assert 'Zone missing.example.com. not found' in caplog.text
+        assert 'Failed zones: missing.example.com.' in caplog.text
+
+    def test_main_failed(self, server, tmp_path):
+        server.dns_service.errors['ListRecordSets'] = [
+            grpc.StatusCode.PERMISSION_DENIED
+        ]
+        assert (
+            main(
+                [
+                    '--output-dir',
+                    str(tmp_path),
+                    '--folder-id',
+                    STUB_FOLDER_ID,
+                    '--workers',
+                    '1',
+                ]
+            )
+            == 1
+        )
+        assert len(list(tmp_path.iterdir())) == 4
@@ -0,0 +1,53 @@
+import logging
+from types import SimpleNamespace
+
+from octodns_yandex.estimate import ApiCostEstimate, _EstimateMixin
+
+
+def test_api_cost_estimate():
+    estimate = ApiCostEstimate({'POST': 3, 'DELETE': 0}, 120)
+    assert estimate.calls == {'POST': 3}
+    assert estimate.total == 3
+    assert str(estimate) == 'calls=3 (POST=3), payload~120B'
+
+    estimate = ApiCostEstimate({})
+    assert estimate.total == 0
+    assert str(estimate) == 'calls=0 (none), payload~0B'
+
+
+class _Base(object):
+    def __init__(self, plans):
+        self.plans = plans
+
+    def plan(self, desired, processors=[]):
+        return self.plans.pop(0)
+
+
+class _Provider(_EstimateMixin, _Base):
+    log = logging.getLogger('test')
+
+    def estimate_cost(self, plan):
+        return ApiCostEstimate({'Call': plan.calls})
+
+
+def test_mixin(caplog):
+    caplog.set_level(logging.INFO)
+    provider = _Provider(
+        [None, SimpleNamespace(calls=99), SimpleNamespace(calls=100)]
+    )
+
+    # No changes
+    assert provider.plan(None) is None
+    assert caplog.text == ''
+
+    assert provider.plan(None).estimate.total == 99
+    assert 'rate limits' not in caplog.text
+    assert provider.plan(None).estimate.total == 100
+    assert 'calls=100 (Call=100), payload~0B, may hit API' in caplog.text
+
+    # Warning is disabled
+    provider.init_estimate(None)
+    provider.plans = [SimpleNamespace(calls=1000)]
+    caplog.clear()
+    provider.plan(None)
+    assert caplog.records[0].levelno == logging.INFO
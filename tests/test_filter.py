@@ -0,0 +1,44 @@
+import pytest
+
+from octodns_yandex.exception import YandexCloudConfigException
+from octodns_yandex.filter import RecordSetFilter
+
+
+class TestRecordSetFilter:
+    def test_config(self):
+        record_filter = RecordSetFilter()
+        assert not record_filter
+        assert record_filter.expression('example.com.') == ''
+        assert record_filter.match('www', 'A')
+
+        with pytest.raises(YandexCloudConfigException, match='.*names.*'):
+            RecordSetFilter(names='www')
+        with pytest.raises(YandexCloudConfigException, match='.*types.*'):
+            RecordSetFilter(types='TXT')
+
+    def test_exact(self):
+        record_filter = RecordSetFilter(names=['', 'WWW'], types=['txt', 'A'])
+        assert record_filter
+        assert not record_filter.patterns
+        assert record_filter.expression('example.com.') == (
+            'name IN ("example.com.", "www.example.com.") '
+            'AND type IN ("TXT", "A")'
+        )
+        assert record_filter.match('', 'TXT')
+        assert record_filter.match('www', 'A')
+        assert not record_filter.match('www', 'AAAA')
+        assert not record_filter.match('mail', 'A')
+
+    def test_patterns(self):
+        record_filter = RecordSetFilter(names=['_acme-challenge.*', '*.svc'])
+        assert record_filter.patterns
+        assert record_filter.expression('example.com.') == ''
+        assert record_filter.match('_acme-challenge.www', 'TXT')
+        assert record_filter.match('a.b.svc', 'A')
+        assert not record_filter.match('_acme-challenge', 'TXT')
+        assert not record_filter.match('svc', 'A')
+
+        record_filter = RecordSetFilter(types=['ANAME'])
+        assert record_filter.expression('example.com.') == 'type IN ("ANAME")'
+        assert record_filter.match('', 'YandexCloudProvider/ANAME')
+        assert not record_filter.match('', 'CNAME')
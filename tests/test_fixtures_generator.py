@@ -0,0 +1,67 @@
+from collections import Counter
+
+from octodns.zone import Zone
+
+from octodns_yandex.yandex360_provider import map_entries_to_records
+from octodns_yandex.yandexcloud_provider import map_rset_to_octodns
+from tests.fixtures import STUB_ZONE_NAME
+from tests.fixtures.generator import (
+    generate_cdn_resources,
+    generate_certificates,
+    generate_entries,
+    generate_record_sets,
+    generate_zone_names,
+)
+
+
+class TestGenerator:
+    def test_record_sets(self):
+        rsets = generate_record_sets(500, seed=1)
+        assert rsets == generate_record_sets(500, seed=1)
+        assert rsets != generate_record_sets(500, seed=2)
+
+        types = Counter(e.type for e in rsets)
+        assert set(types.keys()) == {
+            'A',
+            'AAAA',
+            'CNAME',
+            'TXT',
+            'MX',
+            'SRV',
+            'CAA',
+            'ANAME',
+            'NS',
+        }
+        assert any(len(e.data) > 1 for e in rsets)
+
+        # Every record set is valid for octodns
+        zone = Zone(STUB_ZONE_NAME, [])
+        for rset in rsets:
+            zone.add_record(
+                map_rset_to_octodns(None, zone, False, rset.__deepcopy__())
+            )
+        assert len(zone.records) == 500
+
+    def test_entries(self):
+        entries = generate_entries(300, seed=1)
+        assert entries == generate_entries(300, seed=1)
+        assert len({e['recordId'] for e in entries}) == len(entries)
+
+        zone = Zone(STUB_ZONE_NAME, [])
+        records = map_entries_to_records(None, zone, False, entries)
+        assert len(records) == 300
+        for record in records:
+            zone.add_record(record)
+
+    def test_certificates(self):
+        zone_names = generate_zone_names(10)
+        certificates = generate_certificates(100, zone_names, seed=1)
+        assert certificates == generate_certificates(100, zone_names, seed=1)
+        assert len({e.id for e in certificates}) == 100
+        assert len({e.type for e in certificates}) == 2
+
+    def test_cdn_resources(self):
+        zone_names = generate_zone_names(10)
+        resources = generate_cdn_resources(100, zone_names, seed=1)
+        assert resources == generate_cdn_resources(100, zone_names, seed=1)
+        assert len({e.cname for e in resources}) == 100
@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+
+import pytest
+from yandex.cloud.resourcemanager.v1.folder_pb2 import Folder
+from yandex.cloud.resourcemanager.v1.folder_service_pb2 import (
+    ListFoldersResponse,
+)
+
+from octodns_yandex.exception import YandexCloudConfigException
+from octodns_yandex.folder import _FolderMixin
+
+STUB_CLOUD_ID = 'b1gahchuuV3oa6thoo9a'
+
+
+class StubFolderService:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def List(self, request):
+        self.requests.append(request)
+        page = int(request.page_token) if request.page_token else 0
+        next_page = str(page + 1) if page + 1 < len(self.pages) else ''
+        return ListFoldersResponse(
+            next_page_token=next_page,
+            folders=[Folder(id=e) for e in self.pages[page]],
+        )
+
+
+class StubComponent(_FolderMixin):
+    log = getLogger('StubComponent')
+
+    def __init__(self, folder_service=None, **kwargs):
+        self.folder_service = folder_service
+        self.init_folders(
+            kwargs.get('folder_id'),
+            kwargs.get('folder_ids'),
+            kwargs.get('cloud_id'),
+            kwargs.get('max_workers', 4),
+        )
+
+    @property
+    def sdk(self):
+        component = self
+
+        class StubSDK:
+            def client(self, stub):
+                return component.folder_service
+
+        return StubSDK()
+
+
+class TestFolderMixin:
+    def test_config(self):
+        component = StubComponent(folder_id='a', folder_ids=['b', 'a', 'c'])
+        assert component.get_folder_ids() == ['a', 'b', 'c']
+
+        component = StubComponent(folder_ids=['b'])
+        assert component.get_folder_ids() == ['b']
+
+        with pytest.raises(YandexCloudConfigException, match='.*required.*'):
+            StubComponent()
+
+        with pytest.raises(YandexCloudConfigException, match='.*exclusive.*'):
+            StubComponent(folder_id='a', cloud_id=STUB_CLOUD_ID)
+
+        # A single folder id isn't split into characters
+        with pytest.raises(YandexCloudConfigException, match='.*be a list'):
+            StubComponent(folder_ids='abc')
+
+    def test_cloud_discovery(self):
+        folder_service = StubFolderService([['a', 'b'], ['c']])
+        component = StubComponent(
+            folder_service=folder_service, cloud_id=STUB_CLOUD_ID
+        )
+        assert component.folder_ids is None
+
+        assert component.get_folder_ids() == ['a', 'b', 'c']
+        assert component.get_folder_ids() == ['a', 'b', 'c']
+        assert len(folder_service.requests) == 2
+        assert folder_service.requests[0].cloud_id == STUB_CLOUD_ID
+
+    def test_cloud_discovery_parallel(self):
+        class SlowFolderService(StubFolderService):
+            def List(self, request):
+                time.sleep(0.05)
+                return super().List(request)
+
+        # Zones populated in parallel wait for the first listing
+        folder_service = SlowFolderService([['a', 'b'], ['c']])
+        component = StubComponent(
+            folder_service=folder_service, cloud_id=STUB_CLOUD_ID
+        )
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(lambda _: component.get_folder_ids(), range(8))
+            )
+        assert results == [['a', 'b', 'c']] * 8
+        assert len(folder_service.requests) == 2
+
+    def test_map_folders(self):
+        component = StubComponent(folder_id='a')
+        assert component.map_folders(lambda e: e * 2) == ['aa']
+
+        threads = set()
+
+        def _fn(folder_id):
+            threads.add(threading.current_thread().name)
+            return folder_id.upper()
+
+        component = StubComponent(folder_ids=['a', 'b', 'c'], max_workers=2)
+        assert component.map_folders(_fn) == ['A', 'B', 'C']
+        assert threading.current_thread().name not in threads
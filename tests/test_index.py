@@ -0,0 +1,33 @@
+from octodns_yandex.index import SuffixIndex, suffix_key
+
+
+class TestSuffixIndex:
+    def test_suffix_key(self):
+        assert suffix_key('example.com.') == 'com.example.'
+        assert suffix_key('cdn.example.com') == 'com.example.cdn.'
+
+    def test_find(self):
+        index = SuffixIndex(
+            [
+                ('b.example.com', 2),
+                ('a.example.com.', 1),
+                ('example.com.', 0),
+                ('a.notexample.com.', 3),
+                ('a.b.example.com.', 4),
+                ('example.net.', 5),
+            ]
+        )
+        assert len(index) == 6
+
+        assert list(index.find('example.com.')) == [
+            ('example.com.', 0),
+            ('a.example.com.', 1),
+            ('b.example.com.', 2),
+            ('a.b.example.com.', 4),
+        ]
+        assert list(index.find('b.example.com.')) == [
+            ('b.example.com.', 2),
+            ('a.b.example.com.', 4),
+        ]
+        assert list(index.find('example.org.')) == []
+        assert list(SuffixIndex().find('example.com.')) == []
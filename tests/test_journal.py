@@ -0,0 +1,227 @@
+import logging
+import os
+import time
+
+import pytest
+
+from octodns.provider.plan import Plan
+from octodns.record import Create, Delete, Record, Update
+from octodns.zone import Zone
+
+from octodns_yandex import journal as journal_module
+from octodns_yandex.exception import YandexCloudException
+from octodns_yandex.journal import ApplyJournal, _JournalMixin, zone_fingerprint
+
+ZONE_NAME = 'example.com.'
+
+
+def _record(name, value, ttl=300, zone=None):
+    return Record.new(
+        zone or Zone(ZONE_NAME, []),
+        name,
+        {'type': 'A', 'ttl': ttl, 'value': value},
+    )
+
+
+def _zone(*records):
+    zone = Zone(ZONE_NAME, [])
+    for record in records:
+        zone.add_record(record)
+    return zone
+
+
+def _existing():
+    return _zone(_record('old', '2.2.2.2'), _record('www', '3.3.3.3'))
+
+
+def _changes():
+    return [
+        Create(_record('new', '1.1.1.1')),
+        Delete(_record('old', '2.2.2.2')),
+        Update(_record('www', '3.3.3.3'), _record('www', '4.4.4.4', ttl=60)),
+    ]
+
+
+def test_zone_fingerprint():
+    a, b = _record('a', '1.1.1.1'), _record('b', '2.2.2.2')
+    assert zone_fingerprint(_zone(a, b)) == zone_fingerprint(_zone(b, a))
+    assert zone_fingerprint(_zone(a)) != zone_fingerprint(_zone(b))
+    assert zone_fingerprint(_zone(a)) != zone_fingerprint(
+        _zone(_record('a', '1.1.1.1', ttl=60))
+    )
+
+
+class TestApplyJournal:
+    def test_roundtrip(self, tmp_path):
+        path = str(tmp_path / 'journal')
+        assert ApplyJournal.load(path, Zone(ZONE_NAME, [])) is None
+
+        changes = _changes()
+        journal = ApplyJournal.create(path, 'key', changes, _existing())
+        assert journal.resumed is None
+        journal.open()
+        journal.start(0)
+        journal.start(0, 'op0')
+        journal.finish(0)
+        journal.start(1, 'op1')
+        journal.start(2)
+        journal.close(False)
+
+        loaded = ApplyJournal.load(path, Zone(ZONE_NAME, []))
+        assert loaded.key == 'key'
+        assert loaded.created == journal.created
+        assert 0 <= loaded.age < 60
+        assert loaded.exists
+        assert sorted(repr(e) for e in loaded.existing.records) == sorted(
+            repr(e) for e in _existing().records
+        )
+        assert loaded.done == {0}
+        assert loaded.started == {1: 'op1', 2: None}
+        assert loaded.resumed == {1, 2}
+        assert [type(e) for e in loaded.changes] == [Create, Delete, Update]
+        for change, expected in zip(loaded.changes, changes):
+            for record, other in (
+                (change.existing, expected.existing),
+                (change.new, expected.new),
+            ):
+                assert repr(record) == repr(other)
+
+        # Journal is removed on success
+        loaded.open().finish(1)
+        assert ApplyJournal.load(path, Zone(ZONE_NAME, [])).done == {0, 1}
+        loaded.close(True)
+        assert ApplyJournal.load(path, Zone(ZONE_NAME, [])) is None
+
+    def test_trusted(self, tmp_path):
+        path = str(tmp_path / 'journal')
+        journal = ApplyJournal.create(path, 'key', _changes(), _existing())
+        journal.open().start(0)
+        assert journal.trusted
+        journal.close(False)
+
+        # Resumed apply failed on the step started before
+        journal = ApplyJournal.load(path, Zone(ZONE_NAME, [])).open()
+        journal.start(0, 'op0')
+        assert journal.trusted
+        journal.close(False)
+
+        # and on a step which wasn't started, the journal is removed
+        journal = ApplyJournal.load(path, Zone(ZONE_NAME, [])).open()
+        journal.finish(0)
+        journal.start(1)
+        assert not journal.trusted
+        journal.close(False)
+        assert ApplyJournal.load(path, Zone(ZONE_NAME, [])) is None
+
+    def test_incomplete(self, tmp_path):
+        path = tmp_path / 'journal'
+        ApplyJournal.create(str(path), 'key', _changes(), _existing())
+        with open(path, 'a') as fh:
+            fh.write('{"step": 0, "done": true}\n{"step": 1, "do')
+        journal = ApplyJournal.load(str(path), Zone(ZONE_NAME, []))
+        assert journal.done == {0}
+        assert journal.started == {}
+
+        path.write_text('')
+        with pytest.raises(
+            YandexCloudException, match='Invalid apply journal.*'
+        ):
+            ApplyJournal.load(str(path), Zone(ZONE_NAME, []))
+        # Journal without created time, existing zone or changes
+        for header in (
+            '{"key": "key", "existing": [], "changes": []}',
+            '{"key": "key", "created": 1, "exists": true, "existing": null, '
+            '"changes": []}',
+            '{"key": "key", "created": 1, "exists": true, "existing": []}',
+        ):
+            path.write_text(header + '\n')
+            with pytest.raises(
+                YandexCloudException, match='Invalid apply journal.*'
+            ):
+                ApplyJournal.load(str(path), Zone(ZONE_NAME, []))
+
+
+class _Base(object):
+    update_pcent_threshold = 0.3
+    delete_pcent_threshold = 0.3
+
+    def plan(self, desired, processors=[]):
+        return self.planned
+
+    def _process_desired_zone(self, desired):
+        return desired
+
+
+class _Provider(_JournalMixin, _Base):
+    log = logging.getLogger('test')
+    planned = None
+
+
+def test_mixin(tmp_path, caplog, monkeypatch):
+    provider = _Provider()
+    desired = _zone(_record('www', '4.4.4.4', ttl=60))
+    existing = _existing()
+
+    # Disabled
+    with provider.journaled(object()) as journal:
+        assert journal is None
+    assert provider.plan(desired) is None
+
+    provider.init_journal(str(tmp_path))
+    assert provider.journal_max_age == 3600
+    assert provider.plan(desired) is None
+
+    # Journal of another config is not used and removed
+    path = provider.journal_path(ZONE_NAME)
+    ApplyJournal.create(path, 'other', _changes(), existing)
+    provider.planned = planned = Plan(existing, desired, _changes(), True)
+    assert provider.plan(desired) is planned
+    assert planned.journal_key == zone_fingerprint(desired)
+    assert not os.path.exists(path)
+
+    # Plan not made by plan() is not journaled
+    with provider.journaled(object()) as journal:
+        assert journal is None
+
+    # Resumed plan is checked against the zone it was planned from
+    with pytest.raises(ValueError):
+        with provider.journaled(planned) as journal:
+            journal.start(0)
+            raise ValueError()
+    plan = provider.plan(desired)
+    assert plan is not planned
+    assert len(plan.changes) == 3
+    assert len(plan.existing.records) == 2
+    assert plan.journal.key == plan.journal_key
+
+    with pytest.raises(ValueError):
+        with provider.journaled(plan) as journal:
+            journal.finish(0)
+            raise ValueError()
+    assert ApplyJournal.load(path, desired).done == {0}
+
+    # Resumed apply failed on a step which wasn't started, the zone is
+    # planned again by the next run
+    plan = provider.plan(desired)
+    with pytest.raises(ValueError):
+        with provider.journaled(plan) as journal:
+            journal.start(1)
+            raise ValueError()
+    assert not os.path.exists(path)
+    assert provider.plan(desired) is planned
+
+    # Too old journal is not used and removed
+    provider.init_journal(str(tmp_path), journal_max_age=60)
+    ApplyJournal.create(path, zone_fingerprint(desired), _changes(), existing)
+    now = time.time() + 120
+    monkeypatch.setattr(journal_module.time, 'time', lambda: now)
+    assert provider.plan(desired) is planned
+    assert 'is older than 60s' in caplog.text
+    assert not os.path.exists(path)
+
+    # Invalid journal is replaced
+    with open(path, 'w') as fh:
+        fh.write('{}\n')
+    assert provider.plan(desired) is planned
+    assert 'Invalid apply journal' in caplog.text
+    assert not os.path.exists(path)
@@ -0,0 +1,171 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from yandex.cloud.dns.v1.dns_zone_service_pb2 import (
+    ListDnsZonesRequest,
+    ListDnsZonesResponse,
+)
+
+from octodns_yandex.metrics import (
+    METRICS,
+    Metrics,
+    _MetricsMixin,
+    in_context,
+    instrument_stub,
+    zone_context,
+)
+from tests.fixtures import STUB_FOLDER_ID, STUB_ZONE_NAME
+
+
+class StubService:
+    def __init__(self):
+        self.List = self._list
+        self.Get = None
+
+    def _list(self, request, timeout=None):
+        if request.page_token == 'fail':
+            raise RuntimeError('fail')
+        return ListDnsZonesResponse(next_page_token='next')
+
+
+class TestMetrics:
+    def test_observe(self):
+        metrics = Metrics()
+        metrics.observe('dns', 'List', 0.02, 10, 100)
+        metrics.observe('dns', 'List', 3, 10, 0, error=True)
+        with zone_context(STUB_ZONE_NAME):
+            metrics.observe('dns', 'List', 0.1)
+        metrics.observe('dns', 'Get', 0.1, zone='other.')
+
+        assert sorted(metrics.series.keys()) == [
+            ('dns', 'Get', 'other.'),
+            ('dns', 'List', ''),
+            ('dns', 'List', STUB_ZONE_NAME),
+        ]
+        series = metrics.series[('dns', 'List', '')]
+        assert series.calls == 2
+        assert series.errors == 1
+        assert series.seconds == 3.02
+        assert series.request_bytes == 20
+        assert series.response_bytes == 100
+        assert series.buckets[Metrics.BUCKETS.index(0.025)] == 1
+        assert series.buckets[Metrics.BUCKETS.index(5)] == 2
+
+        assert metrics.summary() == (
+            'dns.Get: calls=1 errors=0 time=0.100s sent=0 received=0, '
+            'dns.List: calls=3 errors=1 time=3.120s sent=20 received=100'
+        )
+
+        metrics.reset()
+        assert metrics.series == {}
+        assert metrics.summary() == ''
+
+    def test_measure(self):
+        metrics = Metrics()
+        with metrics.measure('yandex360', 'ListOrgs') as sample:
+            sample.request_bytes = 1
+            sample.response_bytes = 2
+        with pytest.raises(RuntimeError):
+            with metrics.measure('yandex360', 'ListOrgs'):
+                raise RuntimeError('fail')
+
+        series = metrics.series[('yandex360', 'ListOrgs', '')]
+        assert (series.calls, series.errors) == (2, 1)
+        assert (series.request_bytes, series.response_bytes) == (1, 2)
+
+    def test_to_prometheus(self, tmp_path):
+        metrics = Metrics()
+        metrics.observe('dns', 'List', 0.02, 10, 100, zone='a"b\\c\n.')
+        text = metrics.to_prometheus()
+
+        labels = 'api="dns",method="List",zone="a\\"b\\\\c\\n."'
+        assert '# TYPE octodns_yandex_requests_total counter' in text
+        assert f'octodns_yandex_requests_total{{{labels}}} 1' in text
+        assert f'octodns_yandex_errors_total{{{labels}}} 0' in text
+        assert f'octodns_yandex_request_bytes_total{{{labels}}} 10' in text
+        assert f'octodns_yandex_response_bytes_total{{{labels}}} 100' in text
+        assert '# TYPE octodns_yandex_request_duration_seconds histogram' in (
+            text
+        )
+        assert (
+            f'octodns_yandex_request_duration_seconds_bucket'
+            f'{{{labels},le="0.01"}} 0'
+        ) in text
+        assert (
+            f'octodns_yandex_request_duration_seconds_bucket'
+            f'{{{labels},le="0.025"}} 1'
+        ) in text
+        assert (
+            f'octodns_yandex_request_duration_seconds_bucket'
+            f'{{{labels},le="+Inf"}} 1'
+        ) in text
+        assert (
+            f'octodns_yandex_request_duration_seconds_sum{{{labels}}} 0.02'
+        ) in text
+        assert (
+            f'octodns_yandex_request_duration_seconds_count{{{labels}}} 1'
+        ) in text
+        assert text.endswith('\n')
+
+        path = tmp_path / 'octodns.prom'
+        metrics.write_textfile(str(path))
+        assert path.read_text() == text
+        assert [e.name for e in tmp_path.iterdir()] == ['octodns.prom']
+
+    def test_report(self, tmp_path, caplog):
+        metrics = Metrics()
+        path = tmp_path / 'octodns.prom'
+        metrics.textfiles.add(str(path))
+        metrics.textfiles.add(str(tmp_path / 'missing' / 'octodns.prom'))
+
+        # Nothing to report
+        metrics.report()
+        assert not path.exists()
+
+        metrics.observe('dns', 'List', 0.02)
+        with caplog.at_level(logging.INFO, logger='YandexMetrics'):
+            metrics.report()
+        assert path.read_text() == metrics.to_prometheus()
+        assert 'summary: dns.List: calls=1' in caplog.text
+        assert 'Failed to write' in caplog.text
+
+    def test_in_context(self):
+        def _zone(_):
+            metrics.observe('dns', 'List', 0)
+
+        metrics = Metrics()
+        with zone_context(STUB_ZONE_NAME):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(in_context(_zone), range(4)))
+                list(executor.map(_zone, range(2)))
+
+        assert metrics.series[('dns', 'List', STUB_ZONE_NAME)].calls == 4
+        assert metrics.series[('dns', 'List', '')].calls == 2
+
+    def test_instrument_stub(self):
+        metrics = Metrics()
+        service = instrument_stub(StubService(), 'dns', metrics)
+        assert service.Get is None
+
+        request = ListDnsZonesRequest(folder_id=STUB_FOLDER_ID)
+        assert service.List(request, timeout=1).next_page_token == 'next'
+        failed = ListDnsZonesRequest(page_token='fail')
+        with pytest.raises(RuntimeError):
+            service.List(failed)
+
+        series = metrics.series[('dns', 'List', '')]
+        assert (series.calls, series.errors) == (2, 1)
+        assert series.request_bytes == request.ByteSize() + failed.ByteSize()
+        assert series.response_bytes == 6
+
+    def test_mixin(self, monkeypatch):
+        monkeypatch.setattr(METRICS, 'textfiles', set())
+
+        component = _MetricsMixin()
+        component.init_metrics()
+        assert component.metrics is METRICS
+        assert METRICS.textfiles == set()
+
+        component.init_metrics('/tmp/octodns.prom')
+        assert METRICS.textfiles == {'/tmp/octodns.prom'}
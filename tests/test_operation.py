@@ -0,0 +1,108 @@
+import pytest
+from google.rpc.status_pb2 import Status
+from yandex.cloud.operation.operation_pb2 import Operation
+
+from octodns_yandex import operation as operation_module
+from octodns_yandex.exception import YandexCloudException
+from octodns_yandex.operation import OperationWaiter
+
+
+class StubClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class StubOperationService:
+    def __init__(self, polls_until_done, error=None):
+        self.polls_until_done = polls_until_done
+        self.error = error
+        self.requests = []
+
+    def Get(self, request):
+        self.requests.append(request.operation_id)
+        done = len(self.requests) >= self.polls_until_done
+        operation = Operation(id=request.operation_id, done=done)
+        if done and self.error is not None:
+            operation.error.CopyFrom(self.error)
+        return operation
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = StubClock()
+    monkeypatch.setattr(operation_module.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(operation_module.time, 'sleep', clock.sleep)
+    return clock
+
+
+class TestOperationWaiter:
+    def test_delays(self):
+        waiter = OperationWaiter(
+            None, initial_delay=0.1, max_delay=1, multiplier=3
+        )
+        delays = waiter.delays()
+        assert [next(delays) for _ in range(5)] == pytest.approx(
+            [0.1, 0.3, 0.9, 1, 1]
+        )
+
+    def test_done(self, clock):
+        service = StubOperationService(0)
+        waiter = OperationWaiter(service)
+
+        operation = Operation(id='op1', done=True)
+        assert waiter.wait(operation) is operation
+        assert service.requests == []
+        assert clock.sleeps == []
+        assert str(waiter) == 'operations=1, polls=0, waited=0.000s'
+
+    def test_backoff(self, clock):
+        service = StubOperationService(5)
+        waiter = OperationWaiter(service)
+
+        assert waiter.wait(Operation(id='op1')).done
+        assert service.requests == ['op1'] * 5
+        assert clock.sleeps == pytest.approx([0.05, 0.1, 0.2, 0.4, 0.8])
+        assert str(waiter) == 'operations=1, polls=5, waited=1.550s'
+
+        service.requests = []
+        assert waiter.wait(Operation(id='op2', done=True)).done
+        assert str(waiter) == 'operations=2, polls=5, waited=1.550s'
+
+        polls = []
+        service.requests = []
+        waiter.wait(Operation(id='op3'), on_poll=lambda: polls.append(1))
+        assert len(polls) == 5
+
+    def test_error(self, clock):
+        service = StubOperationService(
+            2, error=Status(code=9, message='Record set not found')
+        )
+        waiter = OperationWaiter(service)
+
+        with pytest.raises(
+            YandexCloudException,
+            match='Operation op1 failed: code=9, message=Record set not found',
+        ):
+            waiter.wait(Operation(id='op1'))
+        assert waiter.polls == 2
+
+    def test_timeout(self, clock):
+        service = StubOperationService(100)
+        waiter = OperationWaiter(service, max_delay=1, timeout=2.5)
+
+        with pytest.raises(
+            YandexCloudException, match='Operation op1 is not done in 2.5s'
+        ):
+            waiter.wait(Operation(id='op1'))
+        # Last sleep is cut by the deadline
+        assert clock.sleeps == pytest.approx([0.05, 0.1, 0.2, 0.4, 0.8, 0.95])
+        assert waiter.operations == 1
+        assert waiter.seconds == pytest.approx(2.5)
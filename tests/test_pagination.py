@@ -0,0 +1,76 @@
+import threading
+
+from yandex.cloud.dns.v1.dns_zone_pb2 import RecordSet
+from yandex.cloud.dns.v1.dns_zone_service_pb2 import (
+    ListDnsZoneRecordSetsRequest,
+    ListDnsZoneRecordSetsResponse,
+)
+
+from octodns_yandex.pagination import Paginator
+
+
+class StubListMethod:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+        self.timeouts = []
+        self.threads = set()
+
+    def __call__(self, request, **kwargs):
+        self.requests.append(request)
+        self.timeouts.append(kwargs.get('timeout'))
+        self.threads.add(threading.current_thread().name)
+
+        page = int(request.page_token) if request.page_token else 0
+        next_page = str(page + 1) if page + 1 < len(self.pages) else ''
+        return ListDnsZoneRecordSetsResponse(
+            next_page_token=next_page,
+            record_sets=[
+                RecordSet(name=e, type='A', ttl=300, data=['127.0.0.1'])
+                for e in self.pages[page]
+            ],
+        )
+
+
+class TestPaginator:
+    PAGES = [['a.', 'b.'], ['c.'], [], ['d.']]
+
+    def test_iterate_prefetch(self):
+        method = StubListMethod(self.PAGES)
+        pages = Paginator(
+            method,
+            ListDnsZoneRecordSetsRequest(dns_zone_id='zone'),
+            'record_sets',
+        )
+
+        assert [e.name for e in pages] == ['a.', 'b.', 'c.', 'd.']
+        assert [e.page_token for e in method.requests] == ['', '1', '2', '3']
+        assert all(e.dns_zone_id == 'zone' for e in method.requests)
+        assert method.timeouts == [None] * 4
+        # Next pages are requested in background
+        assert len(method.threads) == 2
+
+        assert (pages.pages, pages.items) == (4, 4)
+        assert pages.bytes > 0
+        assert str(pages) == f"pages=4, items=4, bytes={pages.bytes}"
+
+    def test_iterate_sequential(self):
+        method = StubListMethod(self.PAGES)
+        pages = Paginator(
+            method,
+            ListDnsZoneRecordSetsRequest(dns_zone_id='zone'),
+            'record_sets',
+            timeout=5,
+            prefetch=False,
+        )
+
+        assert [len(e.record_sets) for e in pages.iter_pages()] == [2, 1, 0, 1]
+        assert method.timeouts == [5] * 4
+        assert method.threads == {threading.current_thread().name}
+        assert (pages.pages, pages.items) == (4, 4)
+
+    def test_single_page(self):
+        method = StubListMethod([['a.']])
+        pages = Paginator(method, ListDnsZoneRecordSetsRequest(), 'record_sets')
+        assert [e.name for e in pages] == ['a.']
+        assert pages.pages == 1
@@ -0,0 +1,145 @@
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from octodns.provider.plan import Plan
+from octodns.record import Create, Record
+from octodns.zone import Zone
+
+from octodns_yandex import (
+    Yandex360Provider,
+    YandexCloudCDNSource,
+    YandexCloudCMSource,
+    YandexCloudProvider,
+)
+from octodns_yandex.profiling import PROFILE_DIR_ENV, PROFILE_ENV, profiled
+from tests.fixtures import STUB_ZONE_NAME
+
+
+class StubProvider:
+    id = 'stub'
+
+    @profiled('populate')
+    def populate(self, zone, target=False, lenient=False):
+        for i in range(3):
+            zone.add_record(
+                Record.new(
+                    zone,
+                    f'host{i}',
+                    {'type': 'A', 'ttl': 60, 'value': '1.1.1.1'},
+                )
+            )
+        return [bytearray(1024) for _ in range(10)]
+
+    @profiled('apply')
+    def _apply(self, plan):
+        if plan.changes[0].new.name == 'fail':
+            raise RuntimeError('fail')
+        return len(plan.changes)
+
+
+@pytest.fixture()
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(PROFILE_DIR_ENV, str(tmp_path))
+    return tmp_path
+
+
+def _reports(path):
+    return sorted(e.name for e in path.iterdir())
+
+
+def _plan(name='www'):
+    zone = Zone(STUB_ZONE_NAME, [])
+    record = Record.new(
+        zone, name, {'type': 'A', 'ttl': 60, 'value': '1.1.1.1'}
+    )
+    zone.add_record(record)
+    return Plan(
+        existing=None, desired=zone, changes=[Create(record)], exists=True
+    )
+
+
+class TestProfiling:
+    def test_disabled(self, profile_dir, monkeypatch):
+        monkeypatch.delenv(PROFILE_ENV, raising=False)
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert len(StubProvider().populate(zone)) == 10
+        assert len(zone.records) == 3
+        assert _reports(profile_dir) == []
+
+    def test_unknown_mode(self, profile_dir, monkeypatch, caplog):
+        monkeypatch.setenv(PROFILE_ENV, 'gpu')
+        assert StubProvider()._apply(_plan()) == 1
+        assert _reports(profile_dir) == []
+        assert 'Unknown OCTODNS_YANDEX_PROFILE=gpu' in caplog.text
+
+    def test_cpu(self, profile_dir, monkeypatch):
+        monkeypatch.setenv(PROFILE_ENV, 'cpu')
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert (
+            len(StubProvider().populate(zone, target=True, lenient=True)) == 10
+        )
+        assert StubProvider()._apply(_plan()) == 1
+
+        populate_prof, populate_txt, apply_prof, apply_txt = sorted(
+            _reports(profile_dir),
+            key=lambda e: ('apply' in e, e.endswith('.txt')),
+        )
+        assert populate_prof.startswith('stub-populate-example.com-')
+        assert populate_prof.endswith('.prof')
+        assert apply_txt.startswith('stub-apply-example.com-')
+
+        text = (profile_dir / populate_txt).read_text()
+        assert text.startswith(
+            'provider: stub\nmethod: populate\nmode: cpu\n'
+            'zone: example.com.\nrecords: 3\n\n'
+        )
+        assert 'cumulative' in text
+        text = (profile_dir / apply_txt).read_text()
+        assert 'records: 1\nchanges: 1\n' in text
+
+        stats = pstats.Stats(str(profile_dir / populate_prof))
+        assert any(e[2] == 'populate' for e in stats.stats.keys())
+
+        # Nothing is written when the call fails
+        with pytest.raises(RuntimeError):
+            StubProvider()._apply(_plan('fail'))
+        assert len(_reports(profile_dir)) == 4
+
+    def test_memory(self, profile_dir, monkeypatch):
+        monkeypatch.setenv(PROFILE_ENV, 'memory')
+        zone = Zone(STUB_ZONE_NAME, [])
+        StubProvider().populate(zone)
+        assert not tracemalloc.is_tracing()
+
+        (report,) = _reports(profile_dir)
+        assert report.endswith('.txt')
+        text = (profile_dir / report).read_text()
+        assert 'mode: memory\nzone: example.com.\nrecords: 3\n' in text
+        assert '\npeak: ' in text
+        assert 'test_profiling.py' in text
+
+        # Already running tracing is kept
+        os.remove(profile_dir / report)
+        tracemalloc.start()
+        try:
+            with pytest.raises(RuntimeError):
+                StubProvider()._apply(_plan('fail'))
+            StubProvider()._apply(_plan())
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+        assert len(_reports(profile_dir)) == 1
+
+    def test_providers(self):
+        for cls in (
+            YandexCloudProvider,
+            YandexCloudCDNSource,
+            YandexCloudCMSource,
+            Yandex360Provider,
+        ):
+            assert hasattr(cls.populate, '__wrapped__')
+        for cls in (YandexCloudProvider, Yandex360Provider):
+            assert hasattr(cls._apply, '__wrapped__')
@@ -0,0 +1,121 @@
+import logging
+import os
+
+import pytest
+
+from octodns_yandex import progress as progress_module
+from octodns_yandex.exception import YandexCloudConfigException
+from octodns_yandex.progress import ApplyProgress, _ProgressMixin, load_callback
+
+
+class StubClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = StubClock()
+    monkeypatch.setattr(progress_module.time, 'monotonic', clock.monotonic)
+    return clock
+
+
+def test_load_callback():
+    assert load_callback(None) is None
+    assert load_callback(print) is print
+    assert load_callback('os.path.join') is os.path.join
+
+    for path in ('octodns_yandex.missing.fn', 'os.missing', 'missing'):
+        with pytest.raises(
+            YandexCloudConfigException, match='.*is not importable.*'
+        ):
+            load_callback(path)
+    with pytest.raises(YandexCloudConfigException, match='.*is not callable.*'):
+        load_callback('os.sep')
+
+
+class TestApplyProgress:
+    def test_events(self, clock, caplog):
+        caplog.set_level(logging.INFO)
+        events = []
+        progress = ApplyProgress(
+            logging.getLogger('test'),
+            'example.com.',
+            3,
+            30,
+            interval=10,
+            callback=events.append,
+        )
+
+        # Nothing is done yet
+        clock.now += 10
+        progress.begin()
+        assert events[-1]['rate'] == 0
+        assert events[-1]['eta'] is None
+        assert events[-1]['step_age'] == 0
+
+        # Not reported within the interval
+        clock.now += 5
+        progress.update()
+        progress.advance(10)
+        assert len(events) == 1
+
+        clock.now += 5
+        progress.begin()
+        clock.now += 5
+        progress.update()
+        assert len(events) == 2
+        assert events[-1] == {
+            'zone': 'example.com.',
+            'steps_done': 1,
+            'steps': 3,
+            'rsets_done': 10,
+            'rsets': 30,
+            'elapsed': 20,
+            'rate': 0.5,
+            'step_age': 0,
+            'eta': 40,
+            'finished': False,
+        }
+
+        # The last step is always reported
+        progress.advance(10)
+        progress.begin()
+        progress.advance(10)
+        assert len(events) == 3
+        assert events[-1]['finished']
+        assert events[-1]['eta'] == 0
+        assert events[-1]['step_age'] is None
+
+        assert 'steps=1/3 rsets=10/30 rate=0.5/s step_age=0.0s' in caplog.text
+        assert 'steps=3/3 rsets=30/30 rate=1.2/s step_age=- eta=' in caplog.text
+        assert 'eta=-' in caplog.text
+
+    def test_zero_elapsed(self, clock):
+        progress = ApplyProgress(
+            logging.getLogger('test'), 'example.com.', 1, 1
+        )
+        progress.advance(1)
+        assert progress.event()['rate'] == 0
+        assert progress.event()['eta'] == 0
+
+
+def test_mixin(clock):
+    events = []
+
+    class Provider(_ProgressMixin):
+        log = logging.getLogger('test')
+
+    provider = Provider()
+    progress = provider.make_progress('example.com.', 1, 1)
+    assert progress.interval == 10
+    assert progress.callback is None
+
+    provider.init_progress(0, events.append)
+    progress = provider.make_progress('example.com.', 1, 1)
+    progress.begin()
+    progress.advance(1)
+    assert len(events) == 2
@@ -1,6 +1,7 @@
 import functools
 
 import pytest
+import requests
 
 from octodns.provider.plan import Plan
 from octodns.record import Create, Delete, PtrRecord, Update
@@ -31,23 +32,26 @@ def provider(monkeypatch):
 
 class TestYandex360Provider:
     def test_make_request(self, provider, monkeypatch):
-        class MockSession:
+        class MockResponse:
             status_code = 200
             text = "Test body"
-
-            @staticmethod
-            def request(*args, **kwargs):
-                return MockSession
+            content = b"Test body"
+            request = requests.Request('GET', 'http://localhost/test').prepare()
 
             @staticmethod
             def json():
                 return {}
 
+        class MockSession:
+            @staticmethod
+            def request(*args, **kwargs):
+                return MockResponse
+
         monkeypatch.setattr(provider, "_session", MockSession)
 
         provider.make_request('GET', '/test', expected_code=200)
         with pytest.raises(
-            Yandex360ApiException, match=f".*{MockSession.text}.*"
+            Yandex360ApiException, match=f".*{MockResponse.text}.*"
         ):
             provider.make_request('GET', '/test', expected_code=204)
 
@@ -0,0 +1,280 @@
+import pytest
+
+from octodns.provider.plan import Plan
+from octodns.record import Create, Delete, Update
+from octodns.zone import Zone
+
+from octodns_yandex import Yandex360Provider
+from octodns_yandex.metrics import Metrics
+from octodns_yandex.ratelimit import RateLimits, TokenBucket
+from octodns_yandex.yandex360_provider import (
+    Yandex360ApiException,
+    map_entries_to_records,
+)
+from tests.fixtures.ya360 import STUB_ENTRIES
+from tests.fixtures.ya360_server import Ya360Server
+
+# End to end tests over HTTP against the local Yandex 360 API stand-in
+
+STUB_DOMAIN = 'example.com'
+
+
+@pytest.fixture()
+def make_server(enable_network):
+    servers = []
+
+    def _make_server(orgs=3, **kwargs):
+        server = Ya360Server(**kwargs).__enter__()
+        servers.append(server)
+        for org_id in range(1, orgs + 1):
+            server.state.add_org(org_id)
+            server.state.add_domain(org_id, f'org{org_id}.example.net')
+        server.state.add_domain(orgs, STUB_DOMAIN)
+        return server
+
+    yield _make_server
+
+    for server in servers:
+        server.__exit__()
+
+
+def _make_provider(server):
+    provider = Yandex360Provider('test', server.token)
+    provider.API_BASE = server.url
+    return provider
+
+
+def _entries(count):
+    return [
+        {'type': 'A', 'name': f'host{i}', 'ttl': 300, 'address': f'10.0.0.{i}'}
+        for i in range(count)
+    ]
+
+
+class TestYandex360ProviderHttp:
+    def test_populate(self, make_server):
+        server = make_server(max_page_size=10)
+        server.state.add_records(3, STUB_DOMAIN, _entries(120))
+        server.state.add_records(3, STUB_DOMAIN, STUB_ENTRIES['MX'])
+
+        provider = _make_provider(server)
+        zone = Zone(f'{STUB_DOMAIN}.', [])
+        assert provider.populate(zone)
+        assert len(zone.records) == 121
+        assert server.calls[('GET', 'records')] == 13
+
+        assert not provider.populate(Zone('example.org.', []))
+
+    def test_list_zones(self, make_server):
+        server = make_server()
+        for i in range(25):
+            server.state.add_domain(2, f'site{i:02d}.example.org')
+
+        provider = _make_provider(server)
+        zones = provider.list_zones()
+        assert len(zones) == 29
+        assert zones[:2] == [f'{STUB_DOMAIN}.', 'org1.example.net.']
+        assert zones[-1] == 'site24.example.org.'
+        assert server.calls[('GET', 'orgs')] == 1
+        assert server.calls[('GET', 'domains')] == 5
+
+        # Listed domains are not looked up again
+        assert provider.populate(Zone(f'{STUB_DOMAIN}.', []))
+        assert server.calls[('GET', 'orgs')] == 1
+        assert not provider.populate(Zone('example.org.', []))
+        assert server.calls[('GET', 'orgs')] == 2
+
+    def test_apply(self, make_server):
+        server = make_server(orgs=1)
+        entries = server.state.add_records(1, STUB_DOMAIN, _entries(4))
+
+        provider = _make_provider(server)
+        events = []
+        provider.init_progress(0, events.append)
+        zone = Zone(f'{STUB_DOMAIN}.', [])
+        existing = map_entries_to_records(None, zone, False, entries)
+        new = map_entries_to_records(None, zone, False, _entries(6)[4:])
+        updated = map_entries_to_records(
+            None, zone, False, [{**entries[2], 'address': '10.10.10.10'}]
+        )[0]
+
+        provider.apply(
+            Plan(
+                existing=None,
+                desired=zone,
+                changes=[
+                    Delete(existing[0]),
+                    Update(existing[2], updated),
+                    *map(Create, new),
+                ],
+                exists=True,
+            )
+        )
+
+        result = server.state.get_records(1, STUB_DOMAIN)
+        assert sorted((e['name'], e['address']) for e in result) == [
+            ('host1', '10.0.0.1'),
+            ('host2', '10.10.10.10'),
+            ('host3', '10.0.0.3'),
+            ('host4', '10.0.0.4'),
+            ('host5', '10.0.0.5'),
+        ]
+
+        # Each change is reported when started and when done
+        assert len(events) == 8
+        assert [e['steps_done'] for e in events[1::2]] == [1, 2, 3, 4]
+        assert events[-1]['finished']
+        assert events[-1]['rsets'] == 4
+
+    def test_plan_estimate(self, make_server):
+        server = make_server(orgs=1)
+        server.state.add_records(
+            1,
+            STUB_DOMAIN,
+            _entries(4)
+            + [
+                {
+                    'type': 'A',
+                    'name': 'host1',
+                    'ttl': 300,
+                    'address': '10.0.1.1',
+                }
+            ],
+        )
+
+        desired = Zone(f'{STUB_DOMAIN}.', [])
+        entries = _entries(6)[1:]
+        entries[1] = {**entries[1], 'address': '10.10.10.10'}
+        for record in map_entries_to_records(None, desired, False, entries):
+            desired.add_record(record)
+
+        provider = _make_provider(server)
+        plan = provider.plan(desired)
+        # host1 and host2 are updated, extra host1 entry and host0 deleted
+        assert plan.estimate.calls == {'POST': 4, 'DELETE': 2}
+        assert plan.estimate.request_bytes > 0
+
+        provider.apply(plan)
+        assert server.calls[('POST', 'records')] == 4
+        assert server.calls[('DELETE', 'records')] == 2
+
+    def test_apply_journal(self, make_server, tmp_path):
+        server = make_server(orgs=1, errors={('POST', 'records'): [None, 500]})
+        server.state.add_records(1, STUB_DOMAIN, _entries(2))
+
+        desired = Zone(f'{STUB_DOMAIN}.', [])
+        entries = _entries(2) + [
+            {'type': 'A', 'name': 'multi', 'ttl': 300, 'address': f'10.1.0.{i}'}
+            for i in range(3)
+        ]
+        del entries[0]
+        for record in map_entries_to_records(None, desired, False, entries):
+            desired.add_record(record)
+
+        def _provider():
+            provider = Yandex360Provider(
+                'test', server.token, journal_dir=str(tmp_path)
+            )
+            provider.API_BASE = server.url
+            return provider
+
+        # Deleted host0, then interrupted while creating the entries of multi
+        provider = _provider()
+        with pytest.raises(Yandex360ApiException, match='.*500.*'):
+            provider.apply(provider.plan(desired))
+        assert len(server.state.get_records(1, STUB_DOMAIN)) == 2
+
+        # Partially created record is completed without duplicates
+        provider = _provider()
+        plan = provider.plan(desired)
+        assert server.calls[('GET', 'records')] == 2
+        provider.apply(plan)
+        result = server.state.get_records(1, STUB_DOMAIN)
+        assert sorted((e['name'], e['address']) for e in result) == [
+            ('host1', '10.0.0.1'),
+            ('multi', '10.1.0.0'),
+            ('multi', '10.1.0.1'),
+            ('multi', '10.1.0.2'),
+        ]
+        assert server.calls[('DELETE', 'records')] == 1
+        assert not (tmp_path / f'{STUB_DOMAIN}.journal').exists()
+
+    def test_errors(self, make_server):
+        server = make_server(
+            latency={('GET', 'orgs'): 0.01},
+            errors={('GET', 'domains'): [None, 429]},
+        )
+
+        provider = _make_provider(server)
+        with pytest.raises(Yandex360ApiException, match='.*429.*'):
+            provider.populate(Zone(f'{STUB_DOMAIN}.', []))
+
+        provider = Yandex360Provider('test', 'wrong-token')
+        provider.API_BASE = server.url
+        with pytest.raises(Yandex360ApiException, match='.*401.*'):
+            provider.populate(Zone(f'{STUB_DOMAIN}.', []))
+
+    def test_metrics(self, make_server, monkeypatch):
+        monkeypatch.setattr(Yandex360Provider, 'metrics', Metrics())
+        server = make_server(max_page_size=10, errors={('GET', 'orgs'): [None]})
+        server.state.add_records(3, STUB_DOMAIN, _entries(25))
+
+        provider = _make_provider(server)
+        zone = Zone(f'{STUB_DOMAIN}.', [])
+        assert provider.populate(zone)
+        provider.apply(
+            Plan(
+                existing=None,
+                desired=zone,
+                changes=[
+                    Create(e)
+                    for e in map_entries_to_records(
+                        None, zone, False, _entries(27)[25:]
+                    )
+                ],
+                exists=True,
+            )
+        )
+
+        zone_name = f'{STUB_DOMAIN}.'
+        series = provider.metrics.series
+        assert sorted(series.keys()) == [
+            ('yandex360', 'CreateDnsRecord', zone_name),
+            ('yandex360', 'ListDnsRecords', zone_name),
+            ('yandex360', 'ListDomains', zone_name),
+            ('yandex360', 'ListOrgs', zone_name),
+        ]
+        assert series[('yandex360', 'ListDnsRecords', zone_name)].calls == 6
+        create = series[('yandex360', 'CreateDnsRecord', zone_name)]
+        assert create.calls == 2
+        assert create.request_bytes > 0
+        assert create.response_bytes > 0
+
+        provider.metrics.reset()
+        server.errors[('GET', 'orgs')] = [500]
+        with pytest.raises(Yandex360ApiException):
+            provider.populate(zone)
+        assert series is not provider.metrics.series
+        orgs = provider.metrics.series[('yandex360', 'ListOrgs', zone_name)]
+        assert (orgs.calls, orgs.errors) == (1, 1)
+
+    def test_rate_limits(self, make_server, monkeypatch):
+        monkeypatch.setattr(Yandex360Provider, 'limits', RateLimits())
+        monkeypatch.setattr(TokenBucket, 'THROTTLE_PAUSE', 0.05)
+        server = make_server(errors={('GET', 'domains'): [None, 429]})
+
+        provider = Yandex360Provider(
+            'test', server.token, rate_limits={'yandex360': {'rate': 100}}
+        )
+        provider.API_BASE = server.url
+        with pytest.raises(Yandex360ApiException, match='.*429.*'):
+            provider.populate(Zone(f'{STUB_DOMAIN}.', []))
+
+        bucket = provider.limits.bucket('yandex360')
+        assert bucket.throttled == 1
+        assert bucket.current_rate == 50
+        # Next callers wait for the pause
+        assert provider.populate(Zone(f'{STUB_DOMAIN}.', []))
+        assert bucket.waits > 0
+        assert bucket.waited >= 0.03
+        assert bucket.calls == sum(server.calls.values())
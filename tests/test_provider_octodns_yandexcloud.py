@@ -10,7 +10,7 @@ from yandex.cloud.dns.v1.dns_zone_service_pb2 import (
     ListDnsZoneRecordSetsResponse,
     ListDnsZonesResponse,
 )
-from yandex.cloud.dns.v1.dns_zone_service_pb2_grpc import DnsZoneServiceStub
+from yandex.cloud.operation.operation_pb2 import Operation
 
 from octodns.idna import idna_decode
 from octodns.provider.plan import Plan
@@ -40,15 +40,12 @@ class StubSDK:
     def __init__(self, *args, **kwargs):
         pass
 
-    def client(self, *args):
+    def client(self, stub):
         class StubChannel:
             def unary_unary(self, *args, **kwargs):
                 pass
 
-        return DnsZoneServiceStub(StubChannel())
-
-    def wait_operation_and_get_result(self, *args, **kwargs):
-        pass
+        return stub(StubChannel())
 
 
 @pytest.fixture()
@@ -170,6 +167,30 @@ class TestYandexCloudProvider:
             zone_id = provider.get_zone_id_by_name(STUB_ZONE_NAME)
             assert zone_id == STUB_ZONE_1.id
 
+        def test_find_zone_multiple_folders(self, monkeypatch, disable_sdk):
+            zones = {
+                'folder1': [STUB_ZONE_1],
+                'folder2': [STUB_ZONE_PUBLIC, STUB_ZONE_2],
+            }
+            folders = []
+
+            def _list(request):
+                folders.append(request.folder_id)
+                return ListDnsZonesResponse(
+                    next_page_token='', dns_zones=zones[request.folder_id]
+                )
+
+            provider = YandexCloudProvider(
+                "test",
+                folder_ids=['folder1', 'folder2'],
+                auth_type=AUTH_TYPE_METADATA,
+                prioritize_public=True,
+            )
+            monkeypatch.setattr(provider.dns_service, 'List', _list)
+            zone_id = provider.get_zone_id_by_name(STUB_ZONE_NAME)
+            assert zone_id == STUB_ZONE_PUBLIC.id
+            assert sorted(folders) == ['folder1', 'folder2']
+
     class TestMapping:
         def test_mapping_supported(self):
             zone = Zone(STUB_ZONE_NAME, [])
@@ -328,7 +349,7 @@ class TestYandexCloudProvider:
             def _update_record_sets(request):
                 additions.append(list(request.additions))
                 deletions.append(list(request.deletions))
-                return None
+                return Operation(id='dnsop', done=True)
 
             monkeypatch.setattr(
                 provider_with_zone.dns_service,
@@ -362,7 +383,7 @@ class TestYandexCloudProvider:
             def _update_record_sets(request):
                 additions.append(list(request.additions))
                 deletions.append(list(request.deletions))
-                return None
+                return Operation(id='dnsop', done=True)
 
             provider_with_zone.UPDATE_CHUNK_SIZE = 2
             monkeypatch.setattr(
@@ -0,0 +1,788 @@
+import logging
+
+import grpc
+import pytest
+import yandexcloud
+from yandex.cloud.dns.v1.dns_zone_pb2 import RecordSet
+
+from octodns.provider import SupportsException
+from octodns.provider.plan import Plan
+from octodns.record import Create, Delete, Update
+from octodns.zone import Zone
+
+from octodns_yandex import YandexCloudProvider
+from octodns_yandex.auth import AUTH_TYPE_METADATA
+from octodns_yandex.exception import YandexCloudException
+from octodns_yandex.metrics import Metrics
+from octodns_yandex.ratelimit import RateLimits, TokenBucket
+from octodns_yandex.yandexcloud_provider import map_rset_to_octodns
+from tests.fixtures import STUB_FOLDER_ID, STUB_ZONE_NAME
+from tests.fixtures.dns_server import FakeDnsServer
+from tests.fixtures.record_sets import STUB_RECORDS
+
+# End to end tests over real gRPC channels against the in-process fake server
+
+
+@pytest.fixture()
+def make_server(monkeypatch):
+    servers = []
+
+    def _make_server(**kwargs):
+        server = FakeDnsServer(**kwargs).__enter__()
+        servers.append(server)
+        monkeypatch.setattr(yandexcloud, 'SDK', server.sdk)
+        return server
+
+    yield _make_server
+
+    for server in servers:
+        server.__exit__()
+
+
+def _make_provider(**kwargs):
+    return YandexCloudProvider(
+        "test", folder_id=STUB_FOLDER_ID, auth_type=AUTH_TYPE_METADATA, **kwargs
+    )
+
+
+def _zone_rsets(count):
+    return [
+        RecordSet(
+            name=f'host{i}.{STUB_ZONE_NAME}',
+            type='A',
+            ttl=300,
+            data=[f'10.0.{i // 256}.{i % 256}'],
+        )
+        for i in range(count)
+    ]
+
+
+class TestYandexCloudProviderGrpc:
+    def test_populate(self, make_server):
+        server = make_server(page_size=7)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, _zone_rsets(50))
+        server.state.add_record_sets(
+            dns_zone.id, [STUB_RECORDS['MX'], STUB_RECORDS['SOA']]
+        )
+
+        provider = _make_provider()
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert provider.populate(zone)
+        assert len(zone.records) == 51
+        assert server.dns_service.calls == {'List': 1, 'ListRecordSets': 8}
+
+        assert not provider.populate(Zone('example.org.', []))
+
+    def test_populate_grpc_options(self, make_server):
+        server = make_server(latency={'ListRecordSets': 0.2})
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, _zone_rsets(50))
+
+        # Requests are compressed
+        provider = _make_provider(grpc_compression='gzip')
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert provider.populate(zone)
+        assert len(zone.records) == 50
+
+        provider = _make_provider(
+            grpc_compression='gzip',
+            grpc_deadlines={'ListRecordSets': 0.05},
+            list_retry_budget=0,
+        )
+        with pytest.raises(grpc.RpcError) as e:
+            provider.populate(Zone(STUB_ZONE_NAME, []))
+        assert e.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+    def test_list_zones(self, make_server):
+        server = make_server(page_size=7)
+        zone_names = [f'zone{i:02d}.example.com.' for i in range(20)]
+        for zone_name in zone_names:
+            server.state.add_zone(zone_name)
+        server.state.add_zone('other.example.com.', folder_id='other')
+        # Equally named internal zone
+        public = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_zone(STUB_ZONE_NAME, public=False)
+
+        provider = _make_provider(prioritize_public=True)
+        assert provider.list_zones() == sorted(zone_names + [STUB_ZONE_NAME])
+        assert server.dns_service.calls == {'List': 4}
+        assert provider.zone_ids_index[STUB_ZONE_NAME] == public.id
+
+        # Listed zones are not looked up again
+        assert provider.populate(Zone(STUB_ZONE_NAME, []))
+        assert provider.populate(Zone('zone00.example.com.', []))
+        assert server.dns_service.calls['List'] == 4
+
+        # Only internal zones are searched, but there is only a public one
+        provider = _make_provider(prioritize_public=False)
+        server.state.add_zone('zone00.example.com.')
+        assert 'zone00.example.com.' not in provider.list_zones()
+        assert provider.get_zone_id_by_name('zone00.example.com.') is None
+
+    def test_populate_managed(self, make_server):
+        server = make_server()
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(
+            dns_zone.id,
+            _zone_rsets(5)
+            + [
+                RecordSet(
+                    name=f'_acme-challenge.www.{STUB_ZONE_NAME}',
+                    type='TXT',
+                    ttl=60,
+                    data=['token'],
+                ),
+                RecordSet(
+                    name=f'app.svc.{STUB_ZONE_NAME}',
+                    type='CNAME',
+                    ttl=60,
+                    data=[f'lb.{STUB_ZONE_NAME}'],
+                ),
+            ],
+        )
+
+        def _names(**kwargs):
+            zone = Zone(STUB_ZONE_NAME, [])
+            assert _make_provider(**kwargs).populate(zone)
+            return sorted(f'{e.name} {e._type}' for e in zone.records)
+
+        assert _names(managed_types=['TXT']) == ['_acme-challenge.www TXT']
+        assert _names(managed_names=['_acme-challenge.*', '*.svc']) == [
+            '_acme-challenge.www TXT',
+            'app.svc CNAME',
+        ]
+        assert _names(
+            managed_names=['host1', 'host3'], managed_types=['A']
+        ) == ['host1 A', 'host3 A']
+        assert _names(managed_names=['host1'], managed_types=['TXT']) == []
+
+    def test_plan_managed(self, make_server):
+        server = make_server()
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        rsets = _zone_rsets(3)
+        server.state.add_record_sets(dns_zone.id, rsets)
+
+        desired = Zone(STUB_ZONE_NAME, [])
+        for rset in rsets:
+            updated = RecordSet()
+            updated.CopyFrom(rset)
+            updated.ttl = 60
+            desired.add_record(
+                map_rset_to_octodns(None, desired, False, updated)
+            )
+
+        plan = _make_provider().plan(desired)
+        assert len(plan.changes) == 3
+
+        # Unmanaged records of the desired zone are omitted
+        provider = _make_provider(
+            managed_names=['host1'], strict_supports=False
+        )
+        plan = provider.plan(desired)
+        assert [e.new.name for e in plan.changes] == ['host1']
+
+        provider = _make_provider(managed_names=['host1'])
+        with pytest.raises(
+            SupportsException, match='.*host[02].* is not managed'
+        ):
+            provider.plan(desired)
+
+    def test_plan_estimate(self, make_server, caplog):
+        caplog.set_level(logging.INFO)
+        server = make_server()
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        rsets = _zone_rsets(5)
+        server.state.add_record_sets(dns_zone.id, rsets)
+
+        desired = Zone(STUB_ZONE_NAME, [])
+        for rset in _zone_rsets(8):
+            updated = RecordSet()
+            updated.CopyFrom(rset)
+            updated.ttl = 60
+            desired.add_record(
+                map_rset_to_octodns(None, desired, False, updated)
+            )
+
+        provider = _make_provider()
+        provider.UPDATE_CHUNK_SIZE = 2
+        plan = provider.plan(desired)
+        # 3 creates in 2 chunks, 5 updates in 3 chunks
+        assert plan.estimate.calls == {'UpdateRecordSets': 5}
+        assert 'estimated API cost: calls=5 (UpdateRecordSets=5)' in (
+            caplog.text
+        )
+
+        # Payload differs by the zone id only
+        sizes = []
+        update = provider.dns_service.UpdateRecordSets
+
+        def _update(request, *args, **kwargs):
+            sizes.append(request.ByteSize())
+            return update(request, *args, **kwargs)
+
+        provider.dns_service.UpdateRecordSets = _update
+        provider.apply(plan)
+        assert sum(sizes) == plan.estimate.request_bytes + 5 * (
+            2 + len(dns_zone.id)
+        )
+
+        # Verification listings are counted, large plans are flagged
+        provider = _make_provider(
+            fire_and_verify=True, plan_api_calls_warning=5
+        )
+        provider.VERIFY_CHUNK_SIZE = 3
+        desired.add_record(
+            map_rset_to_octodns(None, desired, False, _zone_rsets(9)[8])
+        )
+        caplog.clear()
+        plan = provider.plan(desired)
+        assert plan.estimate.calls == {
+            'UpdateRecordSets': 1,
+            'ListRecordSets': 1,
+        }
+        assert 'may hit API rate limits' not in caplog.text
+
+        provider.plan_api_calls_warning = 2
+        provider.plan(desired)
+        assert 'calls=2 (UpdateRecordSets=1, ListRecordSets=1)' in caplog.text
+        assert 'may hit API rate limits' in caplog.text
+
+    def test_populate_error(self, make_server):
+        server = make_server(
+            latency={'ListRecordSets': 0.01},
+            errors={'ListRecordSets': [None, grpc.StatusCode.UNAVAILABLE]},
+            page_size=10,
+        )
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, _zone_rsets(50))
+
+        # Failed page is retried, listing is resumed from it
+        provider = _make_provider()
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert provider.populate(zone)
+        assert len(zone.records) == 50
+        assert server.dns_service.calls['ListRecordSets'] == 6
+
+        # Retries are disabled
+        server.dns_service.errors['ListRecordSets'] = [
+            None,
+            grpc.StatusCode.UNAVAILABLE,
+        ]
+        provider = _make_provider(list_retry_budget=0)
+        with pytest.raises(grpc.RpcError) as e:
+            provider.populate(Zone(STUB_ZONE_NAME, []))
+        assert e.value.code() == grpc.StatusCode.UNAVAILABLE
+
+        # Not retryable
+        server.dns_service.errors['ListRecordSets'] = [
+            grpc.StatusCode.PERMISSION_DENIED
+        ]
+        provider = _make_provider()
+        with pytest.raises(grpc.RpcError) as e:
+            provider.populate(Zone(STUB_ZONE_NAME, []))
+        assert e.value.code() == grpc.StatusCode.PERMISSION_DENIED
+
+    def test_populate_retry_budget(self, make_server):
+        server = make_server(
+            errors={
+                'List': [grpc.StatusCode.UNAVAILABLE],
+                'ListRecordSets': [grpc.StatusCode.UNAVAILABLE] * 100,
+            }
+        )
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, _zone_rsets(5))
+
+        # Zone lookup and listing share the budget
+        provider = _make_provider(list_retry_budget=0.3)
+        with pytest.raises(grpc.RpcError) as e:
+            provider.populate(Zone(STUB_ZONE_NAME, []))
+        assert e.value.code() == grpc.StatusCode.UNAVAILABLE
+        assert server.dns_service.calls['List'] == 2
+        assert 1 < server.dns_service.calls['ListRecordSets'] < 100
+
+    def test_populate_hedged(self, make_server):
+        server = make_server(page_size=1)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, _zone_rsets(30))
+
+        provider = _make_provider(list_hedge_percentile=95)
+        hedger = provider.hedgers['ListRecordSets']
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert provider.populate(zone)
+        assert hedger.calls == 30
+        # Nothing is hedged until enough latencies are observed
+        assert hedger.hedged <= hedger.calls - hedger.min_samples
+
+        # Pages slower than the percentile are duplicated
+        hedger.latencies.extend([0.000001] * 1000)
+        calls = server.dns_service.calls['ListRecordSets']
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert provider.populate(zone)
+        assert len(zone.records) == 30
+        assert hedger.calls == 60
+        assert hedger.hedged > 0
+        assert server.dns_service.calls['ListRecordSets'] > calls + 30
+        assert provider.hedgers['List'].calls == 2
+
+    def test_apply(self, make_server):
+        server = make_server()
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        rsets = _zone_rsets(5)
+        server.state.add_record_sets(dns_zone.id, rsets)
+
+        provider = _make_provider()
+        provider.UPDATE_CHUNK_SIZE = 2
+
+        zone = Zone(STUB_ZONE_NAME, [])
+        existing = [map_rset_to_octodns(None, zone, False, e) for e in rsets]
+        new = _zone_rsets(8)[5:]
+        updated = RecordSet()
+        updated.CopyFrom(rsets[2])
+        updated.data[:] = ['10.10.10.10']
+
+        provider.apply(
+            Plan(
+                existing=None,
+                desired=zone,
+                changes=[
+                    Delete(existing[0]),
+                    Delete(existing[1]),
+                    Update(
+                        existing[2],
+                        map_rset_to_octodns(None, zone, False, updated),
+                    ),
+                    *(
+                        Create(map_rset_to_octodns(None, zone, False, e))
+                        for e in new
+                    ),
+                ],
+                exists=True,
+            )
+        )
+
+        result = server.state.get_record_sets(dns_zone.id)
+        assert sorted(e.name for e in result) == sorted(
+            e.name for e in rsets[2:] + new
+        )
+        assert next(e for e in result if e.name == updated.name) == updated
+        assert server.dns_service.calls['UpdateRecordSets'] == 2
+
+    def test_apply_error(self, make_server):
+        server = make_server(
+            errors={'UpdateRecordSets': [grpc.StatusCode.PERMISSION_DENIED]}
+        )
+        server.state.add_zone(STUB_ZONE_NAME)
+
+        provider = _make_provider()
+        zone = Zone(STUB_ZONE_NAME, [])
+        record = map_rset_to_octodns(None, zone, False, _zone_rsets(1)[0])
+        with pytest.raises(Exception, match='.*PERMISSION_DENIED.*'):
+            provider.apply(
+                Plan(
+                    existing=None,
+                    desired=zone,
+                    changes=[Create(record)],
+                    exists=True,
+                )
+            )
+
+    def test_apply_operation_error(self, make_server):
+        server = make_server(operation_delay=0.1)
+        server.state.add_zone(STUB_ZONE_NAME)
+
+        # Operation fails as the record set doesn't exist
+        provider = _make_provider(operation_poll_initial=0.01)
+        zone = Zone(STUB_ZONE_NAME, [])
+        record = map_rset_to_octodns(None, zone, False, _zone_rsets(1)[0])
+        with pytest.raises(
+            YandexCloudException, match='.*code=9, message=Record set.*'
+        ):
+            provider.apply(
+                Plan(
+                    existing=None,
+                    desired=zone,
+                    changes=[Delete(record)],
+                    exists=True,
+                )
+            )
+        assert server.operation_service.calls['Get'] > 1
+
+    def test_apply_operation_poll_error(self, make_server):
+        server = make_server(
+            operation_delay=0.1,
+            operation_errors={'Get': [grpc.StatusCode.PERMISSION_DENIED]},
+        )
+        server.state.add_zone(STUB_ZONE_NAME)
+
+        provider = _make_provider(operation_poll_initial=0.01)
+        zone = Zone(STUB_ZONE_NAME, [])
+        record = map_rset_to_octodns(None, zone, False, _zone_rsets(1)[0])
+        with pytest.raises(YandexCloudException, match='.*PERMISSION_DENIED.*'):
+            provider.apply(
+                Plan(
+                    existing=None,
+                    desired=zone,
+                    changes=[Create(record)],
+                    exists=True,
+                )
+            )
+
+    def test_apply_operation_timeout(self, make_server):
+        server = make_server(operation_delay=10)
+        server.state.add_zone(STUB_ZONE_NAME)
+
+        provider = _make_provider(
+            operation_poll_initial=0.01, operation_timeout=0.1
+        )
+        zone = Zone(STUB_ZONE_NAME, [])
+        record = map_rset_to_octodns(None, zone, False, _zone_rsets(1)[0])
+        with pytest.raises(YandexCloudException, match='.*not done in 0.1s'):
+            provider.apply(
+                Plan(
+                    existing=None,
+                    desired=zone,
+                    changes=[Create(record)],
+                    exists=True,
+                )
+            )
+
+    def _verify_plan(self, zone, rsets):
+        existing = [map_rset_to_octodns(None, zone, False, e) for e in rsets]
+        updated = RecordSet()
+        updated.CopyFrom(rsets[2])
+        updated.data[:] = ['10.10.10.10']
+        return Plan(
+            existing=None,
+            desired=zone,
+            changes=[
+                Delete(existing[0]),
+                Update(
+                    existing[2], map_rset_to_octodns(None, zone, False, updated)
+                ),
+                *(
+                    Create(map_rset_to_octodns(None, zone, False, e))
+                    for e in _zone_rsets(8)[5:]
+                ),
+            ],
+            exists=True,
+        )
+
+    def test_apply_fire_and_verify(self, make_server):
+        server = make_server(operation_delay=0.05)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        rsets = _zone_rsets(5)
+        server.state.add_record_sets(dns_zone.id, rsets)
+
+        events = []
+        provider = _make_provider(
+            fire_and_verify=True,
+            operation_poll_initial=0.01,
+            progress_interval=0,
+            progress_callback=events.append,
+        )
+        provider.UPDATE_CHUNK_SIZE = 1
+        provider.VERIFY_CHUNK_SIZE = 2
+
+        zone = Zone(STUB_ZONE_NAME, [])
+        provider.apply(self._verify_plan(zone, rsets))
+        # Progress is counted by waited operations
+        assert events[-1]['steps'] == 4
+        assert events[-1]['rsets_done'] == 5
+
+        result = server.state.get_record_sets(dns_zone.id)
+        assert sorted(e.name for e in result) == sorted(
+            e.name for e in rsets[1:] + _zone_rsets(8)[5:]
+        )
+        assert server.dns_service.calls['UpdateRecordSets'] == 4
+        # 5 changed names are listed in batches of 2
+        assert server.dns_service.calls['ListRecordSets'] == 3
+
+    def test_apply_progress(self, make_server):
+        server = make_server(operation_delay=0.05)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        rsets = _zone_rsets(5)
+        server.state.add_record_sets(dns_zone.id, rsets)
+
+        events = []
+        provider = _make_provider(
+            operation_poll_initial=0.01,
+            progress_interval=0,
+            progress_callback=events.append,
+        )
+        provider.UPDATE_CHUNK_SIZE = 1
+
+        zone = Zone(STUB_ZONE_NAME, [])
+        provider.apply(self._verify_plan(zone, rsets))
+
+        # Reported while operations are polled
+        assert any(e['step_age'] is not None for e in events)
+        done = [e for e in events if e['step_age'] is None]
+        assert [(e['steps_done'], e['rsets_done']) for e in done] == [
+            (1, 2),
+            (2, 3),
+            (3, 4),
+            (4, 5),
+        ]
+        assert done[-1]['finished']
+        assert done[-1]['eta'] == 0
+        assert all(e['zone'] == STUB_ZONE_NAME for e in events)
+
+    def test_apply_journal(self, make_server, tmp_path):
+        server = make_server()
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, _zone_rsets(4))
+
+        desired = Zone(STUB_ZONE_NAME, [])
+        for rset in _zone_rsets(6):
+            rset.ttl = 60
+            desired.add_record(map_rset_to_octodns(None, desired, False, rset))
+
+        def _provider():
+            provider = _make_provider(
+                journal_dir=str(tmp_path),
+                journal_max_age=600,
+                operation_poll_initial=0.01,
+            )
+            assert provider.journal_max_age == 600
+            provider.UPDATE_CHUNK_SIZE = 1
+            return provider
+
+        # 2 creates and 4 updates, the second operation is applied but
+        # its result is lost
+        provider = _provider()
+        submitted = []
+        update = provider.dns_service.UpdateRecordSets
+        wait = provider._wait_operation
+
+        def _update(*args, **kwargs):
+            submitted.append(args[0])
+            return update(*args, **kwargs)
+
+        def _wait(operation, *args, **kwargs):
+            if len(submitted) == 2:
+                raise YandexCloudException('Lost')
+            return wait(operation, *args, **kwargs)
+
+        provider.dns_service.UpdateRecordSets = _update
+        provider._wait_operation = _wait
+        plan = provider.plan(desired)
+        assert len(plan.changes) == 6
+        with pytest.raises(YandexCloudException, match='Lost'):
+            provider.apply(plan)
+        journal = tmp_path / f'{STUB_ZONE_NAME}journal'
+        assert journal.exists()
+
+        # Plan is taken from the journal, the uncertain chunk is verified
+        # even if its operation is not available, the fourth operation
+        # fails to submit
+        calls = dict(server.dns_service.calls)
+        server.operation_service.errors['Get'] = [grpc.StatusCode.NOT_FOUND]
+        server.dns_service.errors['UpdateRecordSets'] = [
+            None,
+            grpc.StatusCode.UNAVAILABLE,
+        ]
+        provider = _provider()
+        plan = provider.plan(desired)
+        assert len(plan.changes) == 6
+        assert server.dns_service.calls['ListRecordSets'] == (
+            calls['ListRecordSets']
+        )
+        with pytest.raises(YandexCloudException, match='.*UNAVAILABLE.*'):
+            provider.apply(plan)
+        assert server.dns_service.calls['ListRecordSets'] == (
+            calls['ListRecordSets'] + 1
+        )
+        assert server.dns_service.calls['UpdateRecordSets'] == 4
+        # The resumed apply failed on a step which wasn't started before,
+        # the journal isn't trusted anymore
+        assert not journal.exists()
+
+        # The zone is populated and planned again, not applied changes are
+        # submitted again
+        calls = dict(server.dns_service.calls)
+        provider = _provider()
+        plan = provider.plan(desired)
+        assert len(plan.changes) == 3
+        assert server.dns_service.calls['ListRecordSets'] > (
+            calls['ListRecordSets']
+        )
+        provider.apply(plan)
+        assert server.dns_service.calls['UpdateRecordSets'] == 7
+        assert not journal.exists()
+        result = server.state.get_record_sets(dns_zone.id)
+        assert sorted((e.name, e.ttl) for e in result) == sorted(
+            (e.name, 60) for e in _zone_rsets(6)
+        )
+
+        # Journal is not used once the zone is in sync
+        assert provider.plan(desired) is None
+
+    def test_apply_fire_and_verify_journal(self, make_server, tmp_path):
+        server = make_server(
+            errors={'UpdateRecordSets': [None, grpc.StatusCode.UNAVAILABLE]}
+        )
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+
+        desired = Zone(STUB_ZONE_NAME, [])
+        for rset in _zone_rsets(3):
+            desired.add_record(map_rset_to_octodns(None, desired, False, rset))
+
+        def _provider():
+            provider = _make_provider(
+                fire_and_verify=True, journal_dir=str(tmp_path)
+            )
+            provider.UPDATE_CHUNK_SIZE = 1
+            return provider
+
+        # Submitted operation is waited and confirmed before the error
+        provider = _provider()
+        with pytest.raises(YandexCloudException, match='.*UNAVAILABLE.*'):
+            provider.apply(provider.plan(desired))
+
+        provider = _provider()
+        provider.apply(provider.plan(desired))
+        assert server.dns_service.calls['UpdateRecordSets'] == 4
+        assert len(server.state.get_record_sets(dns_zone.id)) == 3
+        assert not (tmp_path / f'{STUB_ZONE_NAME}journal').exists()
+
+    def test_apply_fire_and_verify_mismatch(self, make_server, monkeypatch):
+        server = make_server()
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        rsets = _zone_rsets(5)
+        server.state.add_record_sets(dns_zone.id, rsets)
+        # Listing returns the state before the changes
+        monkeypatch.setattr(
+            server.state, 'get_record_sets', lambda zone_id: list(rsets)
+        )
+
+        provider = _make_provider(fire_and_verify=True)
+        zone = Zone(STUB_ZONE_NAME, [])
+        with pytest.raises(YandexCloudException) as e:
+            provider.apply(self._verify_plan(zone, rsets))
+        assert str(e.value) == (
+            'Verification failed for 5 record sets: '
+            f'host0.{STUB_ZONE_NAME} A is not deleted, '
+            f'host2.{STUB_ZONE_NAME} A differs, '
+            f'host5.{STUB_ZONE_NAME} A is missing, '
+            f'host6.{STUB_ZONE_NAME} A is missing, '
+            f'host7.{STUB_ZONE_NAME} A is missing'
+        )
+
+    def test_apply_fire_and_verify_errors(self, make_server):
+        server = make_server(operation_delay=0.05)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        rsets = _zone_rsets(2)
+        server.state.add_record_sets(dns_zone.id, rsets)
+
+        provider = _make_provider(
+            fire_and_verify=True, operation_poll_initial=0.01
+        )
+        provider.UPDATE_CHUNK_SIZE = 1
+        zone = Zone(STUB_ZONE_NAME, [])
+
+        # Both operations fail as the record sets already exist,
+        # errors are reported after all operations are done
+        plan = Plan(
+            existing=None,
+            desired=zone,
+            changes=[
+                Create(map_rset_to_octodns(None, zone, False, e)) for e in rsets
+            ],
+            exists=True,
+        )
+        with pytest.raises(
+            YandexCloudException, match='^2 of 2 operations failed: .*'
+        ):
+            provider.apply(plan)
+        assert server.dns_service.calls['UpdateRecordSets'] == 2
+        assert 'ListRecordSets' not in server.dns_service.calls
+
+        # Submission stops on the first error, submitted ones are waited
+        server.dns_service.errors['UpdateRecordSets'] = [
+            None,
+            grpc.StatusCode.PERMISSION_DENIED,
+        ]
+        calls = server.operation_service.calls.get('Get', 0)
+        plan = Plan(
+            existing=None,
+            desired=zone,
+            changes=[
+                Delete(map_rset_to_octodns(None, zone, False, e)) for e in rsets
+            ],
+            exists=True,
+        )
+        with pytest.raises(YandexCloudException, match='.*PERMISSION_DENIED.*'):
+            provider.apply(plan)
+        assert server.dns_service.calls['UpdateRecordSets'] == 4
+        assert server.operation_service.calls['Get'] > calls
+        assert server.state.get_record_sets(dns_zone.id) == rsets[1:]
+
+    def test_metrics(self, make_server, monkeypatch):
+        monkeypatch.setattr(YandexCloudProvider, 'metrics', Metrics())
+        server = make_server(page_size=7)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        rsets = _zone_rsets(20)
+        server.state.add_record_sets(dns_zone.id, rsets)
+
+        provider = _make_provider()
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert provider.populate(zone)
+        provider.apply(
+            Plan(
+                existing=None,
+                desired=zone,
+                changes=[Delete(next(iter(zone.records)))],
+                exists=True,
+            )
+        )
+
+        series = provider.metrics.series
+        assert sorted(series.keys()) == [
+            ('dns', 'List', STUB_ZONE_NAME),
+            ('dns', 'ListRecordSets', STUB_ZONE_NAME),
+            ('dns', 'UpdateRecordSets', STUB_ZONE_NAME),
+            ('operation', 'Get', STUB_ZONE_NAME),
+            ('operation', 'Wait', STUB_ZONE_NAME),
+        ]
+        # Prefetched pages are labeled with the zone too
+        list_rsets = series[('dns', 'ListRecordSets', STUB_ZONE_NAME)]
+        assert list_rsets.calls == 3
+        assert list_rsets.errors == 0
+        assert list_rsets.response_bytes > sum(e.ByteSize() for e in rsets)
+
+    def test_rate_limits(self, make_server, monkeypatch):
+        monkeypatch.setattr(YandexCloudProvider, 'limits', RateLimits())
+        monkeypatch.setattr(TokenBucket, 'THROTTLE_PAUSE', 0.01)
+        server = make_server(
+            page_size=5,
+            errors={'ListRecordSets': [grpc.StatusCode.RESOURCE_EXHAUSTED]},
+        )
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, _zone_rsets(10))
+
+        provider = _make_provider(
+            rate_limits={'dns_read': {'rate': 1000, 'concurrency': 2}}
+        )
+        zone = Zone(STUB_ZONE_NAME, [])
+        # Exhausted quota is retried after a pause
+        assert provider.populate(zone)
+        assert len(zone.records) == 10
+        provider.apply(
+            Plan(
+                existing=None,
+                desired=zone,
+                changes=[Delete(next(iter(zone.records)))],
+                exists=True,
+            )
+        )
+
+        buckets = provider.limits.buckets
+        assert sorted(buckets.keys()) == ['dns_read', 'dns_write']
+        assert buckets['dns_read'].calls == sum(
+            server.dns_service.calls.get(e, 0)
+            for e in ('List', 'ListRecordSets')
+        ) + sum(server.operation_service.calls.values())
+        assert buckets['dns_read'].throttled == 1
+        assert buckets['dns_write'].calls == 1
+        assert buckets['dns_write'].throttled == 0
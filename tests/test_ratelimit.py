@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+
+import grpc
+import pytest
+
+from octodns_yandex import ratelimit as ratelimit_module
+from octodns_yandex.exception import YandexCloudConfigException
+from octodns_yandex.ratelimit import (
+    LIMITS,
+    RateLimits,
+    TokenBucket,
+    _RateLimitMixin,
+    limit_api,
+)
+
+
+class StubRpcError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+@pytest.fixture()
+def frozen_clock(monkeypatch):
+    # Calls which don't wait take no time at all
+    monkeypatch.setattr(ratelimit_module.time, 'monotonic', lambda: 100.0)
+
+
+def test_limit_api():
+    assert limit_api('dns', 'List') == 'dns_read'
+    assert limit_api('dns', 'UpdateRecordSets') == 'dns_write'
+    assert limit_api('dns', 'UpsertRecordSets') == 'dns_write'
+    assert limit_api('operation', 'Get') == 'dns_read'
+    assert limit_api('cm', 'List') == 'cm'
+    assert limit_api('yandex360', None) == 'yandex360'
+
+
+class TestTokenBucket:
+    def test_unlimited(self, frozen_clock):
+        bucket = TokenBucket()
+        for _ in range(100):
+            assert bucket.acquire() == 0
+            bucket.release()
+        assert bucket.calls == 100
+        assert bucket.waits == 0
+        assert bucket.active == 0
+
+    def test_configure(self):
+        bucket = TokenBucket(rate=10)
+        assert bucket.burst == 10
+        assert bucket.concurrency is None
+
+        # The strictest configuration wins
+        bucket.configure(rate=20, burst=2, concurrency=4)
+        assert (bucket.rate, bucket.burst, bucket.concurrency) == (10, 2, 4)
+        assert bucket.tokens == 2
+        bucket.configure(rate=0.5)
+        assert (bucket.rate, bucket.burst, bucket.current_rate) == (0.5, 1, 0.5)
+
+    def test_rate(self):
+        bucket = TokenBucket(rate=100, burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+            bucket.release()
+        # 2 calls of the burst, 4 more at 100/s
+        assert time.monotonic() - start >= 0.035
+        assert bucket.calls == 6
+        assert bucket.waits >= 3
+        assert bucket.waited >= 0.035
+
+    def test_throttle(self):
+        bucket = TokenBucket(rate=100)
+        bucket.THROTTLE_PAUSE = 0.02
+
+        bucket.acquire()
+        bucket.release(throttled=True)
+        assert bucket.throttled == 1
+        assert bucket.current_rate == 50
+        # Callers are paused
+        assert bucket.acquire() >= 0.015
+        bucket.release()
+        assert bucket.current_rate == 55
+
+        # Never slower than the floor, recovers up to the configured rate
+        for _ in range(10):
+            bucket.acquire()
+            bucket.release(throttled=True)
+        assert bucket.current_rate == 5
+        bucket.THROTTLE_PAUSE = 0
+        for _ in range(30):
+            bucket.acquire()
+            bucket.release()
+        assert bucket.current_rate == 100
+
+        # Without a rate callers are paused only
+        bucket = TokenBucket(concurrency=2)
+        bucket.THROTTLE_PAUSE = 0.01
+        bucket.acquire()
+        bucket.release(throttled=True)
+        assert bucket.current_rate is None
+        assert bucket.acquire() >= 0.005
+
+    def test_congested(self):
+        bucket = TokenBucket(rate=1, concurrency=1)
+        assert not bucket.congested()
+        bucket.acquire()
+        # No tokens left and a call in flight
+        assert bucket.congested()
+        bucket.configure(burst=1)
+        bucket.tokens = 1
+        assert bucket.congested()
+        bucket.release()
+        assert not bucket.congested()
+
+        limits = RateLimits()
+        limits.configure({'dns_read': {'concurrency': 1}})
+        with limits.limit('dns', 'ListRecordSets'):
+            assert limits.congested('dns', 'List')
+            assert not limits.congested('dns', 'UpdateRecordSets')
+        assert not limits.congested('dns', 'List')
+
+    def test_concurrency(self):
+        bucket = TokenBucket(concurrency=1)
+        bucket.acquire()
+
+        waited = []
+        thread = threading.Thread(
+            target=lambda: waited.append(bucket.acquire())
+        )
+        thread.start()
+        time.sleep(0.02)
+        assert bucket.active == 1
+        bucket.release()
+        thread.join()
+        assert waited[0] >= 0.015
+        assert bucket.active == 1
+
+
+class TestRateLimits:
+    def test_configure(self):
+        limits = RateLimits()
+        limits.configure(
+            {'dns_write': {'rate': 5}, 'yandex360': {'concurrency': 2}}
+        )
+        assert limits.bucket('dns_write').rate == 5
+        assert limits.bucket('yandex360').concurrency == 2
+        assert limits.bucket('cm').rate is None
+
+        with pytest.raises(YandexCloudConfigException, match='.*be a dict'):
+            limits.configure([])
+        with pytest.raises(YandexCloudConfigException, match='Unknown API.*'):
+            limits.configure({'dns': {'rate': 1}})
+        for options in (1, {'rate': 0}, {'rate': '1'}, {'limit': 1}):
+            with pytest.raises(YandexCloudConfigException, match='Invalid.*'):
+                limits.configure({'cdn': options})
+
+    def test_limit(self, frozen_clock, monkeypatch):
+        # The clock doesn't move, throttled callers are not paused
+        monkeypatch.setattr(TokenBucket, 'THROTTLE_PAUSE', 0)
+        limits = RateLimits()
+        with limits.limit('dns', 'List') as slot:
+            assert slot.waited == 0
+            assert not slot.throttled
+        with limits.limit('yandex360') as slot:
+            slot.throttled = True
+        assert limits.bucket('yandex360').throttled == 1
+
+        with pytest.raises(StubRpcError):
+            with limits.limit('dns', 'UpdateRecordSets'):
+                raise StubRpcError(grpc.StatusCode.RESOURCE_EXHAUSTED)
+        with pytest.raises(StubRpcError):
+            with limits.limit('dns', 'UpdateRecordSets'):
+                raise StubRpcError(grpc.StatusCode.UNAVAILABLE)
+        bucket = limits.bucket('dns_write')
+        assert (bucket.calls, bucket.throttled, bucket.active) == (2, 1, 0)
+
+    def test_report(self, caplog, frozen_clock):
+        caplog.set_level(logging.INFO)
+        limits = RateLimits()
+        limits.bucket('cm')
+        limits.report()
+        assert caplog.text == ''
+
+        with limits.limit('operation', 'Get'):
+            pass
+        limits.report()
+        assert (
+            'summary: dns_read: calls=1 waits=0 waited=0.000s throttled=0'
+            in caplog.text
+        )
+        assert 'cm' not in caplog.text
+
+
+class _Provider(_RateLimitMixin):
+    pass
+
+
+def test_mixin(monkeypatch):
+    monkeypatch.setattr(_Provider, 'limits', RateLimits())
+    provider = _Provider()
+    provider.init_rate_limits(None)
+    assert provider.limits.buckets == {}
+
+    provider.init_rate_limits({'cdn': {'rate': 3}})
+    assert provider.limits.bucket('cdn').rate == 3
+    assert _RateLimitMixin.limits is LIMITS
@@ -0,0 +1,223 @@
+import threading
+
+import grpc
+import pytest
+
+from octodns_yandex import retry as retry_module
+from octodns_yandex.metrics import _zone, zone_context
+from octodns_yandex.retry import Hedger, RetryBudget, resilient
+
+
+class StubRpcError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+class StubClock:
+    def __init__(self, monkeypatch):
+        self.now = 0.0
+        self.sleeps = []
+        monkeypatch.setattr(retry_module.time, 'monotonic', self.monotonic)
+        monkeypatch.setattr(retry_module.time, 'sleep', self.sleep)
+        monkeypatch.setattr(retry_module.random, 'uniform', lambda a, b: b)
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _failing(*codes):
+    codes = list(codes)
+    calls = []
+
+    def fn(*args, **kwargs):
+        calls.append((args, kwargs))
+        if codes:
+            raise StubRpcError(codes.pop(0))
+        return 'ok'
+
+    return fn, calls
+
+
+class TestRetryBudget:
+    def test_call(self, monkeypatch):
+        clock = StubClock(monkeypatch)
+        retry = RetryBudget(budget=10, initial_backoff=1, max_backoff=3)
+
+        fn, calls = _failing(
+            grpc.StatusCode.UNAVAILABLE,
+            grpc.StatusCode.DEADLINE_EXCEEDED,
+            grpc.StatusCode.UNAVAILABLE,
+        )
+        assert retry.call(fn, 'request', timeout=5) == 'ok'
+        assert calls == [(('request',), {'timeout': 5})] * 4
+        assert clock.sleeps == [1, 2, 3]
+        assert str(retry) == 'retries=3'
+
+        # Not retryable
+        fn, calls = _failing(grpc.StatusCode.NOT_FOUND)
+        with pytest.raises(StubRpcError):
+            retry.call(fn, 'request')
+        assert len(calls) == 1
+
+        # Budget is shared by calls, 4 of 10 seconds are left
+        fn, calls = _failing(*[grpc.StatusCode.UNAVAILABLE] * 10)
+        with pytest.raises(StubRpcError):
+            retry.call(fn, 'request')
+        assert len(calls) == 3
+        assert clock.sleeps == [1, 2, 3, 1, 2]
+        assert retry.retries == 5
+
+    def test_budget(self, monkeypatch):
+        clock = StubClock(monkeypatch)
+        retry = RetryBudget(budget=10, initial_backoff=1, max_backoff=1)
+
+        # Successful calls don't use the budget
+        clock.now += 60
+        fn, calls = _failing(grpc.StatusCode.UNAVAILABLE)
+        assert retry.call(fn, 'request') == 'ok'
+        assert retry.retries == 1
+        assert retry.spent == 1
+
+        # Failed calls do
+        def slow(request):
+            clock.now += 4
+            raise StubRpcError(grpc.StatusCode.DEADLINE_EXCEEDED)
+
+        with pytest.raises(StubRpcError):
+            retry.call(slow, 'request')
+        # 1 + 4 + 1 + 4, no time left for another backoff
+        assert retry.retries == 2
+        assert retry.spent == 10
+
+
+class TestHedger:
+    def test_threshold(self):
+        hedger = Hedger(percentile=90, min_samples=10, window=20)
+        for i in range(9):
+            hedger.observe(i)
+        assert hedger.threshold() is None
+        hedger.observe(9)
+        assert hedger.threshold() == 9
+        for i in range(10, 30):
+            hedger.observe(i)
+        assert len(hedger.latencies) == 20
+        assert hedger.threshold() == 28
+
+        hedger = Hedger(percentile=100, min_samples=1)
+        hedger.observe(1)
+        assert hedger.threshold() == 1
+
+    def test_call(self):
+        hedger = Hedger(min_samples=1)
+        assert hedger.call(lambda a, b=None: (a, b), 1, b=2) == (1, 2)
+        assert hedger.calls == 1
+        assert str(hedger) == 'calls=1, hedged=0'
+
+        # Fast enough, no duplicate
+        hedger.latencies.append(10)
+        with zone_context('example.com.'):
+            assert hedger.call(_zone.get) == 'example.com.'
+        assert hedger.hedged == 0
+
+    def _hedger(self):
+        hedger = Hedger(min_samples=1)
+        hedger.observe(0.01)
+        return hedger
+
+    def test_hedged(self):
+        # First call is stuck, duplicate answers
+        hedger = self._hedger()
+        release = threading.Event()
+        calls = []
+
+        def slow(value):
+            calls.append(value)
+            if len(calls) == 1:
+                release.wait(5)
+                return 'slow'
+            return 'fast'
+
+        assert hedger.call(slow, 1) == 'fast'
+        assert calls == [1, 1]
+        assert hedger.hedged == 1
+        assert hedger.calls == 2
+        release.set()
+
+    def test_congested(self):
+        # Slow calls held by rate limits are not duplicated
+        congested = [True, False]
+        hedger = Hedger(min_samples=1, congested=lambda: congested[0])
+        hedger.observe(0.01)
+        calls = []
+
+        def slow(value):
+            calls.append(value)
+            threading.Event().wait(0.05)
+            return value
+
+        assert hedger.call(slow, 1) == 1
+        assert calls == [1]
+        assert hedger.hedged == 0
+
+        congested.pop(0)
+        hedger.latencies.clear()
+        hedger.observe(0.01)
+        assert hedger.call(slow, 2) == 2
+        assert calls == [1, 2, 2]
+        assert hedger.hedged == 1
+
+    def test_hedged_error(self):
+        # First call fails after duplicate is sent, duplicate answers
+        hedger = self._hedger()
+        first, second = threading.Event(), threading.Event()
+        calls = []
+
+        def failing(value):
+            calls.append(value)
+            if len(calls) == 1:
+                first.wait(5)
+                raise StubRpcError(grpc.StatusCode.UNAVAILABLE)
+            first.set()
+            second.wait(5)
+            return 'second'
+
+        timer = threading.Timer(0.1, second.set)
+        timer.start()
+        assert hedger.call(failing, 2) == 'second'
+        timer.join()
+        assert hedger.hedged == 1
+
+        # Both calls fail
+        hedger = self._hedger()
+
+        def broken(value):
+            threading.Event().wait(0.05)
+            raise StubRpcError(grpc.StatusCode.UNAVAILABLE)
+
+        with pytest.raises(StubRpcError):
+            hedger.call(broken, 3)
+        assert hedger.hedged == 1
+        assert hedger.calls == 1
+
+
+def test_resilient(monkeypatch):
+    clock = StubClock(monkeypatch)
+
+    fn, calls = _failing()
+    assert resilient(fn) is fn
+
+    hedger = Hedger()
+    retry = RetryBudget(budget=10)
+    fn, calls = _failing(grpc.StatusCode.UNAVAILABLE)
+    assert resilient(fn, retry, hedger)('request') == 'ok'
+    assert len(calls) == 2
+    assert hedger.calls == 1
+    assert retry.retries == 1
+    assert len(clock.sleeps) == 1
@@ -0,0 +1,60 @@
+import pytest
+from yandex.cloud.dns.v1.dns_zone_pb2 import RecordSet
+
+from octodns_yandex.exception import YandexCloudException
+from octodns_yandex.snapshot import (
+    SNAPSHOT_MAGIC,
+    SnapshotWriter,
+    read_snapshot,
+    snapshot_path,
+)
+from tests.fixtures import STUB_ZONE_NAME
+from tests.fixtures.generator import generate_record_sets
+
+
+class TestSnapshot:
+    def test_path(self):
+        assert snapshot_path('/tmp', STUB_ZONE_NAME) == '/tmp/example.com.pb'
+
+    def test_write_read(self, tmp_path):
+        path = str(tmp_path / 'zone.pb')
+        rsets = generate_record_sets(100, STUB_ZONE_NAME, seed=1)
+        with SnapshotWriter(path) as writer:
+            for rset in rsets:
+                writer.write(rset)
+        assert writer.count == 100
+        assert list(read_snapshot(path)) == rsets
+        assert [e.name for e in tmp_path.iterdir()] == ['zone.pb']
+
+        # Empty zone
+        with SnapshotWriter(path):
+            pass
+        assert list(read_snapshot(path)) == []
+
+    def test_write_failed(self, tmp_path):
+        path = str(tmp_path / 'zone.pb')
+        with SnapshotWriter(path) as writer:
+            writer.write(RecordSet(name=STUB_ZONE_NAME, type='A'))
+
+        # Previous snapshot is kept
+        with pytest.raises(RuntimeError):
+            with SnapshotWriter(path) as writer:
+                writer.write(RecordSet(name=STUB_ZONE_NAME, type='TXT'))
+                raise RuntimeError('failed')
+        assert [e.type for e in read_snapshot(path)] == ['A']
+        assert [e.name for e in tmp_path.iterdir()] == ['zone.pb']
+
+    def test_read_invalid(self, tmp_path):
+        path = tmp_path / 'zone.pb'
+        path.write_bytes(b'not a snapshot')
+        with pytest.raises(YandexCloudException, match='Not a zone snapshot'):
+            list(read_snapshot(str(path)))
+
+        data = RecordSet(name=STUB_ZONE_NAME, type='A').SerializeToString()
+        path.write_bytes(SNAPSHOT_MAGIC + b'\x01')
+        with pytest.raises(YandexCloudException, match='Truncated'):
+            list(read_snapshot(str(path)))
+
+        path.write_bytes(SNAPSHOT_MAGIC + b'\xff\x00\x00\x00' + data)
+        with pytest.raises(YandexCloudException, match='Truncated'):
+            list(read_snapshot(str(path)))
@@ -1,12 +1,14 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import yandexcloud
+from yandex.cloud.cdn.v1.resource_pb2 import Resource
 from yandex.cloud.cdn.v1.resource_service_pb2 import (
     GetProviderCNameResponse,
     ListResourcesResponse,
 )
-from yandex.cloud.cdn.v1.resource_service_pb2_grpc import ResourceServiceStub
 
-from octodns.record import Record
 from octodns.zone import Zone
 
 from octodns_yandex import YandexCloudCDNSource
@@ -22,12 +24,12 @@ class StubSDK:
     def __init__(self, *args, **kwargs):
         pass
 
-    def client(self, *args):
+    def client(self, stub):
         class StubChannel:
             def unary_unary(self, *args, **kwargs):
                 pass
 
-        return ResourceServiceStub(StubChannel())
+        return stub(StubChannel())
 
     def wait_operation_and_get_result(self, *args, **kwargs):
         pass
@@ -70,45 +72,65 @@ class TestYandexCloudCDNSource:
         )
         assert provider.get_provider_cname() == 'test.com.'
 
-    def test_process_resource(self, provider, monkeypatch):
-        zone = Zone('example.com.', [])
+    def test_find_zone_hostnames(self, provider, monkeypatch):
+        calls = 0
 
-        CDN_PROVIDER_CNAME = 'test.com.'
-        monkeypatch.setattr(
-            provider, 'get_provider_cname', lambda *args: CDN_PROVIDER_CNAME
-        )
+        def _list(req):
+            nonlocal calls
+            calls += 1
+            return ListResourcesResponse(
+                next_page_token='',
+                resources=[
+                    STUB_CDN_RESOURCE_1,
+                    STUB_CDN_RESOURCE_2,
+                    Resource(cname='cdn.notexample.com'),
+                    Resource(cname='a.sub.example.com'),
+                    Resource(cname='example.net'),
+                ],
+            )
 
-        MAIN_RECORD = Record.new(
-            zone,
-            'cdn',
-            data={
-                'type': 'CNAME',
-                'ttl': provider.record_ttl,
-                'value': CDN_PROVIDER_CNAME,
-            },
-        )
-        SECONDARY_RECORD = Record.new(
-            zone,
-            'cdn2',
-            data={
-                'type': 'CNAME',
-                'ttl': provider.record_ttl,
-                'value': CDN_PROVIDER_CNAME,
-            },
-        )
+        monkeypatch.setattr(provider.cdn_service, 'List', _list)
 
-        provider.process_resource(zone, STUB_CDN_RESOURCE_1)
-        assert len(zone.records) == 1
-        assert zone.records.pop() == MAIN_RECORD
-        zone.remove_record(MAIN_RECORD)
-
-        provider.process_resource(zone, STUB_CDN_RESOURCE_2)
-        assert len(zone.records) == 2
-        assert next((r for r in zone.records if r.name == 'cdn')) == MAIN_RECORD
-        assert (
-            next((r for r in zone.records if r.name == 'cdn2'))
-            == SECONDARY_RECORD
-        )
+        zone = Zone('example.com.', ['sub'])
+        assert list(provider.find_zone_hostnames(zone)) == [
+            ('cdn.example.com.', STUB_FOLDER_ID),
+            ('cdn2.example.com.', STUB_FOLDER_ID),
+        ]
+
+        zone = Zone('sub.example.com.', [])
+        assert list(provider.find_zone_hostnames(zone)) == [
+            ('a.sub.example.com.', STUB_FOLDER_ID)
+        ]
+
+        zone = Zone('example.org.', [])
+        assert list(provider.find_zone_hostnames(zone)) == []
+
+        # Resources are listed only once per source
+        assert calls == 1
+
+    def test_find_zone_hostnames_parallel(self, provider, monkeypatch):
+        calls = 0
+
+        def _list(req):
+            nonlocal calls
+            calls += 1
+            time.sleep(0.05)
+            return ListResourcesResponse(
+                next_page_token='', resources=[STUB_CDN_RESOURCE_1]
+            )
+
+        monkeypatch.setattr(provider.cdn_service, 'List', _list)
+
+        # Zones populated in parallel wait for the first listing
+        zones = [Zone('example.com.', []) for _ in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            found = list(
+                executor.map(
+                    lambda e: list(provider.find_zone_hostnames(e)), zones
+                )
+            )
+        assert found == [[('cdn.example.com.', STUB_FOLDER_ID)]] * 8
+        assert calls == 1
 
     def test_populate(self, provider, monkeypatch):
         def _list(req):
@@ -121,8 +143,52 @@ class TestYandexCloudCDNSource:
                     next_page_token='', resources=[STUB_CDN_RESOURCE_2]
                 )
 
-        monkeypatch.setattr(provider, 'process_resource', lambda *args: None)
+        monkeypatch.setattr(
+            provider, 'get_provider_cname', lambda *args: 'test.com.'
+        )
         monkeypatch.setattr(provider.cdn_service, 'List', _list)
 
         zone = Zone('example.com.', [])
         provider.populate(zone)
+        assert sorted(r.name for r in zone.records) == ['cdn', 'cdn2']
+
+        # Root CNAME is not valid, but it should still be picked up
+        zone = Zone('cdn2.example.com.', [])
+        provider.populate(zone, lenient=True)
+        assert [r.name for r in zone.records] == ['']
+
+    def test_populate_multiple_folders(self, disable_sdk, monkeypatch):
+        provider = YandexCloudCDNSource(
+            "test",
+            folder_ids=['folder1', 'folder2'],
+            auth_type=AUTH_TYPE_METADATA,
+        )
+
+        resources = {
+            'folder1': [Resource(cname='cdn.example.com')],
+            'folder2': [
+                Resource(cname='cdn.example.com'),
+                Resource(cname='cdn2.example.com'),
+            ],
+        }
+        monkeypatch.setattr(
+            provider.cdn_service,
+            'List',
+            lambda req: ListResourcesResponse(
+                next_page_token='', resources=resources[req.folder_id]
+            ),
+        )
+        monkeypatch.setattr(
+            provider.cdn_service,
+            'GetProviderCName',
+            lambda req: GetProviderCNameResponse(
+                cname=f'{req.folder_id}.test.com'
+            ),
+        )
+
+        zone = Zone('example.com.', [])
+        provider.populate(zone)
+        assert sorted((r.name, r.value) for r in zone.records) == [
+            ('cdn', 'folder1.test.com.'),
+            ('cdn2', 'folder2.test.com.'),
+        ]
@@ -1,11 +1,12 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import yandexcloud
 from yandex.cloud.certificatemanager.v1.certificate_service_pb2 import (
+    CertificateView,
     ListCertificatesResponse,
 )
-from yandex.cloud.certificatemanager.v1.certificate_service_pb2_grpc import (
-    CertificateServiceStub,
-)
 
 from octodns.zone import Zone
 
@@ -26,12 +27,12 @@ class StubSDK:
     def __init__(self, *args, **kwargs):
         pass
 
-    def client(self, *args):
+    def client(self, stub):
         class StubChannel:
             def unary_unary(self, *args, **kwargs):
                 pass
 
-        return CertificateServiceStub(StubChannel())
+        return stub(StubChannel())
 
     def wait_operation_and_get_result(self, *args, **kwargs):
         pass
@@ -138,19 +139,157 @@ class TestYandexCloudCMSource:
         assert record.data['ttl'] == provider.record_ttl
         zone.remove_record(record)
 
-    def test_populate(self, provider, monkeypatch):
+    @staticmethod
+    def _stub_service(
+        provider, monkeypatch, certificates, page_size=1, delay=0
+    ):
+        calls = {'List': 0, 'Get': 0}
+        by_id = {e.id: e for e in certificates}
+
         def _list(req):
-            if req.page_token == '':
-                return ListCertificatesResponse(
-                    next_page_token='123', certificates=[STUB_CERTIFICATE_1]
-                )
-            else:
-                return ListCertificatesResponse(
-                    next_page_token='', certificates=[STUB_IDNA_CERTIFICATE]
-                )
-
-        monkeypatch.setattr(provider, 'process_certificate', lambda *args: None)
+            calls['List'] += 1
+            assert req.view == CertificateView.BASIC
+            time.sleep(delay)
+
+            offset = int(req.page_token) if req.page_token else 0
+            next_offset = offset + page_size
+            page = certificates[offset:next_offset]
+            if next_offset >= len(certificates):
+                next_offset = ''
+
+            basic = []
+            for cert in page:
+                cert = cert.__deepcopy__()
+                cert.ClearField('challenges')
+                basic.append(cert)
+
+            return ListCertificatesResponse(
+                next_page_token=str(next_offset), certificates=basic
+            )
+
+        def _get(req):
+            calls['Get'] += 1
+            assert req.view == CertificateView.FULL
+            time.sleep(delay)
+            return by_id[req.certificate_id]
+
         monkeypatch.setattr(provider.cm_service, 'List', _list)
+        monkeypatch.setattr(provider.cm_service, 'Get', _get)
+        return calls
+
+    def test_populate(self, provider, monkeypatch):
+        self._stub_service(
+            provider, monkeypatch, [STUB_CERTIFICATE_1, STUB_IDNA_CERTIFICATE]
+        )
 
         zone = Zone('example.com.', [])
         provider.populate(zone)
+        assert [r.name for r in zone.records] == ['_acme-challenge']
+
+        zone = Zone('xn--e1aybc.xn--p1ai.', [])
+        provider.populate(zone)
+        assert [r.name for r in zone.records] == ['_acme-challenge']
+
+    def test_find_zone_certificates(self, provider, monkeypatch):
+        calls = self._stub_service(
+            provider,
+            monkeypatch,
+            [
+                STUB_CERTIFICATE_1,
+                STUB_CERTIFICATE_2,
+                STUB_IDNA_CERTIFICATE,
+                IMPORTED_CERTIFICATE,
+                HTTP_CHALLENGE_CERTIFICATE,
+            ],
+            page_size=10,
+        )
+
+        zone = Zone('cdn2.example.com.', [])
+        certs = provider.find_zone_certificates(zone)
+        assert [e.id for e in certs] == [STUB_CERTIFICATE_2.id]
+        # Full view is fetched
+        assert len(certs[0].challenges) == 4
+
+        zone = Zone('example.com.', [])
+        assert [e.id for e in provider.find_zone_certificates(zone)] == [
+            STUB_CERTIFICATE_1.id,
+            STUB_CERTIFICATE_2.id,
+            HTTP_CHALLENGE_CERTIFICATE.id,
+        ]
+
+        # Domains of sub-zones are skipped
+        zone = Zone('example.com.', ['cdn', 'cdn2'])
+        assert [e.id for e in provider.find_zone_certificates(zone)] == [
+            STUB_CERTIFICATE_1.id,
+            HTTP_CHALLENGE_CERTIFICATE.id,
+        ]
+
+        zone = Zone('example.org.', [])
+        assert provider.find_zone_certificates(zone) == []
+
+        # Certificates are listed only once per source
+        # and each one is fetched only once
+        assert calls == {'List': 1, 'Get': 3}
+
+    def test_find_zone_certificates_parallel(self, provider, monkeypatch):
+        calls = self._stub_service(
+            provider, monkeypatch, [STUB_CERTIFICATE_1], delay=0.05
+        )
+
+        # Zones populated in parallel wait for the first listing
+        zones = [Zone('example.com.', []) for _ in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            found = list(executor.map(provider.find_zone_certificates, zones))
+        assert found == [[STUB_CERTIFICATE_1]] * 8
+        # Each certificate is fetched once as well
+        assert calls == {'List': 1, 'Get': 1}
+
+    def test_fetch_certificates_error(self, provider, monkeypatch):
+        calls = self._stub_service(provider, monkeypatch, [STUB_CERTIFICATE_1])
+        get = provider.cm_service.Get
+
+        def _get(req):
+            monkeypatch.setattr(provider.cm_service, 'Get', get)
+            raise RuntimeError('unavailable')
+
+        monkeypatch.setattr(provider.cm_service, 'Get', _get)
+        with pytest.raises(RuntimeError, match='unavailable'):
+            provider.fetch_certificates([STUB_CERTIFICATE_1.id])
+
+        # A failed fetch isn't cached
+        assert provider.fetch_certificates([STUB_CERTIFICATE_1.id]) == [
+            STUB_CERTIFICATE_1
+        ]
+        assert calls == {'List': 0, 'Get': 1}
+
+    def test_populate_multiple_folders(self, disable_sdk, monkeypatch):
+        provider = YandexCloudCMSource(
+            "test",
+            folder_ids=['folder1', 'folder2'],
+            auth_type=AUTH_TYPE_METADATA,
+        )
+
+        certificates = {
+            'folder1': [STUB_CERTIFICATE_1],
+            'folder2': [STUB_CERTIFICATE_2],
+        }
+        by_id = {STUB_CERTIFICATE_1.id: STUB_CERTIFICATE_1}
+        by_id[STUB_CERTIFICATE_2.id] = STUB_CERTIFICATE_2
+        monkeypatch.setattr(
+            provider.cm_service,
+            'List',
+            lambda req: ListCertificatesResponse(
+                next_page_token='', certificates=certificates[req.folder_id]
+            ),
+        )
+        monkeypatch.setattr(
+            provider.cm_service, 'Get', lambda req: by_id[req.certificate_id]
+        )
+
+        zone = Zone('example.com.', [])
+        provider.populate(zone)
+        assert sorted(r.name for r in zone.records) == [
+            '_acme-challenge',
+            '_acme-challenge.cdn',
+            '_acme-challenge.cdn2',
+        ]
@@ -0,0 +1,128 @@
+import copy
+
+import pytest
+import yandexcloud
+
+from octodns.provider.plan import Plan
+from octodns.zone import Zone
+
+from octodns_yandex import YandexCloudProvider, YandexCloudSnapshotSource
+from octodns_yandex.auth import AUTH_TYPE_METADATA
+from octodns_yandex.exception import YandexCloudException
+from octodns_yandex.snapshot import read_snapshot, snapshot_path
+from tests.fixtures import STUB_FOLDER_ID, STUB_ZONE_NAME
+from tests.fixtures.dns_server import FakeDnsServer
+from tests.fixtures.generator import generate_record_sets
+from tests.fixtures.record_sets import STUB_RECORDS
+
+
+@pytest.fixture()
+def server(monkeypatch):
+    with FakeDnsServer(page_size=50) as server:
+        monkeypatch.setattr(yandexcloud, 'SDK', server.sdk)
+        yield server
+
+
+def _records(zone):
+    return {(e.name, e._type): e.data for e in zone.records}
+
+
+class TestYandexCloudSnapshotSource:
+    def test_populate(self, server, tmp_path):
+        rsets = generate_record_sets(300, STUB_ZONE_NAME, seed=3)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, copy.deepcopy(rsets))
+        server.state.add_record_sets(dns_zone.id, [STUB_RECORDS['SOA']])
+
+        provider = YandexCloudProvider(
+            'test',
+            folder_id=STUB_FOLDER_ID,
+            auth_type=AUTH_TYPE_METADATA,
+            snapshot_dir=str(tmp_path),
+        )
+        existing = Zone(STUB_ZONE_NAME, [])
+        assert provider.populate(existing)
+
+        # Record sets are saved as returned by API
+        path = snapshot_path(str(tmp_path), STUB_ZONE_NAME)
+        assert sorted(read_snapshot(path), key=lambda e: (e.name, e.type)) == (
+            server.state.get_record_sets(dns_zone.id)
+        )
+
+        calls = dict(server.dns_service.calls)
+        source = YandexCloudSnapshotSource('snapshot', str(tmp_path))
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert source.populate(zone)
+        assert _records(zone) == _records(existing)
+        assert server.dns_service.calls == calls
+
+        assert not source.populate(Zone('example.org.', []))
+
+    def test_plan(self, server, tmp_path):
+        rsets = generate_record_sets(20, STUB_ZONE_NAME, seed=4)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, rsets[:10])
+
+        provider = YandexCloudProvider(
+            'test',
+            folder_id=STUB_FOLDER_ID,
+            auth_type=AUTH_TYPE_METADATA,
+            snapshot_dir=str(tmp_path),
+        )
+        desired = Zone(STUB_ZONE_NAME, [])
+        provider.add_rsets(desired, False, copy.deepcopy(rsets))
+        expected = provider.plan(desired)
+
+        # Same plan is made against the snapshot
+        source = YandexCloudSnapshotSource('snapshot', str(tmp_path))
+        plan = source.plan(desired)
+        assert sorted(str(e) for e in plan.changes) == sorted(
+            str(e) for e in expected.changes
+        )
+
+        with pytest.raises(YandexCloudException, match='.*read-only'):
+            source.apply(
+                Plan(
+                    existing=None,
+                    desired=desired,
+                    changes=plan.changes,
+                    exists=True,
+                )
+            )
+
+    def test_plan_managed(self, server, tmp_path):
+        rsets = generate_record_sets(20, STUB_ZONE_NAME, seed=4)
+        dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+        server.state.add_record_sets(dns_zone.id, copy.deepcopy(rsets[:10]))
+
+        options = {'managed_names': ['host*'], 'strict_supports': False}
+        provider = YandexCloudProvider(
+            'test',
+            folder_id=STUB_FOLDER_ID,
+            auth_type=AUTH_TYPE_METADATA,
+            snapshot_dir=str(tmp_path),
+            **options,
+        )
+        desired = Zone(STUB_ZONE_NAME, [])
+        YandexCloudProvider(
+            'desired', folder_id=STUB_FOLDER_ID, auth_type=AUTH_TYPE_METADATA
+        ).add_rsets(desired, False, copy.deepcopy(rsets[1:]))
+        assert len(desired.records) == 19
+        expected = provider.plan(desired.copy())
+        assert all(e.record.name.startswith('host') for e in expected.changes)
+
+        # Unmanaged record sets of the snapshot and desired zone are skipped
+        source = YandexCloudSnapshotSource('snapshot', str(tmp_path), **options)
+        zone = Zone(STUB_ZONE_NAME, [])
+        assert source.populate(zone)
+        assert sorted(e.name for e in zone.records) == [
+            'host0',
+            'host1',
+            'host2',
+            'host4',
+            'host9',
+        ]
+        plan = source.plan(desired.copy())
+        assert sorted(str(e) for e in plan.changes) == sorted(
+            str(e) for e in expected.changes
+        )
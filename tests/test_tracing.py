@@ -0,0 +1,200 @@
+import importlib
+import sys
+
+import pytest
+import yandexcloud
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from yandex.cloud.dns.v1.dns_zone_pb2 import RecordSet
+
+from octodns.provider.plan import Plan
+from octodns.record import Create
+from octodns.zone import Zone
+
+from octodns_yandex import Yandex360Provider, YandexCloudProvider, tracing
+from octodns_yandex.auth import AUTH_TYPE_METADATA
+from octodns_yandex.metrics import zone_context
+from octodns_yandex.tracing import set_attributes, span, traced, zone_span
+from octodns_yandex.yandex360_provider import map_entries_to_records
+from octodns_yandex.yandexcloud_provider import map_rset_to_octodns
+from tests.fixtures import STUB_FOLDER_ID, STUB_ZONE_NAME
+from tests.fixtures.dns_server import FakeDnsServer
+from tests.fixtures.ya360_server import Ya360Server
+
+_exporter = InMemorySpanExporter()
+_provider = TracerProvider()
+_provider.add_span_processor(SimpleSpanProcessor(_exporter))
+trace.set_tracer_provider(_provider)
+
+
+@pytest.fixture()
+def spans():
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+
+def _attrs(item):
+    return {
+        k.replace('octodns_yandex.', ''): v for k, v in item.attributes.items()
+    }
+
+
+class TestTracing:
+    def test_span(self, spans):
+        with span('outer', page_token='', skipped=None) as current:
+            set_attributes(current, items=3)
+            with zone_span('inner', STUB_ZONE_NAME, chunk_size=2):
+                pass
+
+        inner, outer = spans.get_finished_spans()
+        assert outer.name == 'outer'
+        assert _attrs(outer) == {'page_token': '', 'items': 3}
+        assert inner.name == 'inner'
+        assert inner.parent.span_id == outer.context.span_id
+        assert _attrs(inner) == {'zone': STUB_ZONE_NAME, 'chunk_size': 2}
+
+    def test_traced(self, spans):
+        @traced('fn')
+        def fn(value):
+            return value * 2
+
+        with zone_context(STUB_ZONE_NAME):
+            assert fn(2) == 4
+
+        (item,) = spans.get_finished_spans()
+        assert item.name == 'fn'
+        assert _attrs(item) == {'zone': STUB_ZONE_NAME}
+
+    def test_disabled(self, spans, monkeypatch):
+        monkeypatch.setattr(tracing, 'trace', None)
+
+        with span('outer', chunk_size=1) as current:
+            assert current is None
+            set_attributes(current, items=1)
+        assert spans.get_finished_spans() == ()
+
+    def test_without_opentelemetry(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'opentelemetry', None)
+        try:
+            importlib.reload(tracing)
+            assert tracing.trace is None
+        finally:
+            monkeypatch.undo()
+            importlib.reload(tracing)
+        assert tracing.trace is trace
+
+    def test_yandexcloud_provider(self, spans, monkeypatch):
+        with FakeDnsServer(page_size=3) as server:
+            monkeypatch.setattr(yandexcloud, 'SDK', server.sdk)
+            dns_zone = server.state.add_zone(STUB_ZONE_NAME)
+            rsets = [
+                RecordSet(
+                    name=f'host{i}.{STUB_ZONE_NAME}',
+                    type='A',
+                    ttl=300,
+                    data=[f'10.0.0.{i}'],
+                )
+                for i in range(5)
+            ]
+            server.state.add_record_sets(dns_zone.id, rsets[:4])
+
+            provider = YandexCloudProvider(
+                'test', folder_id=STUB_FOLDER_ID, auth_type=AUTH_TYPE_METADATA
+            )
+            zone = Zone(STUB_ZONE_NAME, [])
+            assert provider.populate(zone)
+            provider._apply(
+                Plan(
+                    existing=None,
+                    desired=zone,
+                    changes=[
+                        Create(map_rset_to_octodns(None, zone, False, rsets[4]))
+                    ],
+                    exists=True,
+                )
+            )
+
+        items = spans.get_finished_spans()
+        by_name = {}
+        for item in items:
+            by_name.setdefault(item.name, []).append(item)
+            assert _attrs(item)['zone'] == STUB_ZONE_NAME
+
+        assert sorted(by_name.keys()) == [
+            'Paginator.page',
+            'YandexCloudProvider.apply',
+            'YandexCloudProvider.apply_chunk',
+            'YandexCloudProvider.get_zone_id_by_name',
+            'YandexCloudProvider.map_records',
+            'YandexCloudProvider.populate',
+        ]
+        (populate,) = by_name['YandexCloudProvider.populate']
+        assert _attrs(populate)['lenient'] is False
+
+        # Prefetched pages are children of populate too
+        pages = by_name['Paginator.page']
+        assert [_attrs(e)['page_token'] for e in pages] == ['', '3']
+        assert [_attrs(e)['items'] for e in pages] == [3, 1]
+        assert all(e.parent.span_id == populate.context.span_id for e in pages)
+        assert [
+            _attrs(e)['records']
+            for e in by_name['YandexCloudProvider.map_records']
+        ] == [3, 1]
+
+        (chunk,) = by_name['YandexCloudProvider.apply_chunk']
+        assert _attrs(chunk) == {
+            'zone': STUB_ZONE_NAME,
+            'zone_id': dns_zone.id,
+            'creates': 1,
+            'deletes': 0,
+        }
+
+    def test_yandex360_provider(self, spans, enable_network):
+        domain = STUB_ZONE_NAME.rstrip('.')
+        with Ya360Server() as server:
+            server.state.add_org(1)
+            server.state.add_domain(1, domain)
+
+            provider = Yandex360Provider('test', server.token)
+            provider.API_BASE = server.url
+            zone = Zone(STUB_ZONE_NAME, [])
+            assert provider.populate(zone)
+            new = {'type': 'A', 'name': 'www', 'ttl': 300, 'address': '1.1.1.1'}
+            provider._apply(
+                Plan(
+                    existing=None,
+                    desired=zone,
+                    changes=[
+                        Create(e)
+                        for e in map_entries_to_records(
+                            None, zone, False, [new]
+                        )
+                    ],
+                    exists=True,
+                )
+            )
+
+        names = [e.name for e in spans.get_finished_spans()]
+        assert names == [
+            'Yandex360Provider.ListOrgs',
+            'Yandex360Provider.ListDomains',
+            'Yandex360Provider.find_org_id_for_domain',
+            'Yandex360Provider.ListDnsRecords',
+            'Yandex360Provider.map_records',
+            'Yandex360Provider.populate',
+            'Yandex360Provider.ListOrgs',
+            'Yandex360Provider.ListDomains',
+            'Yandex360Provider.find_org_id_for_domain',
+            'Yandex360Provider.ListDnsRecords',
+            'Yandex360Provider.CreateDnsRecord',
+            'Yandex360Provider.apply',
+        ]
+        create = spans.get_finished_spans()[-2]
+        assert _attrs(create) == {'http_method': 'POST', 'zone': STUB_ZONE_NAME}
+        list_domains = spans.get_finished_spans()[1]
+        assert _attrs(list_domains)['page'] == 1